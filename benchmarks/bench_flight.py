@@ -0,0 +1,68 @@
+"""Microbenchmarks of the Blender independent flight math.
+
+Runs in plain CPython with NumPy installed, no Blender required:
+
+    python benchmarks/bench_flight.py --number 20000 --batch 12
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+# Import the core package on its own so the add-on's bpy imports are skipped
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "camera_fly"))
+
+from core import flight  # noqa: E402
+from core.motion import MotionIntegrator  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=10000, help="calls per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="measurements per case, the best is reported")
+    parser.add_argument("--batch", type=int, default=8, help="rigs in the batched cases")
+    return parser.parse_args()
+
+
+def cases(batch):
+    rng = np.random.default_rng(0)
+    basis = flight.rotation_matrix((0.3, 0.2, 0.9), 0.7)
+    rig_inverse = np.linalg.inv(np.eye(4))
+    camera = np.array((0.0, 0.0, 1.7))
+    aim = np.array((0.0, 10.0, 1.7))
+    right = np.array((1.0, 0.0, 0.0))
+    keys = {'W', 'D'}
+    integrator = MotionIntegrator()
+
+    cameras = rng.normal(size=(batch, 3))
+    aims = cameras + rng.normal(size=(batch, 3)) * 10.0
+    rights = np.tile(right, (batch, 1))
+    yaws = np.full(batch, 0.01)
+    pitches = np.full(batch, -0.02)
+
+    return [
+        ("axes", lambda: flight.axes(basis)),
+        ("move_direction", lambda: flight.move_direction(keys, basis)),
+        ("mouse_angles", lambda: flight.mouse_angles(3, -2, 5.0)),
+        ("integrator.step", lambda: integrator.step((0.0, 1.0, 0.0), 5.0, 1.0 / 60.0, 20.0, 20.0)),
+        ("rotation_matrix", lambda: flight.rotation_matrix(right, 0.01)),
+        ("orbit", lambda: flight.orbit(aim, camera, 0.01, -0.02, right)),
+        ("rotate_step CAMERA", lambda: flight.rotate_step(camera, aim, right, 0.01, -0.02, 'CAMERA')),
+        ("rotate_step AIM", lambda: flight.rotate_step(camera, aim, right, 0.01, -0.02, 'AIM')),
+        ("bone_location", lambda: flight.bone_location(aim, rig_inverse, camera)),
+        (f"orbit x{batch}", lambda: flight.orbit(aims, cameras, yaws, pitches, rights)),
+    ]
+
+
+def main():
+    args = parse_args()
+    print(f"{'case':<22}{'us/call':>10}{'calls/s':>12}")
+    for name, func in cases(args.batch):
+        best = min(timeit.repeat(func, number=args.number, repeat=args.repeat)) / args.number
+        print(f"{name:<22}{best * 1e6:>10.2f}{1.0 / best:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Headless benchmark of the CameraFly fly operator.
+
+Builds a synthetic Dolly rig and drives the operator's per-event handlers with
+scripted input, reporting latency percentiles and throughput per handler.
+
+Run from the repository root with:
+
+    blender --background --factory-startup --python benchmarks/bench_modal.py -- \\
+        --objects 1000 --action-length 5000 --constraints 20 --iterations 2000
+
+With ``--replay`` the events of a log recorded in a real fly session are fed
+through the operator's event handler as fast as possible.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import bpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import camera_fly  # noqa: E402
+from camera_fly import fcurves, ops  # noqa: E402
+from camera_fly.core import eventlog  # noqa: E402
+
+# Events ending the session, left out of a benchmarked replay
+EXIT_EVENTS = {'LEFTMOUSE', 'SPACE', 'RIGHTMOUSE', 'ESC'}
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000, help="calls per handler")
+    parser.add_argument("--objects", type=int, default=0, help="extra mesh objects in the scene")
+    parser.add_argument("--action-length", type=int, default=0, help="frames keyed on the rig before flying")
+    parser.add_argument("--constraints", type=int, default=0, help="objects constrained to the Camera bone")
+    parser.add_argument("--formation", type=int, default=0, help="extra dolly rigs flying in formation")
+    parser.add_argument(
+        "--collision", type=int, default=0,
+        help="fly with collision and ground following over a grid of this many subdivisions per side",
+    )
+    parser.add_argument("--replay", help="event log recorded in a fly session to replay")
+    parser.add_argument("--no-update", action="store_true", help="don't evaluate the depsgraph after each call")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args(argv)
+
+
+# Scene setup
+#################################################
+
+
+def build_dolly_rig(scene, collection=None, location=(0.0, 0.0, 0.0)):
+    """Create an armature laid out like the Dolly Rig of the Add Camera Rigs add-on."""
+    collection = collection or scene.collection
+    armature = bpy.data.armatures.new("Dolly_Rig")
+    rig = bpy.data.objects.new("Dolly_Rig", armature)
+    rig.location = location
+    collection.objects.link(rig)
+    bpy.context.view_layer.objects.active = rig
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = armature.edit_bones
+    root = edit_bones.new("Root")
+    root.head, root.tail = (0, 0, 0), (0, 4, 0)
+    camera = edit_bones.new("Camera")
+    camera.head, camera.tail = (0, 0, 1.7), (0, 1, 1.7)
+    camera.parent = root
+    aim = edit_bones.new("Aim")
+    aim.head, aim.tail = (0, 10, 1.7), (0, 11, 1.7)
+    aim.parent = root
+    widget = edit_bones.new("MCH-Aim_widget")
+    widget.head, widget.tail = (0, 10, 1.7), (0, 10.5, 1.7)
+    widget.parent = aim
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    track = rig.pose.bones["Camera"].constraints.new('TRACK_TO')
+    track.name = "Track To"
+    track.target = rig
+    track.subtarget = "Aim"
+    track.track_axis = 'TRACK_Y'
+    track.up_axis = 'UP_Z'
+
+    camera_obj = bpy.data.objects.new("Camera", bpy.data.cameras.new("Camera"))
+    collection.objects.link(camera_obj)
+    camera_obj.parent = rig
+    camera_obj.parent_type = 'BONE'
+    camera_obj.parent_bone = "Camera"
+    return rig, camera_obj
+
+
+def add_objects(scene, count):
+    mesh = bpy.data.meshes.new("BenchCube")
+    verts = [(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)]
+    faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    mesh.from_pydata(verts, [], faces)
+    for i in range(count):
+        obj = bpy.data.objects.new(f"BenchCube.{i:05d}", mesh)
+        obj.location = ((i % 100) * 2.0, (i // 100) * 2.0, 0.0)
+        scene.collection.objects.link(obj)
+
+
+def add_constraints(scene, rig, count):
+    for i in range(count):
+        empty = bpy.data.objects.new(f"BenchFollower.{i:04d}", None)
+        scene.collection.objects.link(empty)
+        constraint = empty.constraints.new('COPY_TRANSFORMS')
+        constraint.target = rig
+        constraint.subtarget = "Camera"
+
+
+def add_formation(scene, count):
+    collection = bpy.data.collections.new("BenchFormation")
+    scene.collection.children.link(collection)
+    for i in range(count):
+        build_dolly_rig(scene, collection, location=((i + 1) * 3.0, 0.0, 0.0))
+    return collection
+
+
+def add_ground(subdivisions):
+    """Add a ground grid of about 2 * subdivisions² triangles for the collision benchmark."""
+    bpy.ops.mesh.primitive_grid_add(
+        x_subdivisions=subdivisions, y_subdivisions=subdivisions, size=400.0, location=(0.0, 0.0, 0.0)
+    )
+    return bpy.context.active_object
+
+
+def add_action(rig, length):
+    frames = range(1, length + 1)
+    for bone_name in ("Camera", "Aim"):
+        bone = rig.pose.bones[bone_name]
+        for index in range(3):
+            fcurve = fcurves.ensure_fcurve(rig, f'pose.bones["{bone_name}"].location', index, bone_name)
+            values = [bone.location[index] + 0.01 * frame for frame in frames]
+            fcurves.write_keys(fcurve, list(frames), values)
+
+
+# Operator driver
+#################################################
+
+
+def make_operator():
+    """Return an object running the fly operator's methods outside of a modal session."""
+    op_cls = ops.POSE_OT_move_rotate_bone_local_pivot
+    namespace = {
+        name: value for name, value in vars(op_cls).items()
+        if name not in {"__dict__", "__weakref__", "bl_rna"}
+    }
+    namespace["reports"] = []
+    namespace["report"] = lambda self, level, message: self.reports.append((level, message))
+    return type("BenchOperator", (), namespace)()
+
+
+def measure(name, iterations, call, update):
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        call(i)
+        if update is not None:
+            update()
+        samples.append(time.perf_counter() - start)
+    return summarize(name, samples)
+
+
+def summarize(name, samples):
+    samples = sorted(samples)
+    total = sum(samples)
+
+    def percentile(p):
+        return samples[min(int(p / 100.0 * len(samples)), len(samples) - 1)] * 1000.0
+
+    return {
+        "name": name,
+        "calls": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000.0,
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": samples[-1] * 1000.0,
+        "calls_per_s": len(samples) / total if total else float("inf"),
+    }
+
+
+def run(args):
+    scene = bpy.context.scene
+    rig, camera = build_dolly_rig(scene)
+    add_objects(scene, args.objects)
+    add_constraints(scene, rig, args.constraints)
+    add_action(rig, args.action_length)
+    settings = scene.camerafly_settings
+    if args.formation:
+        settings.formation_collection = add_formation(scene, args.formation)
+        settings.formation_enabled = True
+    if args.collision:
+        add_ground(args.collision)
+        settings.collision_enabled = True
+        settings.ground_follow = True
+    settings.active_camera = camera
+
+    context = bpy.context
+    op = make_operator()
+    if not op.start_session(context):
+        raise SystemExit(f"Could not start a fly session: {op.reports}")
+
+    update = None if args.no_update else context.view_layer.update
+    dt = 1.0 / 60.0
+    op.keys_pressed.update({'W', 'D'})
+    mouse_deltas = ((3, 1), (-2, 2), (1, -3), (-2, 0))
+
+    def tick(i):
+        op.move_cam_mode(context, dt)
+        op.commit_pose()
+
+    def rotate(i):
+        op.rotate_cam_mode(context, *mouse_deltas[i % len(mouse_deltas)])
+        op.commit_pose()
+
+    def wheel(i):
+        op.move_aim_bone(context, forward=bool(i % 2))
+
+    def keyframe(i):
+        scene.frame_current = 1 + i
+        op.insert_keyframes(context)
+
+    def formation(i):
+        op.move_cam_mode(context, dt)
+        op.commit_pose()
+        op._formation.update()
+
+    results = [
+        measure("move_cam_mode", args.iterations, tick, update),
+        measure("rotate_cam_mode", args.iterations, rotate, update),
+        measure("move_aim_bone", args.iterations, wheel, update),
+        measure("insert_keyframes", args.iterations, keyframe, update),
+    ]
+    if op._formation is not None:
+        results.append(measure(f"formation x{args.formation}", args.iterations, formation, update))
+    op.keys_pressed.clear()
+    op._session.stop()
+    if op._colliders is not None:
+        op._colliders.stop()
+
+    if args.replay:
+        results.extend(replay(context, args.replay, update))
+    return results
+
+
+def replay(context, path, update):
+    """Time the event handler on each logged event, grouped by event type."""
+    metadata, events = eventlog.read_event_log(path)
+    ops.apply_logged_settings(context.scene.camerafly_settings, metadata)
+    op = make_operator()
+    if not op.start_session(context):
+        raise SystemExit(f"Could not start a replay session: {op.reports}")
+    op.begin_replay(metadata, events)
+
+    by_type = {}
+    for logged in events:
+        if logged.type in EXIT_EVENTS:
+            continue
+        start = time.perf_counter()
+        op.replay_event(context, logged)
+        if update is not None:
+            update()
+        by_type.setdefault(logged.type, []).append(time.perf_counter() - start)
+    op.keys_pressed.clear()
+    op._session.stop()
+    if op._colliders is not None:
+        op._colliders.stop()
+
+    results = [summarize("replay", [s for samples in by_type.values() for s in samples])]
+    for event_type, samples in sorted(by_type.items(), key=lambda item: -len(item[1])):
+        results.append(summarize(f"  {event_type}", samples))
+    return results
+
+
+def main():
+    args = parse_args()
+    camera_fly.register()
+    try:
+        results = run(args)
+    finally:
+        camera_fly.unregister()
+
+    print(
+        f"\nCameraFly modal benchmark: objects={args.objects} action_length={args.action_length} "
+        f"constraints={args.constraints} formation={args.formation} collision={args.collision} "
+        f"iterations={args.iterations} "
+        f"update={not args.no_update}"
+    )
+    print(f"{'handler':<18}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'calls/s':>11}")
+    for r in results:
+        print(
+            f"{r['name']:<18}{r['mean_ms']:>9.3f}{r['p50_ms']:>9.3f}{r['p90_ms']:>9.3f}"
+            f"{r['p99_ms']:>9.3f}{r['max_ms']:>9.3f}{r['calls_per_s']:>11.0f}"
+        )
+    print("(times in ms)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,27 +11,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-extension_version = (2, 1, 4)
-
 import bpy
 from . import auto_load
-from . import ops
+from .version import extension_version, get_version
 
 auto_load.init()
 
-def get_version():
-    version = extension_version
-    parts = str(version).split(",")
-    for i in range(len(parts)):
-        parts[i] = ''.join(filter(str.isdigit, parts[i]))
-
-    version = parts[0] + '.' + parts[1] + '.' + parts[2]
-        
-    return version
-
 
 def register():
     auto_load.register()
+    from . import ops
     bpy.types.Scene.camerafly_settings = bpy.props.PointerProperty(type=ops.CameraFlyProperties)
     
     # Register UI property for tab control
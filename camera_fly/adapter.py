@@ -0,0 +1,15 @@
+import numpy as np
+from mathutils import Matrix, Vector
+
+
+def array(value):
+    """Convert a mathutils Vector or Matrix to a NumPy array."""
+    return np.array(value, dtype=np.float64)
+
+
+def vector(values):
+    return Vector(values.tolist() if isinstance(values, np.ndarray) else values)
+
+
+def matrix(values):
+    return Matrix(values.tolist() if isinstance(values, np.ndarray) else values)
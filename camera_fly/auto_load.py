@@ -1,6 +1,8 @@
+import os
 import bpy
 import typing
 import inspect
+import logging
 import pkgutil
 import importlib
 from pathlib import Path
@@ -11,8 +13,14 @@ __all__ = (
     "unregister",
 )
 
+log = logging.getLogger(__name__)
+
 blender_version = bpy.app.version
 
+# Set to discover the classes at startup and regenerate the manifest from them
+DEV_ENVIRONMENT = "CAMERAFLY_DEV_AUTOLOAD"
+MANIFEST_PATH = Path(__file__).parent / "registration.py"
+
 modules = None
 ordered_classes = None
 
@@ -21,8 +29,17 @@ def init():
     global modules
     global ordered_classes
 
+    if not os.environ.get(DEV_ENVIRONMENT):
+        try:
+            modules, ordered_classes = load_manifest()
+            return
+        except (ImportError, AttributeError) as error:
+            log.warning("Registration manifest unusable, discovering classes instead: %s", error)
+
     modules = get_all_submodules(Path(__file__).parent)
     ordered_classes = get_ordered_classes_to_register(modules)
+    if os.environ.get(DEV_ENVIRONMENT):
+        write_manifest(modules, ordered_classes)
 
 
 def register():
@@ -47,6 +64,57 @@ def unregister():
             module.unregister()
 
 
+# Registration manifest
+#################################################
+
+MANIFEST_HEADER = f"""\
+# Generated by auto_load.write_manifest(), do not edit.
+# Enable the add-on with {DEV_ENVIRONMENT}=1 set to regenerate it.
+"""
+
+
+def load_manifest():
+    """Import only the modules listed in the manifest and return them with the classes in order."""
+    from . import registration
+
+    loaded = {name: importlib.import_module("." + name, __package__) for name in registration.MODULES}
+    classes = [getattr(loaded[module_name], class_name) for module_name, class_name in registration.CLASSES]
+    # A class added since the manifest was generated would silently stay unregistered
+    missing = set(iter_my_classes(loaded.values())) - set(classes)
+    if missing:
+        log.warning(
+            "Registration manifest is stale, %s not registered. Regenerate it with %s=1",
+            ", ".join(sorted(cls.__name__ for cls in missing)), DEV_ENVIRONMENT,
+        )
+    return list(loaded.values()), classes
+
+
+def manifest_source(modules, classes):
+    def relative_name(name):
+        return name[len(__package__) + 1:]
+
+    hooked = {
+        relative_name(module.__name__) for module in modules
+        if module.__name__ != __name__ and (hasattr(module, "register") or hasattr(module, "unregister"))
+    }
+    module_names = sorted(hooked | {relative_name(cls.__module__) for cls in classes})
+
+    lines = [MANIFEST_HEADER, "MODULES = ("]
+    lines += [f"    {name!r}," for name in module_names]
+    lines += [")", "", "CLASSES = ("]
+    lines += [f"    ({relative_name(cls.__module__)!r}, {cls.__name__!r})," for cls in classes]
+    lines += [")", ""]
+    return "\n".join(lines).replace("'", '"')
+
+
+def write_manifest(modules, classes):
+    source = manifest_source(modules, classes)
+    if MANIFEST_PATH.exists() and MANIFEST_PATH.read_text() == source:
+        return
+    MANIFEST_PATH.write_text(source)
+    log.warning("Registration manifest updated: %s", MANIFEST_PATH)
+
+
 # Import modules
 #################################################
 
@@ -181,6 +249,7 @@ def toposort(deps_dict):
             else:
                 unsorted.append(value)
         deps_dict = {value: deps_dict[value] - sorted_values for value in unsorted}
-        sorted_list_sub.sort(key=lambda cls: getattr(cls, "bl_order", 0))
+        # Names break bl_order ties so the manifest is the same on every run
+        sorted_list_sub.sort(key=lambda cls: (getattr(cls, "bl_order", 0), cls.__module__, cls.__name__))
         sorted_list.extend(sorted_list_sub)
     return sorted_list
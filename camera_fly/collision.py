@@ -0,0 +1,220 @@
+import bpy
+import numpy as np
+from mathutils.bvhtree import BVHTree
+from . import adapter
+from .core import flight
+
+_EPSILON = 1e-9
+
+
+def collider_objects(settings, view_layer, selected, exclude=()):
+    """Return the meshes the camera collides with.
+
+    ``selected`` are the objects selected before the session changed the
+    selection to the rig.
+    """
+    if settings.collision_source == 'SELECTED':
+        objects = selected
+    else:
+        objects = [obj for obj in view_layer.objects if obj.visible_get(view_layer=view_layer)]
+    return [obj for obj in objects if obj.type == 'MESH' and obj.parent not in exclude]
+
+
+class ColliderCache:
+    """BVH trees of the collider meshes of a fly session.
+
+    Each tree is built once in its object's local space, so moving a collider
+    only updates its matrices. A tree is rebuilt when the geometry of its
+    object changes. The world bounding boxes of the colliders cull the trees
+    a query can't hit before any tree is searched.
+    """
+
+    def __init__(self, objects):
+        count = len(objects)
+        self.objects = list(objects)
+        self.names = [obj.name for obj in objects]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.trees = [None] * count
+        self.matrices = np.empty((count, 4, 4))
+        self.inverses = np.empty((count, 4, 4))
+        # Scale of a world distance in the local space of the collider
+        self.inverse_scales = np.empty(count)
+        self.bounds = np.empty((count, 2, 3))
+        self._dirty_geometry = set(range(count))
+        self._dirty_transform = set(range(count))
+
+    def __len__(self):
+        return len(self.objects)
+
+    def resolve(self, scene):
+        """Look the objects up again after undo replaced them, keeping the trees."""
+        for i, name in enumerate(self.names):
+            obj = scene.objects.get(name)
+            if obj is None:
+                # Removed colliders can't be hit anymore
+                self.bounds[i] = (np.inf, -np.inf)
+            self.objects[i] = obj
+        self._dirty_transform.update(i for i, obj in enumerate(self.objects) if obj is not None)
+
+    # Invalidation
+    #################################################
+
+    def start(self):
+        bpy.app.handlers.depsgraph_update_post.append(self.on_depsgraph_update)
+
+    def stop(self):
+        handlers = bpy.app.handlers.depsgraph_update_post
+        if self.on_depsgraph_update in handlers:
+            handlers.remove(self.on_depsgraph_update)
+
+    def on_depsgraph_update(self, scene, depsgraph):
+        for update in depsgraph.updates:
+            if not isinstance(update.id, bpy.types.Object):
+                continue
+            i = self.index.get(update.id.original.name)
+            if i is None:
+                continue
+            if update.is_updated_geometry:
+                self._dirty_geometry.add(i)
+            if update.is_updated_transform:
+                self._dirty_transform.add(i)
+
+    def refresh(self, context):
+        """Rebuild the trees and matrices of the colliders changed since the last query."""
+        if self._dirty_geometry:
+            depsgraph = context.evaluated_depsgraph_get()
+            for i in self._dirty_geometry:
+                obj = self.objects[i]
+                if obj is not None:
+                    self.trees[i] = BVHTree.FromObject(obj, depsgraph)
+            # The bounds follow the geometry
+            self._dirty_transform.update(self._dirty_geometry)
+            self._dirty_geometry.clear()
+
+        for i in self._dirty_transform:
+            obj = self.objects[i]
+            if obj is None:
+                continue
+            matrix = adapter.array(obj.matrix_world)
+            inverse = np.linalg.inv(matrix)
+            self.matrices[i] = matrix
+            self.inverses[i] = inverse
+            self.inverse_scales[i] = np.linalg.norm(inverse[:3, :3], axis=0).max()
+            corners = flight.transform_point(matrix, np.array(obj.bound_box))
+            self.bounds[i] = corners.min(axis=0), corners.max(axis=0)
+        self._dirty_transform.clear()
+
+    # Queries
+    #################################################
+
+    def candidates(self, low, high):
+        """Indices of the colliders whose world bounds overlap the box from low to high."""
+        bounds = self.bounds
+        overlap = (bounds[:, 0] <= high) & (bounds[:, 1] >= low)
+        return np.flatnonzero(overlap.all(axis=1))
+
+    def ray_cast(self, origin, direction, distance):
+        """Find the closest hit of a world space ray.
+
+        Returns:
+            Tuple of (location, normal, distance) in world space or None
+        """
+        end = origin + direction * distance
+        closest = None
+        for i in self.candidates(np.minimum(origin, end), np.maximum(origin, end)):
+            tree = self.trees[i]
+            if tree is None:
+                continue
+            inverse = self.inverses[i]
+            local_origin = flight.transform_point(inverse, origin)
+            local_ray = flight.transform_point(inverse, end) - local_origin
+            local_distance = np.linalg.norm(local_ray)
+            if local_distance < _EPSILON:
+                continue
+            location, normal, _index, _distance = tree.ray_cast(
+                adapter.vector(local_origin), adapter.vector(local_ray / local_distance), local_distance
+            )
+            if location is None:
+                continue
+            location = flight.transform_point(self.matrices[i], adapter.array(location))
+            hit_distance = np.linalg.norm(location - origin)
+            if closest is None or hit_distance < closest[2]:
+                normal = inverse[:3, :3].T @ adapter.array(normal)
+                closest = (location, normal / np.linalg.norm(normal), hit_distance)
+        return closest
+
+    def find_nearest(self, point, radius):
+        """Find the closest surface point within radius of a world space point.
+
+        Returns:
+            Tuple of (location, distance) in world space or None
+        """
+        closest = None
+        for i in self.candidates(point - radius, point + radius):
+            tree = self.trees[i]
+            if tree is None:
+                continue
+            location, _normal, _index, _distance = tree.find_nearest(
+                adapter.vector(flight.transform_point(self.inverses[i], point)),
+                radius * self.inverse_scales[i],
+            )
+            if location is None:
+                continue
+            location = flight.transform_point(self.matrices[i], adapter.array(location))
+            distance = np.linalg.norm(location - point)
+            if distance <= radius and (closest is None or distance < closest[1]):
+                closest = (location, distance)
+        return closest
+
+    def sweep(self, start, displacement, radius, iterations=3):
+        """Move a sphere from start, sliding along the colliders in its way.
+
+        Returns:
+            The part of the world space displacement that keeps the sphere
+            out of the colliders
+        """
+        position = start
+        remaining = displacement
+        for _ in range(iterations):
+            length = np.linalg.norm(remaining)
+            if length < _EPSILON:
+                break
+            direction = remaining / length
+            hit = self.ray_cast(position, direction, length + radius)
+            if hit is None:
+                position = position + remaining
+                break
+            _location, normal, distance = hit
+            if normal @ direction > 0.0:
+                normal = -normal
+            # Move up to the contact, then slide the rest along the surface
+            travel = max(distance - radius, 0.0)
+            position = position + direction * travel
+            remaining = direction * (length - travel)
+            remaining = remaining - normal * (remaining @ normal)
+
+        # Push the sphere out of surfaces closer than its radius
+        nearest = self.find_nearest(position, radius)
+        if nearest is not None:
+            location, distance = nearest
+            if distance > _EPSILON:
+                position = position + (position - location) * ((radius - distance) / distance)
+        return position - start
+
+    def ground_offset(self, position, height):
+        """Return the vertical offset that puts position height above the ground below it.
+
+        The ground is searched from height above the position, so slopes
+        climbing into the camera are found as well. Without ground the
+        offset is 0.
+        """
+        up = flight.WORLD_UP
+        low = self.bounds[:, 0, 2].min(initial=np.inf)
+        origin = position + up * height
+        reach = origin[2] - low
+        if not reach > 0.0:
+            return 0.0
+        hit = self.ray_cast(origin, -up, reach)
+        if hit is None:
+            return 0.0
+        return hit[0][2] + height - position[2]
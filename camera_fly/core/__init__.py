@@ -0,0 +1,2 @@
+# Blender independent helpers used by the CameraFly operators.
+# Nothing in this package may import bpy or mathutils.
@@ -0,0 +1,127 @@
+import json
+import struct
+
+MAGIC = b"CFLYEV01"
+
+# time, type name index, value name index, modifier flags, mouse x/y, previous mouse x/y
+_RECORD = struct.Struct("<dHHBiiii")
+_COUNT = struct.Struct("<I")
+
+SHIFT = 1
+CTRL = 2
+ALT = 4
+OSKEY = 8
+REPEAT = 16
+
+
+class LoggedEvent:
+    """An event read back from a log, with the attributes the fly operator uses."""
+
+    __slots__ = (
+        'time', 'type', 'value', 'shift', 'ctrl', 'alt', 'oskey', 'is_repeat',
+        'mouse_x', 'mouse_y', 'mouse_prev_x', 'mouse_prev_y',
+    )
+
+    def __init__(self, time, type, value, flags, mouse_x, mouse_y, mouse_prev_x, mouse_prev_y):
+        self.time = time
+        self.type = type
+        self.value = value
+        self.shift = bool(flags & SHIFT)
+        self.ctrl = bool(flags & CTRL)
+        self.alt = bool(flags & ALT)
+        self.oskey = bool(flags & OSKEY)
+        self.is_repeat = bool(flags & REPEAT)
+        self.mouse_x = mouse_x
+        self.mouse_y = mouse_y
+        self.mouse_prev_x = mouse_prev_x
+        self.mouse_prev_y = mouse_prev_y
+
+
+class EventRecorder:
+    """Collect events as fixed size binary records.
+
+    Event type and value names are interned into a name table written with
+    the log, so each event costs one 29 byte record.
+    """
+
+    def __init__(self, metadata=None):
+        self.metadata = metadata or {}
+        self._names = {}
+        self._records = bytearray()
+        self.count = 0
+
+    def _name_index(self, name):
+        index = self._names.get(name)
+        if index is None:
+            index = self._names[name] = len(self._names)
+        return index
+
+    def record(self, time, event):
+        flags = (
+            (SHIFT if event.shift else 0)
+            | (CTRL if event.ctrl else 0)
+            | (ALT if event.alt else 0)
+            | (OSKEY if event.oskey else 0)
+            | (REPEAT if event.is_repeat else 0)
+        )
+        self._records += _RECORD.pack(
+            time,
+            self._name_index(event.type),
+            self._name_index(event.value),
+            flags,
+            event.mouse_x,
+            event.mouse_y,
+            event.mouse_prev_x,
+            event.mouse_prev_y,
+        )
+        self.count += 1
+
+    def write(self, path):
+        metadata = json.dumps(self.metadata).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(_COUNT.pack(len(metadata)))
+            f.write(metadata)
+            f.write(_COUNT.pack(len(self._names)))
+            for name in self._names:
+                encoded = name.encode('utf-8')
+                f.write(struct.pack("<B", len(encoded)))
+                f.write(encoded)
+            f.write(_COUNT.pack(self.count))
+            f.write(self._records)
+
+
+def read_event_log(path):
+    """Read a log written by EventRecorder.
+
+    Returns:
+        Tuple of (metadata dict, list of LoggedEvent)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a CameraFly event log")
+
+    offset = len(MAGIC)
+    (size,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    metadata = json.loads(data[offset:offset + size].decode('utf-8'))
+    offset += size
+
+    (name_count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    names = []
+    for _ in range(name_count):
+        length = data[offset]
+        offset += 1
+        names.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    events = []
+    for time, type_index, value_index, flags, x, y, prev_x, prev_y in _RECORD.iter_unpack(
+        data[offset:offset + count * _RECORD.size]
+    ):
+        events.append(LoggedEvent(time, names[type_index], names[value_index], flags, x, y, prev_x, prev_y))
+    return metadata, events
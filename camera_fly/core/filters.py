@@ -0,0 +1,84 @@
+from math import pi
+
+
+class OneEuroFilter:
+    """One Euro filter (Casiez et al. 2012) for a scalar signal.
+
+    Smooths slow movement strongly while following fast movement with little
+    lag. ``min_cutoff`` (Hz) sets the smoothing at rest and ``beta`` how fast
+    the cutoff rises with speed. Every update is O(1) and allocation free.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = 0.0
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, t):
+        if self._x is None:
+            self._x = x
+            self._t = t
+            return x
+
+        dt = t - self._t
+        if dt <= 0.0:
+            return self._x
+        self._t = t
+
+        dx = (x - self._x) / dt
+        self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * abs(self._dx)
+        self._x += self._alpha(cutoff, dt) * (x - self._x)
+        return self._x
+
+
+class DeltaFilter:
+    """Filter relative pointer movement by filtering the accumulated pointer position.
+
+    Args:
+        filter_x: scalar filter for the horizontal position, called as ``filter(x, t)``
+        filter_y: scalar filter for the vertical position
+        settle_distance: distance below which the output snaps to the raw position
+    """
+
+    def __init__(self, filter_x, filter_y, settle_distance=0.01):
+        self.filter_x = filter_x
+        self.filter_y = filter_y
+        self.settle_distance = settle_distance
+        self._raw_x = self._raw_y = 0.0
+        self._out_x = self._out_y = 0.0
+
+    @property
+    def settled(self):
+        return self._raw_x == self._out_x and self._raw_y == self._out_y
+
+    def __call__(self, dx, dy, t):
+        """Return the filtered (dx, dy) for the raw movement since the last call."""
+        self._raw_x += dx
+        self._raw_y += dy
+        x = self.filter_x(self._raw_x, t)
+        y = self.filter_y(self._raw_y, t)
+        if abs(self._raw_x - x) < self.settle_distance and abs(self._raw_y - y) < self.settle_distance:
+            x, y = self._raw_x, self._raw_y
+        out_dx = x - self._out_x
+        out_dy = y - self._out_y
+        self._out_x, self._out_y = x, y
+        return out_dx, out_dy
+
+
+def one_euro_delta_filter(min_cutoff, beta, d_cutoff):
+    return DeltaFilter(
+        OneEuroFilter(min_cutoff, beta, d_cutoff),
+        OneEuroFilter(min_cutoff, beta, d_cutoff),
+    )
@@ -0,0 +1,164 @@
+import numpy as np
+from .reduction import QUATERNION
+
+# Weight pulling otherwise undetermined knots towards zero, small enough not to bias a fit
+_RIDGE = 1e-9
+
+
+def hermite_basis(u, h):
+    """Cubic Hermite basis of the segment positions ``u`` in [0, 1] of segments ``h`` long.
+
+    Returns:
+        (n, 4) array weighting the start value, start slope, end value and end slope
+    """
+    u2 = u * u
+    u3 = u2 * u
+    return np.column_stack((
+        2.0 * u3 - 3.0 * u2 + 1.0,
+        (u3 - 2.0 * u2 + u) * h,
+        -2.0 * u3 + 3.0 * u2,
+        (u3 - u2) * h,
+    ))
+
+
+def _segments(times, knot_times):
+    """Segment of each sample and its cubic Hermite basis."""
+    segment = np.clip(np.searchsorted(knot_times, times, side='right') - 1, 0, len(knot_times) - 2)
+    start = knot_times[segment]
+    h = knot_times[segment + 1] - start
+    return segment, hermite_basis((times - start) / h, h)
+
+
+def _solve_block_tridiagonal(diagonal, upper, rhs):
+    """Solve a symmetric block tridiagonal system with 2x2 blocks for several right hand sides."""
+    count = len(diagonal)
+    diagonal = diagonal.copy()
+    rhs = rhs.copy()
+    for k in range(1, count):
+        # Eliminate the block below the diagonal with the previous row
+        factor = np.linalg.solve(diagonal[k - 1], upper[k - 1]).T
+        diagonal[k] -= factor @ upper[k - 1]
+        rhs[k] -= factor @ rhs[k - 1]
+
+    solution = np.empty_like(rhs)
+    solution[-1] = np.linalg.solve(diagonal[-1], rhs[-1])
+    for k in range(count - 2, -1, -1):
+        solution[k] = np.linalg.solve(diagonal[k], rhs[k] - upper[k] @ solution[k + 1])
+    return solution
+
+
+def fit_hermite(times, values, knot_times):
+    """Least squares fit of a C1 cubic Hermite spline with the given knots.
+
+    Every sample only depends on the value and slope of the two knots of its
+    segment, so the normal equations are block tridiagonal and are built for
+    all samples at once.
+
+    Args:
+        times: 1D array of increasing sample times
+        values: (n, c) array of sample values
+        knot_times: 1D array of increasing knot times spanning the samples
+
+    Returns:
+        Tuple of (knot values, knot slopes), each a (k, c) array
+    """
+    count = len(knot_times)
+    segment, basis = _segments(times, knot_times)
+    left, right = basis[:, :2], basis[:, 2:]
+
+    diagonal = np.zeros((count, 2, 2))
+    upper = np.zeros((count - 1, 2, 2))
+    rhs = np.zeros((count, 2, values.shape[1]))
+    np.add.at(diagonal, segment, left[:, :, None] * left[:, None, :])
+    np.add.at(diagonal, segment + 1, right[:, :, None] * right[:, None, :])
+    np.add.at(upper, segment, left[:, :, None] * right[:, None, :])
+    np.add.at(rhs, segment, left[:, :, None] * values[:, None, :])
+    np.add.at(rhs, segment + 1, right[:, :, None] * values[:, None, :])
+    diagonal += np.eye(2) * _RIDGE
+
+    solution = _solve_block_tridiagonal(diagonal, upper, rhs)
+    return solution[:, 0], solution[:, 1]
+
+
+def evaluate_hermite(times, knot_times, knot_values, knot_slopes):
+    segment, basis = _segments(times, knot_times)
+    return (
+        basis[:, 0, None] * knot_values[segment]
+        + basis[:, 1, None] * knot_slopes[segment]
+        + basis[:, 2, None] * knot_values[segment + 1]
+        + basis[:, 3, None] * knot_slopes[segment + 1]
+    )
+
+
+def _error(values, fitted, kind):
+    if kind == QUATERNION:
+        fitted = fitted / np.linalg.norm(fitted, axis=1, keepdims=True)
+        dot = np.abs(np.einsum('ij,ij->i', values, fitted))
+        return np.degrees(2.0 * np.arccos(np.clip(dot, 0.0, 1.0)))
+    return np.linalg.norm(values - fitted, axis=1)
+
+
+def fit_spline(times, values, groups):
+    """Fit the fewest knots that keep a C1 cubic spline within the tolerances.
+
+    Starts with a single segment and, in each pass, halves every segment
+    whose error exceeds a tolerance. All segments are refitted together, so
+    the number of passes follows the depth of the refinement and not the
+    number of knots.
+
+    Args:
+        times: 1D array of strictly increasing sample times
+        values: (n, c) array of sample values
+        groups: iterable of (columns, kind, tolerance) where columns selects
+            the value columns of the group, kind is LINEAR or QUATERNION
+            (error in degrees) and tolerance the largest error allowed
+
+    Returns:
+        Tuple of (knot indices into the samples, knot values, knot slopes)
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    groups = [(columns, kind, max(tolerance, 1e-12)) for columns, kind, tolerance in groups]
+    count = len(times)
+    knots = np.array([0, count - 1]) if count > 1 else np.array([0])
+    if count <= 2:
+        slopes = np.zeros_like(values)
+        if count == 2:
+            slopes[:] = (values[1] - values[0]) / (times[1] - times[0])
+        return knots, values.copy(), slopes
+
+    samples = np.arange(count)
+    while True:
+        knot_times = times[knots]
+        knot_values, knot_slopes = fit_hermite(times, values, knot_times)
+        fitted = evaluate_hermite(times, knot_times, knot_values, knot_slopes)
+        error = np.zeros(count)
+        for columns, kind, tolerance in groups:
+            np.maximum(error, _error(values[:, columns], fitted[:, columns], kind) / tolerance, out=error)
+
+        # Halve the segments exceeding a tolerance, unless they have no sample left to split at
+        segment = np.clip(np.searchsorted(knots, samples, side='right') - 1, 0, len(knots) - 2)
+        worst = np.zeros(len(knots) - 1)
+        np.maximum.at(worst, segment, error)
+        middle = (knots[:-1] + knots[1:]) // 2
+        split = middle[(worst > 1.0) & (middle > knots[:-1])]
+        if not len(split):
+            return knots, knot_values, knot_slopes
+        knots = np.union1d(knots, split)
+
+
+def bezier_handles(knot_times, knot_values, knot_slopes):
+    """Bezier handles reproducing a Hermite spline, a third of the neighbouring segment long.
+
+    Returns:
+        Tuple of (left handles, right handles), each a (k, 2, c) array of
+        time and value per channel
+    """
+    h = np.diff(knot_times)
+    # The end keys mirror the handle of their only segment
+    before = np.concatenate((h[:1], h))[:, None] / 3.0
+    after = np.concatenate((h, h[-1:]))[:, None] / 3.0
+    times = knot_times[:, None]
+    left = np.stack((np.broadcast_to(times - before, knot_values.shape), knot_values - knot_slopes * before), axis=1)
+    right = np.stack((np.broadcast_to(times + after, knot_values.shape), knot_values + knot_slopes * after), axis=1)
+    return left, right
@@ -0,0 +1,157 @@
+from math import asin, cos, radians, sin, sqrt
+
+import numpy as np
+
+WORLD_UP = np.array((0.0, 0.0, 1.0))
+
+# Steepest the view may look up or down, pitching past vertical would flip it over
+MAX_ELEVATION = radians(89.0)
+
+# Movement keys mapped to the basis column they move along and its sign
+# (column 0 is the bone's right axis, 1 forward and 2 up)
+MOVE_KEYS = {
+    'W': (1, 1.0),
+    'S': (1, -1.0),
+    'D': (0, 1.0),
+    'A': (0, -1.0),
+    'E': (2, 1.0),
+    'Q': (2, -1.0),
+}
+
+
+def axes(basis):
+    """Return the forward, right and up axes of a 3x3 bone matrix."""
+    basis = np.asarray(basis, dtype=np.float64)
+    return basis[..., :, 1], basis[..., :, 0], basis[..., :, 2]
+
+
+def move_direction(keys, basis):
+    """Sum the axes of the held movement keys.
+
+    Args:
+        keys: collection of held event types
+        basis: 3x3 matrix of the bone the movement is relative to
+
+    Returns:
+        Unnormalized direction as a (3,) array
+    """
+    basis = np.asarray(basis, dtype=np.float64)
+    weights = np.zeros(3)
+    for key in keys:
+        axis = MOVE_KEYS.get(key)
+        if axis is not None:
+            weights[axis[0]] += axis[1]
+    return basis @ weights
+
+
+def mouse_angles(dx, dy, rotate_speed_deg):
+    """Convert a mouse delta in pixels to yaw and pitch angles in radians."""
+    scale = radians(rotate_speed_deg) / 100.0
+    return scale * dx, scale * dy
+
+
+def rotation_matrix(axis, angle):
+    """Rotation matrix of ``angle`` radians around ``axis`` (Rodrigues' formula).
+
+    Accepts batches: ``axis`` of shape (..., 3) and ``angle`` of shape (...).
+    """
+    axis = np.asarray(axis, dtype=np.float64)
+    if axis.ndim == 1 and np.ndim(angle) == 0:
+        # Single rotations are cheaper in plain Python than through NumPy ufuncs
+        x, y, z = axis.tolist()
+        length = sqrt(x * x + y * y + z * z)
+        x, y, z = x / length, y / length, z / length
+        c = cos(angle)
+        s = sin(angle)
+        t = 1.0 - c
+        return np.array((
+            (t * x * x + c, t * x * y - s * z, t * x * z + s * y),
+            (t * x * y + s * z, t * y * y + c, t * y * z - s * x),
+            (t * x * z - s * y, t * y * z + s * x, t * z * z + c),
+        ))
+
+    axis = axis / np.linalg.norm(axis, axis=-1, keepdims=True)
+    x, y, z = axis[..., 0], axis[..., 1], axis[..., 2]
+    c = np.cos(angle)
+    s = np.sin(angle)
+    t = 1.0 - c
+
+    matrix = np.empty(np.broadcast_shapes(x.shape, np.shape(angle)) + (3, 3))
+    matrix[..., 0, 0] = t * x * x + c
+    matrix[..., 0, 1] = t * x * y - s * z
+    matrix[..., 0, 2] = t * x * z + s * y
+    matrix[..., 1, 0] = t * x * y + s * z
+    matrix[..., 1, 1] = t * y * y + c
+    matrix[..., 1, 2] = t * y * z - s * x
+    matrix[..., 2, 0] = t * x * z - s * y
+    matrix[..., 2, 1] = t * y * z + s * x
+    matrix[..., 2, 2] = t * z * z + c
+    return matrix
+
+
+def orbit(point, pivot, yaw, pitch, pitch_axis):
+    """Rotate ``point`` around ``pivot``, pitching around ``pitch_axis`` first and then yawing around world Z."""
+    rotation = rotation_matrix(WORLD_UP, yaw) @ rotation_matrix(pitch_axis, pitch)
+    offset = np.asarray(point, dtype=np.float64) - pivot
+    return pivot + (rotation @ offset[..., None])[..., 0]
+
+
+def clamp_pitch(view, pitch):
+    """Limit a pitch raising ``view`` by ``pitch`` radians to MAX_ELEVATION up or down.
+
+    Assumes a level right axis, as kept by the Track To constraint of the rig,
+    so pitching changes the elevation of the view by the pitch angle.
+    """
+    x, y, z = (float(value) for value in view)
+    length = sqrt(x * x + y * y + z * z)
+    if length == 0.0:
+        return pitch
+    elevation = asin(max(-1.0, min(1.0, z / length)))
+    return max(-MAX_ELEVATION - elevation, min(MAX_ELEVATION - elevation, pitch))
+
+
+def rotate_step(camera, aim, right, yaw, pitch, rotation_mode='CAMERA'):
+    """Apply a mouse look rotation to the Camera and Aim world positions.
+
+    Args:
+        camera: world position of the Camera bone
+        aim: world position of the Aim bone
+        right: world space right axis of the camera, used for pitching
+        yaw: yaw angle in radians
+        pitch: pitch angle in radians
+        rotation_mode: 'CAMERA' swings the aim around the camera,
+            'AIM' orbits the camera around the aim
+
+    Positive yaw moves the orbiting bone to the right. Positive pitch
+    raises the aim in 'CAMERA' mode and the camera in 'AIM' mode. The pitch
+    stops short of looking straight up or down.
+
+    Returns:
+        Tuple of the new (camera, aim) world positions
+    """
+    camera = np.asarray(camera, dtype=np.float64)
+    aim = np.asarray(aim, dtype=np.float64)
+    view = aim - camera
+    if rotation_mode == 'AIM':
+        # Raising the camera lowers the view
+        pitch = -clamp_pitch(view, -pitch)
+        return orbit(camera, aim, yaw, -pitch, right), aim
+    pitch = clamp_pitch(view, pitch)
+    return camera, orbit(aim, camera, -yaw, pitch, right)
+
+
+def transform_point(matrix, point):
+    """Transform a point by a 4x4 matrix."""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return (matrix[..., :3, :3] @ np.asarray(point, dtype=np.float64)[..., None])[..., 0] + matrix[..., :3, 3]
+
+
+def bone_location(world_point, rig_inverse, pose_offset):
+    """Convert a world position to the pose bone ``location`` placing the bone there.
+
+    Args:
+        world_point: target world position
+        rig_inverse: inverted 4x4 world matrix of the armature
+        pose_offset: difference between the bone's pose space head and its location
+    """
+    return transform_point(rig_inverse, world_point) - pose_offset
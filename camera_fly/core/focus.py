@@ -0,0 +1,42 @@
+from math import exp
+
+
+class FocusFollower:
+    """Ease a focus distance towards the results of raycasts taken at a reduced rate.
+
+    A raycast is only due every ``interval`` seconds and its hit distance is
+    reused in between. The distance approaches it exponentially with the
+    ``smoothing`` time constant in seconds.
+    """
+
+    def __init__(self, interval, smoothing, tolerance=1e-4):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.target = None
+        self.distance = None
+        self._last_query = None
+
+    @property
+    def settled(self):
+        return self.target is None or self.distance is not None and abs(self.target - self.distance) <= self.tolerance
+
+    def due(self, now):
+        return self._last_query is None or now - self._last_query >= self.interval
+
+    def set_target(self, distance, now):
+        """Use the distance of a raycast made at ``now``, None keeps the last target after a miss."""
+        self._last_query = now
+        if distance is not None:
+            self.target = distance
+
+    def step(self, distance, dt):
+        """Return the focus distance after easing ``distance`` towards the target for ``dt`` seconds."""
+        target = self.target
+        if target is None:
+            self.distance = distance
+        elif self.smoothing <= 0.0:
+            self.distance = target
+        else:
+            self.distance = distance + (target - distance) * (1.0 - exp(-dt / self.smoothing))
+        return self.distance
@@ -0,0 +1,53 @@
+import numpy as np
+
+from .flight import WORLD_UP
+
+
+def heading_frame(camera, aim, fallback_right=(1.0, 0.0, 0.0), fallback_forward=(0.0, 1.0, 0.0)):
+    """4x4 frame at the camera looking at the aim, with its up axis towards world Z.
+
+    Columns are right, forward, up and the camera position, matching the
+    axes of the dolly rig's Camera bone. The fallback axes stand in for the
+    ones a degenerate pose leaves undefined.
+    """
+    camera = np.asarray(camera, dtype=np.float64)
+    forward = np.asarray(aim, dtype=np.float64) - camera
+    length = np.linalg.norm(forward)
+    # An aim on the camera gives no direction at all
+    forward = forward / length if length > 1e-9 else np.asarray(fallback_forward, dtype=np.float64)
+    right = np.cross(forward, WORLD_UP)
+    length = np.linalg.norm(right)
+    # Looking straight up or down leaves the heading undefined
+    right = right / length if length > 1e-9 else np.asarray(fallback_right, dtype=np.float64)
+    up = np.cross(right, forward)
+
+    frame = np.eye(4)
+    frame[:3, 0] = right
+    frame[:3, 1] = forward
+    frame[:3, 2] = up
+    frame[:3, 3] = camera
+    return frame
+
+
+class Formation:
+    """Rigid formation of points following a leader camera.
+
+    The follower points are stored in the leader's heading frame once. Each
+    update moves all of them with a single batched transform.
+
+    Args:
+        leader_camera: world position of the leader's Camera bone
+        leader_aim: world position of the leader's Aim bone
+        points: (..., 3) array of follower world positions
+    """
+
+    def __init__(self, leader_camera, leader_aim, points):
+        self._frame = heading_frame(leader_camera, leader_aim)
+        inverse = np.linalg.inv(self._frame)
+        points = np.asarray(points, dtype=np.float64)
+        self.local = points @ inverse[:3, :3].T + inverse[:3, 3]
+
+    def follow(self, leader_camera, leader_aim):
+        """Return the follower world positions for the leader's current pose."""
+        self._frame = heading_frame(leader_camera, leader_aim, self._frame[:3, 0], self._frame[:3, 1])
+        return self.local @ self._frame[:3, :3].T + self._frame[:3, 3]
@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class PoseHistory:
+    """Bounded ring buffer of rig poses to step back and forward in during a session.
+
+    Each entry holds one 4x4 matrix per bone. The storage is allocated once,
+    ``record`` hands out the row to fill in place and drops the oldest entry
+    when the buffer is full.
+    """
+
+    def __init__(self, capacity, bone_count):
+        self.poses = np.zeros((capacity, bone_count, 4, 4), dtype=np.float64)
+        self.capacity = capacity
+        self._start = 0
+        self._length = 0
+        # Position of the current pose, counted from the oldest entry
+        self._cursor = -1
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def position(self):
+        return self._cursor
+
+    def clear(self):
+        self._start = 0
+        self._length = 0
+        self._cursor = -1
+
+    def _row(self, position):
+        return self.poses[(self._start + position) % self.capacity]
+
+    def record(self):
+        """Return the row to fill for a new pose after the current one.
+
+        Poses stepped back over are discarded, like a redo history.
+        """
+        self._length = self._cursor + 1
+        if self._length == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._length += 1
+        self._cursor = self._length - 1
+        return self._row(self._cursor)
+
+    def step(self, offset):
+        """Move ``offset`` poses back (negative) or forward and return that pose.
+
+        Returns:
+            The pose matrices, or None if there is no pose in that direction
+        """
+        position = min(max(self._cursor + offset, 0), self._length - 1)
+        if position == self._cursor or position < 0:
+            return None
+        self._cursor = position
+        return self._row(position)
@@ -0,0 +1,122 @@
+import json
+import logging
+import time
+from functools import wraps
+from math import frexp
+
+# Histogram buckets are powers of two in microseconds, the last one collects everything slower
+BUCKET_COUNT = 25
+
+
+def _no_log(*args, **kwargs):
+    pass
+
+
+def debug_function(logger):
+    """Return ``logger.debug`` if debug logging is enabled, otherwise a no-op.
+
+    Resolving this once per session keeps disabled logging out of the hot path.
+    """
+    return logger.debug if logger.isEnabledFor(logging.DEBUG) else _no_log
+
+
+class HandlerStats:
+    """Call count, timing totals and a log2 histogram of one handler."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = frexp(seconds * 1e6)[1] if seconds >= 1e-6 else 0
+        self.buckets[min(bucket, BUCKET_COUNT - 1)] += 1
+
+    def percentile(self, p):
+        """Upper bound of the histogram bucket holding the ``p`` percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        target = p / 100.0 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(2.0 ** bucket * 1e-6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000.0,
+            'mean_ms': self.total / self.count * 1000.0 if self.count else 0.0,
+            'min_ms': self.min * 1000.0 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000.0,
+            'p90_ms': self.percentile(90) * 1000.0,
+            'p99_ms': self.percentile(99) * 1000.0,
+            'max_ms': self.max * 1000.0,
+            'histogram_us': {f"<{2 ** i}": n for i, n in enumerate(self.buckets) if n},
+        }
+
+
+class SessionStats:
+    """Per handler timing statistics of a fly session."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.handlers = {}
+
+    def handler(self, name):
+        stats = self.handlers.get(name)
+        if stats is None:
+            stats = self.handlers[name] = HandlerStats()
+        return stats
+
+    def timed(self, name, func):
+        """Wrap ``func`` so each call is recorded under ``name``."""
+        stats = self.handler(name)
+        clock = self.clock
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.record(clock() - start)
+        return wrapper
+
+    def summary(self):
+        return {
+            'duration_s': self.clock() - self.started,
+            'handlers': {name: stats.summary() for name, stats in self.handlers.items()},
+        }
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+LOG_LEVELS = {
+    'OFF': logging.WARNING,
+    'INFO': logging.INFO,
+    'DEBUG': logging.DEBUG,
+}
+
+
+def configure_logger(logger, level_name):
+    """Set the logger to one of LOG_LEVELS, adding a stderr handler when it logs below WARNING."""
+    level = LOG_LEVELS[level_name]
+    logger.setLevel(level)
+    if level < logging.WARNING and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("CameraFly %(levelname)s: %(message)s"))
+        logger.addHandler(handler)
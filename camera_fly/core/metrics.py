@@ -0,0 +1,109 @@
+import json
+import numpy as np
+
+# Metrics that can be flagged, with the unit they are measured in
+SPIKE_METRICS = {
+    'acceleration': "units/s²",
+    'jerk': "units/s³",
+    'angular_velocity': "deg/s",
+}
+
+
+def derivatives(times, positions, order=3):
+    """Velocity, acceleration and jerk vectors of positions sampled at the given times.
+
+    Returns:
+        List of ``order`` (n, 3) arrays, one per derivative
+    """
+    result = []
+    values = positions
+    for _ in range(order):
+        values = np.gradient(values, times, axis=0)
+        result.append(values)
+    return result
+
+
+def angular_velocity(times, directions):
+    """Angular speed in degrees per second of a sequence of view directions."""
+    unit = directions / np.maximum(np.linalg.norm(directions, axis=1, keepdims=True), 1e-12)
+    dot = np.clip(np.einsum('ij,ij->i', unit[:-1], unit[1:]), -1.0, 1.0)
+    interval = np.degrees(np.arccos(dot)) / np.diff(times)
+    # Each sample takes the mean of the intervals on both sides
+    speed = np.empty(len(times))
+    speed[0] = interval[0]
+    speed[-1] = interval[-1]
+    speed[1:-1] = 0.5 * (interval[:-1] + interval[1:])
+    return speed
+
+
+def summarize(values):
+    return {
+        'mean': float(values.mean()),
+        'p95': float(np.percentile(values, 95.0)),
+        'max': float(values.max()),
+    }
+
+
+def spikes(values, threshold, frames):
+    """Runs of samples above the threshold.
+
+    Returns:
+        List of dicts with the first and last frame and the peak value of each run
+    """
+    above = np.concatenate(([0], (values > threshold).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(above))
+    return [
+        {'start': float(frames[start]), 'end': float(frames[end - 1]), 'peak': float(values[start:end].max())}
+        for start, end in zip(edges[::2], edges[1::2])
+    ]
+
+
+def analyse(frames, times, camera, aim, thresholds):
+    """Measure how smooth a flight of the Camera and Aim bones is.
+
+    Args:
+        frames: 1D array of the scene frame of each sample
+        times: 1D array of strictly increasing sample times in seconds
+        camera: (n, 3) array of Camera bone positions
+        aim: (n, 3) array of Aim bone positions
+        thresholds: dict of a SPIKE_METRICS name to the value above which it is flagged
+
+    Returns:
+        Report dict with a summary per bone and metric and the flagged spikes
+    """
+    report = {
+        'frames': [float(frames[0]), float(frames[-1])],
+        'samples': len(frames),
+        'bones': {},
+        'spikes': {},
+    }
+    series = {}
+    for name, positions in (('Camera', camera), ('Aim', aim)):
+        velocity, acceleration, jerk = (
+            np.linalg.norm(values, axis=1) for values in derivatives(times, positions)
+        )
+        report['bones'][name] = {
+            'velocity': summarize(velocity),
+            'acceleration': summarize(acceleration),
+            'jerk': summarize(jerk),
+        }
+        series[name, 'acceleration'] = acceleration
+        series[name, 'jerk'] = jerk
+
+    view = angular_velocity(times, aim - camera)
+    report['bones']['Camera']['angular_velocity'] = summarize(view)
+    series['Camera', 'angular_velocity'] = view
+
+    for (name, metric), values in series.items():
+        threshold = thresholds.get(metric)
+        if threshold:
+            flagged = spikes(values, threshold, frames)
+            if flagged:
+                report['spikes'][f"{name} {metric}"] = flagged
+    report['spike_count'] = sum(len(flagged) for flagged in report['spikes'].values())
+    return report
+
+
+def dump(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
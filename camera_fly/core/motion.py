@@ -0,0 +1,93 @@
+import time
+from math import sqrt
+
+
+class MotionIntegrator:
+    """Integrate held movement keys into a frame-rate independent displacement.
+
+    Speeds are expressed in units per second, so the distance travelled only
+    depends on the wall-clock time the keys are held and not on how often
+    Blender delivers timer events.
+    """
+
+    def __init__(self, max_dt=0.25, clock=time.perf_counter):
+        # Clamp large gaps (file saves, hitches) so the camera doesn't jump
+        self.max_dt = max_dt
+        self.clock = clock
+        self.velocity = [0.0, 0.0, 0.0]
+        self._last_time = None
+
+    def reset(self):
+        self.velocity = [0.0, 0.0, 0.0]
+        self._last_time = None
+
+    def restart(self, now=None):
+        """Measure the next tick from ``now``, e.g. after the timer was paused."""
+        self._last_time = self.clock() if now is None else now
+
+    @property
+    def moving(self):
+        return any(self.velocity)
+
+    def tick(self, now=None):
+        """Return the seconds elapsed since the previous tick."""
+        if now is None:
+            now = self.clock()
+        last = self._last_time
+        self._last_time = now
+        if last is None:
+            return 0.0
+        return min(max(now - last, 0.0), self.max_dt)
+
+    def step(self, direction, speed, dt, acceleration=0.0, deceleration=0.0):
+        """Advance the velocity towards ``direction * speed`` and return the displacement.
+
+        The velocity changes at a constant rate, so the displacement is the
+        exact distance covered during the step whatever its length.
+
+        Args:
+            direction: 3 component movement direction, normalized here
+            speed: target speed in units per second
+            dt: elapsed time in seconds
+            acceleration: units/s² used to speed up, 0 reaches the target speed instantly
+            deceleration: units/s² used to slow down, 0 stops instantly
+
+        Returns:
+            Displacement as a tuple of 3 floats
+        """
+        dx, dy, dz = direction
+        length = sqrt(dx * dx + dy * dy + dz * dz)
+        if length > 0.0:
+            scale = speed / length
+            target = (dx * scale, dy * scale, dz * scale)
+        else:
+            target = (0.0, 0.0, 0.0)
+
+        velocity = self.velocity
+        old = tuple(velocity)
+        current_speed = sqrt(old[0] ** 2 + old[1] ** 2 + old[2] ** 2)
+        target_speed = speed if length > 0.0 else 0.0
+        rate = acceleration if target_speed >= current_speed else deceleration
+
+        if rate <= 0.0:
+            velocity[:] = target
+            return (target[0] * dt, target[1] * dt, target[2] * dt)
+
+        ex = target[0] - old[0]
+        ey = target[1] - old[1]
+        ez = target[2] - old[2]
+        error = sqrt(ex * ex + ey * ey + ez * ez)
+        max_change = rate * dt
+        if error <= max_change:
+            # The velocity ramps linearly up to the target and holds it for the rest of the step
+            velocity[:] = target
+            ramp = error / rate
+            hold = dt - ramp
+            return tuple(0.5 * (v + t) * ramp + t * hold for v, t in zip(old, target))
+
+        f = max_change / error
+        velocity[0] += ex * f
+        velocity[1] += ey * f
+        velocity[2] += ez * f
+        # Linear ramp over the whole step, covered at the mean of the old and new velocity
+        return tuple(0.5 * (v + n) * dt for v, n in zip(old, velocity))
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Kinds of channel groups understood by simplify_mask
+LINEAR = 'LINEAR'
+QUATERNION = 'QUATERNION'
+
+
+def _deviation(values, index, left, right, t, kind):
+    """Distance between the values at ``index`` and the straight line between their segment keys."""
+    start = values[left]
+    interpolated = start + (values[right] - start) * t[:, None]
+    if kind == QUATERNION:
+        interpolated /= np.linalg.norm(interpolated, axis=1, keepdims=True)
+        dot = np.abs(np.einsum('ij,ij->i', values[index], interpolated))
+        return np.degrees(2.0 * np.arccos(np.clip(dot, 0.0, 1.0)))
+    return np.linalg.norm(values[index] - interpolated, axis=1)
+
+
+def simplify_mask(frames, groups):
+    """Ramer–Douglas–Peucker reduction of several channels sharing the same frames.
+
+    All segments are refined at once: every pass computes the error of every
+    remaining point against its segment and splits each segment at its worst
+    point, so the number of passes follows the depth of the recursion and
+    not the number of keys.
+
+    Args:
+        frames: 1D array of strictly increasing frames
+        groups: iterable of (values, kind, tolerance) where values is an (n, k)
+            array, kind is LINEAR or QUATERNION (deviation in degrees) and
+            tolerance the largest deviation allowed for that group
+
+    Returns:
+        Boolean mask of the keys to keep
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    groups = [(np.asarray(values, dtype=np.float64), kind, tolerance) for values, kind, tolerance in groups]
+    count = len(frames)
+    keep = np.zeros(count, dtype=bool)
+    if count <= 2:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+
+    points = np.arange(count)
+    error = np.zeros(count)
+    # Only points whose segment was split in the previous pass need a new error
+    dirty = np.ones(count, dtype=bool)
+    while True:
+        kept = np.flatnonzero(keep)
+        segment = np.minimum(np.searchsorted(kept, points, side='right') - 1, len(kept) - 2)
+
+        index = np.flatnonzero(dirty)
+        left = kept[segment[index]]
+        right = kept[segment[index] + 1]
+        t = (frames[index] - frames[left]) / (frames[right] - frames[left])
+        dirty_error = np.zeros(len(index))
+        for values, kind, tolerance in groups:
+            deviation = _deviation(values, index, left, right, t, kind)
+            np.maximum(dirty_error, deviation / max(tolerance, 1e-12), out=dirty_error)
+        error[index] = dirty_error
+        error[keep] = 0.0
+
+        segment_max = np.maximum.reduceat(error, kept[:-1])
+        split = segment_max > 1.0
+        if not split.any():
+            return keep
+
+        candidates = np.flatnonzero(split[segment] & (error == segment_max[segment]))
+        _, first = np.unique(segment[candidates], return_index=True)
+        keep[candidates[first]] = True
+        dirty = split[segment]
@@ -0,0 +1,123 @@
+import numpy as np
+
+# Column layout of a take sample: time in seconds since the take started,
+# followed by location xyz and rotation quaternion wxyz of the Camera and Aim bones
+TIME = 0
+CAMERA_LOCATION = slice(1, 4)
+CAMERA_ROTATION = slice(4, 8)
+AIM_LOCATION = slice(8, 11)
+AIM_ROTATION = slice(11, 15)
+SAMPLE_WIDTH = 15
+
+
+class TakeBuffer:
+    """Preallocated ring buffer holding the samples of a recorded take.
+
+    Rows are written in place with ``next_row`` so recording doesn't allocate
+    per tick. Once the buffer is full the oldest samples are overwritten.
+    """
+
+    def __init__(self, capacity, width=SAMPLE_WIDTH):
+        self.data = np.zeros((capacity, width), dtype=np.float64)
+        self.capacity = capacity
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def overflowed(self):
+        return self._count > self.capacity
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def next_row(self):
+        """Return the row to fill for the next sample."""
+        row = self.data[self._head]
+        self._head = (self._head + 1) % self.capacity
+        self._count += 1
+        return row
+
+    def samples(self):
+        """Return the recorded samples in chronological order."""
+        if self._count <= self.capacity:
+            return self.data[:self._count]
+        return np.concatenate((self.data[self._head:], self.data[:self._head]))
+
+
+def pack(samples):
+    """Pack take samples into a flat float32 array for storage."""
+    return np.ascontiguousarray(samples, dtype=np.float32).ravel()
+
+
+def unpack(values, width=SAMPLE_WIDTH):
+    """Return stored take samples as an (n, width) float64 array."""
+    return np.asarray(values, dtype=np.float32).reshape(-1, width).astype(np.float64)
+
+
+def slerp(start, end, t):
+    """Spherical linear interpolation between rows of unit quaternions.
+
+    Args:
+        start: (n, 4) array of quaternions
+        end: (n, 4) array of quaternions
+        t: (n,) array of interpolation factors in [0, 1]
+
+    Returns:
+        (n, 4) array of unit quaternions, taking the shorter way between each pair
+    """
+    dot = np.einsum('ij,ij->i', start, end)
+    # q and -q are the same rotation, flip to the closer one
+    end = np.where(dot[:, None] < 0.0, -end, end)
+    dot = np.abs(dot)
+    angle = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_angle = np.sin(angle)
+    # Nearly equal rotations fall back to a normalized linear interpolation
+    near = sin_angle < 1e-6
+    safe = np.where(near, 1.0, sin_angle)
+    weight_start = np.where(near, 1.0 - t, np.sin((1.0 - t) * angle) / safe)
+    weight_end = np.where(near, t, np.sin(t * angle) / safe)
+    result = weight_start[:, None] * start + weight_end[:, None] * end
+    return result / np.linalg.norm(result, axis=1, keepdims=True)
+
+
+def resample(samples, fps, step=1.0):
+    """Resample a take onto a regular grid of frames.
+
+    Locations are interpolated linearly and rotations with slerp between the
+    two samples around each frame.
+
+    Args:
+        samples: (n, SAMPLE_WIDTH) array of take samples in chronological order
+        fps: frames per second of take time, scaling the take in the animation
+        step: frames between two keys
+
+    Returns:
+        Tuple of (frame offsets from the start of the take, (k, SAMPLE_WIDTH)
+        array of the resampled samples with their take times). A take that
+        overflowed its buffer lost its first samples, its grid starts at the
+        frame of the first one kept.
+    """
+    sample_frames = samples[:, TIME] * fps
+    if not len(samples):
+        return sample_frames, samples.copy()
+    # Step on the frames of the whole take, from the grid frame nearest to the first sample
+    first = np.floor(sample_frames[0] / step + 0.5) * step
+    if len(samples) < 2:
+        return np.array([first]), samples.copy()
+
+    frames = np.arange(first, max(sample_frames[-1], first) + step * 0.5, step)
+    after = np.clip(np.searchsorted(sample_frames, frames, side='right'), 1, len(samples) - 1)
+    before = after - 1
+    span = sample_frames[after] - sample_frames[before]
+    t = np.clip((frames - sample_frames[before]) / np.where(span > 0.0, span, 1.0), 0.0, 1.0)
+
+    start, end = samples[before], samples[after]
+    result = start + (end - start) * t[:, None]
+    result[:, TIME] = frames / fps
+    for rotation in (CAMERA_ROTATION, AIM_ROTATION):
+        result[:, rotation] = slerp(start[:, rotation], end[:, rotation], t)
+    return frames, result
@@ -0,0 +1,497 @@
+import re
+import bpy
+import numpy as np
+from mathutils import Matrix, Quaternion
+from .core import fitting, reduction, takes
+
+# Per key attributes kept when an F-Curve is rebuilt in bulk
+_KEY_ATTRIBUTES = (
+    ('co', 2, np.float32),
+    ('handle_left', 2, np.float32),
+    ('handle_right', 2, np.float32),
+    ('interpolation', 1, np.int32),
+    ('handle_left_type', 1, np.int32),
+    ('handle_right_type', 1, np.int32),
+    ('type', 1, np.int32),
+)
+
+# Enum values of keyframe_points for foreach_set
+_INTERPOLATION_LINEAR = 1
+_INTERPOLATION_BEZIER = 2
+_HANDLE_ALIGNED = 3
+
+
+def ensure_action(rig):
+    """Return the action of the rig, creating one if needed."""
+    anim_data = rig.animation_data or rig.animation_data_create()
+    if anim_data.action is None:
+        anim_data.action = bpy.data.actions.new(rig.name + "Action")
+    return anim_data.action
+
+
+def ensure_fcurve(rig, data_path, index, group=""):
+    """Find or create the F-Curve animating ``data_path[index]`` of the rig."""
+    action = ensure_action(rig)
+    # Blender 4.4+ stores F-Curves per action slot
+    if hasattr(action, 'fcurve_ensure_for_datablock'):
+        return action.fcurve_ensure_for_datablock(rig, data_path, index=index, group_name=group)
+
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+    return fcurve
+
+
+def action_fcurves(rig):
+    """Return the F-Curves animating the rig."""
+    anim_data = rig.animation_data
+    if anim_data is None or anim_data.action is None:
+        return []
+
+    action = anim_data.action
+    slot = getattr(anim_data, 'action_slot', None)
+    if slot is not None:
+        from bpy_extras import anim_utils
+        channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
+        return list(channelbag.fcurves) if channelbag else []
+    return list(action.fcurves)
+
+
+_BONE_PATH = re.compile(r'^pose\.bones\["((?:[^"\\]|\\.)*)"\]\.(\w+)$')
+
+
+def bone_fcurves(rig, bone_names):
+    """Group the rig's F-Curves of the given bones by (bone name, property).
+
+    Returns:
+        dict mapping (bone name, property) to the F-Curves sorted by array index
+    """
+    channels = {}
+    for fcurve in action_fcurves(rig):
+        match = _BONE_PATH.match(fcurve.data_path)
+        if not match:
+            continue
+        bone_name = match.group(1).replace('\\"', '"').replace('\\\\', '\\')
+        if bone_name in bone_names:
+            channels.setdefault((bone_name, match.group(2)), []).append(fcurve)
+    for curves in channels.values():
+        curves.sort(key=lambda fcurve: fcurve.array_index)
+    return channels
+
+
+def mute_bone_fcurves(rig, bone_names):
+    """Mute the F-Curves of the given bones.
+
+    Returns:
+        List of the F-Curves muted by this call
+    """
+    muted = [
+        fcurve for curves in bone_fcurves(rig, bone_names).values()
+        for fcurve in curves if not fcurve.mute
+    ]
+    for fcurve in muted:
+        fcurve.mute = True
+    return muted
+
+
+def keyed_frame_range(rig, bone_names):
+    """Return the first and last keyed frame of the bones, or None without keys."""
+    frames = [
+        fcurve.range()
+        for curves in bone_fcurves(rig, bone_names).values()
+        for fcurve in curves
+        if len(fcurve.keyframe_points)
+    ]
+    if not frames:
+        return None
+    return min(start for start, _ in frames), max(end for _, end in frames)
+
+
+def bone_location_samples(rig, bone_name, frames):
+    """Evaluate the location of a pose bone's action at each frame.
+
+    Returns:
+        (n, 3) array, unkeyed axes keep the bone's current location
+    """
+    bone = rig.pose.bones[bone_name]
+    samples = np.tile(np.array(bone.location, dtype=np.float64), (len(frames), 1))
+    for fcurve in bone_fcurves(rig, [bone_name]).get((bone_name, 'location'), ()):
+        evaluate = fcurve.evaluate
+        samples[:, fcurve.array_index] = np.fromiter((evaluate(frame) for frame in frames), np.float64, len(frames))
+    return samples
+
+
+def read_keys(fcurve):
+    """Read all key attributes of an F-Curve into a dict of arrays."""
+    kps = fcurve.keyframe_points
+    count = len(kps)
+    keys = {}
+    for name, width, dtype in _KEY_ATTRIBUTES:
+        values = np.empty(count * width, dtype=dtype)
+        kps.foreach_get(name, values)
+        keys[name] = values.reshape(count, width) if width > 1 else values
+    return keys
+
+
+def write_keys(fcurve, frames, values):
+    """Write keys in one bulk operation, replacing existing keys inside the frame range.
+
+    Args:
+        fcurve: F-Curve to write to
+        frames: sorted 1D array of frames
+        values: 1D array of values, same length as frames
+
+    Returns:
+        Number of keys on the F-Curve afterwards
+    """
+    kps = fcurve.keyframe_points
+    new_co = np.column_stack((frames, values)).astype(np.float32)
+
+    old = read_keys(fcurve) if len(kps) else None
+    if old is not None:
+        old_frames = old['co'][:, 0]
+        keep = (old_frames < frames[0]) | (old_frames > frames[-1])
+        old = {name: array[keep] for name, array in old.items()}
+        kps.clear()
+
+    kps.add(len(new_co))
+    if old is None or not len(old['co']):
+        kps.foreach_set('co', new_co.ravel())
+        # Handles are placed on the keys and recalculated by update()
+        kps.foreach_set('handle_left', new_co.ravel())
+        kps.foreach_set('handle_right', new_co.ravel())
+    else:
+        # Existing keys are appended after the new ones and keep their settings,
+        # update() sorts everything back into chronological order
+        defaults = read_keys(fcurve)
+        defaults['co'] = new_co
+        defaults['handle_left'] = new_co
+        defaults['handle_right'] = new_co
+        kps.add(len(old['co']))
+        for name, _, _ in _KEY_ATTRIBUTES:
+            kps.foreach_set(name, np.concatenate((defaults[name], old[name])).ravel())
+
+    fcurve.update()
+    return len(kps)
+
+
+def rotation_channels(bone):
+    """Return the data path and channel count of the bone's active rotation."""
+    if bone.rotation_mode == 'QUATERNION':
+        return 'rotation_quaternion', 4
+    if bone.rotation_mode == 'AXIS_ANGLE':
+        return 'rotation_axis_angle', 4
+    return 'rotation_euler', 3
+
+
+def rotation_values(bone, quaternions):
+    """Convert an (n, 4) quaternion array to the bone's rotation channels."""
+    mode = bone.rotation_mode
+    if mode == 'QUATERNION':
+        return quaternions
+    if mode == 'AXIS_ANGLE':
+        values = np.empty_like(quaternions)
+        for i, q in enumerate(quaternions):
+            axis, angle = Quaternion(q).to_axis_angle()
+            values[i] = (angle, *axis)
+        return values
+
+    values = np.empty((len(quaternions), 3))
+    previous = None
+    for i, q in enumerate(quaternions):
+        euler = Quaternion(q).to_euler(mode, previous) if previous is not None else Quaternion(q).to_euler(mode)
+        values[i] = euler
+        previous = euler
+    return values
+
+
+def write_take(rig, camera_bone, aim_bone, samples, frame_start, fps, step=1.0):
+    """Bake recorded take samples into the rig's action, one key per frame step.
+
+    Args:
+        rig: armature object of the dolly rig
+        camera_bone: Camera pose bone
+        aim_bone: Aim pose bone
+        samples: (n, SAMPLE_WIDTH) array of take samples
+        frame_start: frame the take starts at
+        fps: frames per second of take time
+        step: frames between two keys
+
+    Returns:
+        Number of keys written per channel
+    """
+    if not len(samples):
+        return 0
+
+    offsets, samples = takes.resample(samples, fps, step)
+    frames = frame_start + offsets
+    channels = (
+        (camera_bone, takes.CAMERA_LOCATION, takes.CAMERA_ROTATION),
+        (aim_bone, takes.AIM_LOCATION, takes.AIM_ROTATION),
+    )
+    for bone, location, rotation in channels:
+        base_path = f'pose.bones["{bpy.utils.escape_identifier(bone.name)}"].'
+        loc_values = samples[:, location]
+        for index in range(3):
+            fcurve = ensure_fcurve(rig, base_path + 'location', index, bone.name)
+            write_keys(fcurve, frames, loc_values[:, index])
+
+        rot_path, rot_count = rotation_channels(bone)
+        rot_values = rotation_values(bone, samples[:, rotation])
+        for index in range(rot_count):
+            fcurve = ensure_fcurve(rig, base_path + rot_path, index, bone.name)
+            write_keys(fcurve, frames, rot_values[:, index])
+
+    return len(frames)
+
+
+def find_key_index(keyframe_points, frame):
+    """Binary search the first key at or after ``frame``."""
+    lo, hi = 0, len(keyframe_points)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if keyframe_points[mid].co[0] < frame:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def insert_key(fcurve, frame, value):
+    """Insert a key or replace the value of the key already on ``frame``.
+
+    Finding the key is a binary search. Handles are not recalculated here,
+    the caller recalculates each curve once after its last insert, see
+    KeyframeWriter.finish.
+    """
+    kps = fcurve.keyframe_points
+    index = find_key_index(kps, frame)
+    if index < len(kps) and abs(kps[index].co[0] - frame) < 1e-4:
+        key = kps[index]
+        offset = value - key.co[1]
+        key.co[1] = value
+        key.handle_left[1] += offset
+        key.handle_right[1] += offset
+    else:
+        kps.insert(frame, value, options={'FAST'})
+
+
+class KeyframeWriter:
+    """Insert keys on the Camera and Aim bones through F-Curves resolved once per session.
+
+    Recalculating the handles of a curve walks all its keys, so it is left
+    to ``finish``, called when the insert key is released and at the end of
+    the session, instead of every insert.
+    """
+
+    def __init__(self, rig, bones):
+        self._channels = {'LOC': [], 'ROT': [], 'SCALE': []}
+        self._touched = set()
+        for bone in bones:
+            base_path = f'pose.bones["{bpy.utils.escape_identifier(bone.name)}"].'
+            rot_path, rot_count = rotation_channels(bone)
+            for group, prop, count in (
+                ('LOC', 'location', 3),
+                ('ROT', rot_path, rot_count),
+                ('SCALE', 'scale', 3),
+            ):
+                for index in range(count):
+                    fcurve = ensure_fcurve(rig, base_path + prop, index, bone.name)
+                    self._channels[group].append((fcurve, bone, prop, index))
+
+    def insert(self, frame, keyframe_type='ALL'):
+        """Key the current bone transforms on ``frame``.
+
+        Args:
+            frame: frame to key
+            keyframe_type: 'ALL', 'LOC', 'ROT' or 'SCALE'
+
+        Returns:
+            Number of channels keyed
+        """
+        groups = ('LOC', 'ROT', 'SCALE') if keyframe_type == 'ALL' else (keyframe_type,)
+        count = 0
+        for group in groups:
+            for fcurve, bone, prop, index in self._channels[group]:
+                insert_key(fcurve, frame, getattr(bone, prop)[index])
+                count += 1
+        self._touched.update(groups)
+        return count
+
+    def finish(self):
+        """Recalculate the handles of the curves keyed since the last call."""
+        for group in self._touched:
+            for fcurve, _bone, _prop, _index in self._channels[group]:
+                fcurve.keyframe_points.handles_recalc()
+        self._touched.clear()
+
+
+def keep_keys(fcurve, keys, mask):
+    """Rebuild an F-Curve with only the keys selected by ``mask``."""
+    kps = fcurve.keyframe_points
+    kps.clear()
+    kps.add(int(mask.sum()))
+    for name, _, _ in _KEY_ATTRIBUTES:
+        kps.foreach_set(name, keys[name][mask].ravel())
+    fcurve.update()
+
+
+def _key_clusters(rig, bone_names, location_tolerance, rotation_tolerance):
+    """Group the channels of the bones keyed on the same frames.
+
+    Returns:
+        List of (frames, groups, curve_keys) where groups holds a
+        (values, kind, tolerance) tuple per property and curve_keys the
+        (fcurve, keys) of every channel, in the column order of the groups
+    """
+    clusters = {}
+    for (_, prop), curves in bone_fcurves(rig, bone_names).items():
+        curve_keys = [(fcurve, read_keys(fcurve)) for fcurve in curves]
+        frames = [keys['co'][:, 0] for _, keys in curve_keys]
+        if all(np.array_equal(frames[0], other) for other in frames[1:]):
+            parts = [curve_keys]
+        else:
+            parts = [[item] for item in curve_keys]
+
+        for part in parts:
+            values = np.column_stack([keys['co'][:, 1] for _, keys in part]).astype(np.float64)
+            if prop == 'rotation_quaternion' and len(part) == 4:
+                group = (values, reduction.QUATERNION, rotation_tolerance)
+            elif prop.startswith('rotation'):
+                # Euler angles, axis angles and partially keyed quaternions are compared per component
+                group = (values, reduction.LINEAR, np.radians(rotation_tolerance))
+            else:
+                group = (values, reduction.LINEAR, location_tolerance)
+            cluster_frames = part[0][1]['co'][:, 0]
+            cluster = clusters.setdefault(cluster_frames.tobytes(), (cluster_frames, [], []))
+            cluster[1].append(group)
+            cluster[2].extend(part)
+    return list(clusters.values())
+
+
+def reduce_bone_keys(rig, bone_names, location_tolerance, rotation_tolerance):
+    """Remove keys from the bones' F-Curves that stay within the tolerances.
+
+    Channels keyed on the same frames are reduced together so the bones
+    keep their keys aligned. The error is measured against straight lines
+    between the kept keys, so the reduced keys get linear interpolation.
+    Bezier handles recalculated on the kept keys could overshoot the
+    tolerance.
+
+    Args:
+        rig: armature object of the dolly rig
+        bone_names: names of the bones to reduce
+        location_tolerance: largest location and scale error in scene units
+        rotation_tolerance: largest rotation error in degrees
+
+    Returns:
+        Tuple of (keys before, keys removed)
+    """
+    total = removed = 0
+    for frames, groups, curve_keys in _key_clusters(rig, bone_names, location_tolerance, rotation_tolerance):
+        total += len(frames) * len(curve_keys)
+        if len(frames) <= 2:
+            continue
+        mask = reduction.simplify_mask(frames, groups)
+        dropped = len(frames) - int(mask.sum())
+        if not dropped:
+            continue
+        removed += dropped * len(curve_keys)
+        for fcurve, keys in curve_keys:
+            keys['interpolation'] = np.full_like(keys['interpolation'], _INTERPOLATION_LINEAR)
+            keep_keys(fcurve, keys, mask)
+    return total, removed
+
+
+def write_bezier_keys(fcurve, frames, values, handle_left, handle_right):
+    """Replace all keys of an F-Curve by Bezier keys with aligned handles."""
+    kps = fcurve.keyframe_points
+    count = len(frames)
+    kps.clear()
+    kps.add(count)
+    kps.foreach_set('co', np.column_stack((frames, values)).astype(np.float32).ravel())
+    kps.foreach_set('handle_left', np.asarray(handle_left, dtype=np.float32).ravel())
+    kps.foreach_set('handle_right', np.asarray(handle_right, dtype=np.float32).ravel())
+    kps.foreach_set('interpolation', np.full(count, _INTERPOLATION_BEZIER, dtype=np.int32))
+    aligned = np.full(count, _HANDLE_ALIGNED, dtype=np.int32)
+    kps.foreach_set('handle_left_type', aligned)
+    kps.foreach_set('handle_right_type', aligned)
+    fcurve.update()
+
+
+def _group_columns(groups):
+    """Stack the values of channel groups and return the columns of each group for fitting."""
+    columns = []
+    start = 0
+    for values, kind, tolerance in groups:
+        width = values.shape[1]
+        columns.append((slice(start, start + width), kind, tolerance))
+        start += width
+    return np.hstack([values for values, _, _ in groups]), columns
+
+
+def fit_bone_keys(rig, bone_names, location_tolerance, rotation_tolerance):
+    """Replace the keys of the bones' F-Curves by the fewest Bezier keys fitting them within the tolerances.
+
+    Channels keyed on the same frames are fitted together and keep their
+    keys aligned. The handles are fitted as well, so they are aligned
+    rather than automatic.
+
+    Returns:
+        Tuple of (keys before, keys after)
+    """
+    total = fitted = 0
+    for frames, groups, curve_keys in _key_clusters(rig, bone_names, location_tolerance, rotation_tolerance):
+        total += len(frames) * len(curve_keys)
+        frames = frames.astype(np.float64)
+        values, columns = _group_columns(groups)
+        knots, knot_values, knot_slopes = fitting.fit_spline(frames, values, columns)
+        if len(knots) >= len(frames):
+            # The keys can't be fitted with fewer keys, keep them
+            fitted += len(frames) * len(curve_keys)
+            continue
+
+        knot_frames = frames[knots]
+        left, right = fitting.bezier_handles(knot_frames, knot_values, knot_slopes)
+        for column, (fcurve, _) in enumerate(curve_keys):
+            write_bezier_keys(fcurve, knot_frames, knot_values[:, column], left[:, :, column], right[:, :, column])
+        fitted += len(knots) * len(curve_keys)
+    return total, fitted
+
+
+def fit_bone_path(rig, bone_name, tolerance, collection):
+    """Create a Bezier curve object following the keyed path of a bone within the tolerance.
+
+    Returns:
+        The curve object or None if the bone has no location keyed on the same frames on all axes
+    """
+    curves = bone_fcurves(rig, [bone_name]).get((bone_name, 'location'))
+    if not curves or len(curves) != 3:
+        return None
+    keys = [read_keys(fcurve)['co'] for fcurve in curves]
+    frames = keys[0][:, 0].astype(np.float64)
+    if len(frames) < 2 or not all(np.array_equal(keys[0][:, 0], other[:, 0]) for other in keys[1:]):
+        return None
+
+    values = np.column_stack([co[:, 1] for co in keys]).astype(np.float64)
+    knots, knot_values, knot_slopes = fitting.fit_spline(frames, values, [(slice(0, 3), reduction.LINEAR, tolerance)])
+    left, right = fitting.bezier_handles(frames[knots], knot_values, knot_slopes)
+
+    curve = bpy.data.curves.new(f"{rig.name}_{bone_name}_Path", 'CURVE')
+    curve.dimensions = '3D'
+    spline = curve.splines.new('BEZIER')
+    points = spline.bezier_points
+    points.add(len(knots) - 1)
+    points.foreach_set('co', knot_values.astype(np.float32).ravel())
+    points.foreach_set('handle_left', left[:, 1].astype(np.float32).ravel())
+    points.foreach_set('handle_right', right[:, 1].astype(np.float32).ravel())
+    aligned = np.full(len(knots), _HANDLE_ALIGNED, dtype=np.int32)
+    points.foreach_set('handle_left_type', aligned)
+    points.foreach_set('handle_right_type', aligned)
+
+    obj = bpy.data.objects.new(curve.name, curve)
+    collection.objects.link(obj)
+    # Locations are relative to the bone's rest position in the rig
+    bone = rig.pose.bones[bone_name]
+    obj.matrix_world = rig.matrix_world @ Matrix.Translation(bone.matrix.translation - bone.matrix_basis.translation)
+    return obj
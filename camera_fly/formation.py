@@ -0,0 +1,97 @@
+import numpy as np
+from . import adapter
+from .core import flight
+from .core.formation import Formation
+
+
+def formation_rigs(settings, leader_rig):
+    """Return the dolly rigs in the formation collection, without the leader."""
+    collection = settings.formation_collection
+    if collection is None:
+        return []
+
+    rigs = []
+    for obj in collection.all_objects:
+        if obj.type == 'CAMERA':
+            camera = obj
+        elif obj.type == 'ARMATURE':
+            camera = next((child for child in obj.children if child.type == 'CAMERA'), None)
+        else:
+            continue
+        if not settings.is_valid_dolly_rig(camera):
+            continue
+        rig = camera.parent
+        if rig != leader_rig and rig not in rigs and 'Camera' in rig.pose.bones:
+            rigs.append(rig)
+    return rigs
+
+
+class FormationRigs:
+    """Dolly rigs flying in formation with the leader rig of a fly session.
+
+    Offsets to the leader are taken when the formation is created. Each
+    update transforms the Camera and Aim bones of all rigs in one batch and
+    writes every rig back with a single foreach_set. The pose bones of each
+    armature are a separate collection, so the writes can't be merged across
+    rigs.
+    """
+
+    def __init__(self, session, rigs):
+        self.session = session
+        self.rigs = rigs
+
+        leader_camera, leader_aim = self.leader_positions()
+        count = len(rigs)
+        self._rig_inverse = np.empty((count, 4, 4))
+        self._pose_offset = np.empty((count, 2, 3))
+        self._bone_index = np.empty((count, 2), dtype=np.int64)
+        self._locations = []
+        self.initial_locations = []
+        points = np.empty((count, 2, 3))
+
+        for i, rig in enumerate(rigs):
+            rig_matrix = adapter.array(rig.matrix_world)
+            self._rig_inverse[i] = np.linalg.inv(rig_matrix)
+            bones = rig.pose.bones
+            locations = np.empty(len(bones) * 3, dtype=np.float32)
+            bones.foreach_get('location', locations)
+            self._locations.append(locations.reshape(-1, 3))
+            self.initial_locations.append(locations.copy())
+
+            for j, name in enumerate(('Camera', 'Aim')):
+                bone = bones[name]
+                self._bone_index[i, j] = bones.find(name)
+                self._pose_offset[i, j] = adapter.array(bone.matrix.translation - bone.matrix_basis.translation)
+                points[i, j] = flight.transform_point(rig_matrix, adapter.array(bone.matrix.translation))
+
+        self.formation = Formation(leader_camera, leader_aim, points)
+
+    def leader_positions(self):
+        """World positions of the leader's Camera and Aim bones from their current locations.
+
+        Uses the locations written this tick instead of the evaluated bone
+        matrices, which only update with the next depsgraph evaluation.
+        """
+        session = self.session
+        if session.rig_moved:
+            session.update_rig_matrix()
+        return [
+            flight.transform_point(session.rig_matrix, adapter.array(bone.location) + session.pose_offsets[bone.name])
+            for bone in (session.camera_bone, session.aim_bone)
+        ]
+
+    def update(self):
+        if not self.rigs:
+            return
+        world = self.formation.follow(*self.leader_positions())
+        locations = flight.bone_location(world, self._rig_inverse[:, None], self._pose_offset)
+        for i, rig in enumerate(self.rigs):
+            rig_locations = self._locations[i]
+            rig_locations[self._bone_index[i]] = locations[i]
+            rig.pose.bones.foreach_set('location', rig_locations.ravel())
+            rig.update_tag()
+
+    def restore(self):
+        for rig, locations in zip(self.rigs, self.initial_locations):
+            rig.pose.bones.foreach_set('location', locations)
+            rig.update_tag()
@@ -1,8 +1,113 @@
+import logging
+import time
 import bpy
+import numpy as np
 from bpy.types import PropertyGroup
 from bpy.props import FloatProperty
-from math import radians
-from mathutils import Matrix, Vector
+from math import ceil
+from mathutils import Vector
+from . import adapter
+from .rig_index import dolly_rigs, is_dolly_rig_camera
+from .core import filters, flight, focus, history, instrumentation, takes
+from .core.motion import MotionIntegrator
+
+log = logging.getLogger(__name__)
+
+# Settings stored with an event log so a replay flies with the same parameters
+REPLAY_SETTINGS = (
+    'move_speed', 'move_acceleration', 'move_deceleration', 'rotate_speed_deg',
+    'aim_distance_step', 'rotation_mode', 'keyframe_type', 'update_rate', 'idle_heartbeat',
+    'take_target', 'take_max_seconds', 'take_time_scale', 'mouse_filter', 'filter_min_cutoff', 'filter_beta',
+    'filter_d_cutoff', 'history_size', 'history_interval', 'collision_enabled', 'collision_source',
+    'collision_radius', 'ground_follow', 'ground_height', 'autofocus_enabled', 'autofocus_rate',
+    'autofocus_smoothing', 'autofocus_max_distance',
+)
+
+
+def take_frame_rate(scene, synced=False):
+    """Frames of the animation per second of take time, following the time remapping of the scene.
+
+    Takes recorded on timeline playback already hold the frames they were
+    captured on, they are neither scaled nor remapped.
+    """
+    render = scene.render
+    fps = render.fps / render.fps_base
+    if synced:
+        return fps
+    settings = scene.camerafly_settings
+    return fps * render.frame_map_old / render.frame_map_new * settings.take_time_scale
+
+
+def apply_logged_settings(settings, metadata):
+    """Apply the settings of an event log.
+
+    A value the properties reject, e.g. an enum item renamed since the log
+    was written, is skipped and the current value kept.
+
+    Returns:
+        Tuple of (dict of the replaced values, for restore_settings once the
+        replay ends, list of the names of the skipped settings)
+    """
+    previous = {name: getattr(settings, name) for name in REPLAY_SETTINGS}
+    skipped = []
+    for name, value in metadata.get('settings', {}).items():
+        if name not in REPLAY_SETTINGS:
+            continue
+        try:
+            setattr(settings, name, value)
+        except (TypeError, ValueError) as e:
+            log.warning("Skipped logged setting %s=%r: %s", name, value, e)
+            skipped.append(name)
+    return previous, skipped
+
+
+def restore_settings(settings, values):
+    for name, value in values.items():
+        setattr(settings, name, value)
+
+
+class CameraFlyTake(PropertyGroup):
+    """A recorded flight kept as packed samples until it is promoted to keys.
+
+    The samples are stored in the "samples" ID property as a flat float32
+    array, see core.takes for the layout.
+    """
+
+    camera: bpy.props.PointerProperty(
+        type=bpy.types.Object,
+        name="Camera",
+        description="Camera of the dolly rig the take was flown with",
+    )
+
+    frame_start: bpy.props.IntProperty(
+        name="Start Frame",
+        description="Frame the take starts at",
+    )
+
+    sample_count: bpy.props.IntProperty(
+        name="Samples",
+        description="Number of recorded samples",
+    )
+
+    duration: FloatProperty(
+        name="Duration",
+        description="Length of the take in seconds",
+        unit='TIME_ABSOLUTE',
+    )
+
+    synced: bpy.props.BoolProperty(
+        name="Timeline",
+        description="Recorded on the frames of timeline playback",
+    )
+
+    def store(self, samples):
+        self["samples"] = takes.pack(samples)
+        self.sample_count = len(samples)
+        # A take that overflowed its buffer starts at its first kept sample
+        self.duration = float(samples[-1, takes.TIME] - samples[0, takes.TIME]) if len(samples) else 0.0
+
+    def samples(self):
+        return takes.unpack(self.get("samples", ()))
 
 
 class CameraFlyProperties(PropertyGroup):
@@ -12,29 +117,37 @@ class CameraFlyProperties(PropertyGroup):
         if not obj or obj.type != 'CAMERA':
             return False
 
-        # Check if the camera is part of a valid dolly rig
-        if not self.is_valid_dolly_rig(obj):
-            return False
-
-        return True
+        # Check if the camera is part of a valid dolly rig, looked up in the maintained index
+        return obj in dolly_rigs
 
     def is_valid_dolly_rig(self, camera):
         """Check if the camera is part of a valid dolly rig."""
-        if not camera or not camera.parent or camera.parent.type != 'ARMATURE':
-            return False
-
-        rig = camera.parent
-        if 'Root' not in rig.pose.bones or 'Aim' not in rig.pose.bones:
-            return False
-
-        return True
+        return is_dolly_rig_camera(camera)
 
     move_speed: FloatProperty(
         name="Move Speed",
-        description="Movement speed for bone transformation",
-        default=0.1,
-        min=0.01,
-        max=100.0,
+        description="Movement speed for bone transformation in units per second",
+        default=5.0,
+        min=0.1,
+        max=1000.0,
+        update=lambda self, context: None  # Needed for undo/redo
+    )
+
+    move_acceleration: FloatProperty(
+        name="Acceleration",
+        description="How fast the camera reaches the move speed in units per second². 0 starts instantly",
+        default=0.0,
+        min=0.0,
+        max=10000.0,
+        update=lambda self, context: None  # Needed for undo/redo
+    )
+
+    move_deceleration: FloatProperty(
+        name="Deceleration",
+        description="How fast the camera comes to a stop in units per second². 0 stops instantly",
+        default=0.0,
+        min=0.0,
+        max=10000.0,
         update=lambda self, context: None  # Needed for undo/redo
     )
 
@@ -56,6 +169,180 @@ class CameraFlyProperties(PropertyGroup):
         update=lambda self, context: None  # Needed for undo/redo
     )
 
+    keyframe_type: bpy.props.EnumProperty(
+        name="Keyframe Type",
+        description="Channels keyed with the I shortcut",
+        items=[
+            ('ALL', "All", "Location, Rotation & Scale"),
+            ('LOC', "Location", "Location only"),
+            ('ROT', "Rotation", "Rotation only"),
+            ('SCALE', "Scale", "Scale only"),
+        ],
+        default='ALL',
+        update=lambda self, context: None  # Needed for undo/redo
+    )
+
+    reduce_location_tolerance: FloatProperty(
+        name="Location Tolerance",
+        description="Largest location error allowed when reducing keys, in scene units",
+        default=0.01,
+        min=0.0,
+        max=10.0,
+        precision=4,
+        update=lambda self, context: None  # Needed for undo/redo
+    )
+
+    reduce_rotation_tolerance: FloatProperty(
+        name="Rotation Tolerance",
+        description="Largest rotation error allowed when reducing keys, in degrees",
+        default=0.5,
+        min=0.0,
+        max=45.0,
+        update=lambda self, context: None  # Needed for undo/redo
+    )
+
+    update_rate: bpy.props.EnumProperty(
+        name="Update Rate",
+        description="How often the rig is updated while flying",
+        items=[
+            ('SCENE', "Scene", "Update at the scene frame rate"),
+            ('VIEWPORT', "Viewport", "Update at the scene frame rate, slowed down when the viewport redraws slower"),
+            ('FIXED', "Fixed", "Update 50 times per second"),
+        ],
+        default='SCENE',
+    )
+
+    idle_heartbeat: FloatProperty(
+        name="Idle Heartbeat",
+        description="Seconds between updates while no key is held and the mouse is still. 0 pauses updates",
+        default=0.0,
+        min=0.0,
+        max=10.0,
+    )
+
+    take_target: bpy.props.EnumProperty(
+        name="Take Target",
+        description="Where recorded takes go",
+        items=[
+            ('STORE', "Take List", "Keep the take in the take list until it is promoted to keys"),
+            ('ACTION', "Action", "Write the take into the rig's action right away"),
+        ],
+        default='STORE',
+    )
+
+    take_sync: bpy.props.EnumProperty(
+        name="Take Timing",
+        description="When the rig is sampled while a take is recorded",
+        items=[
+            ('TIMER', "Free Running", "Sample the rig on every update of the fly session"),
+            ('PLAYBACK', "Timeline", "Play the timeline and sample the rig on every scene frame it shows"),
+        ],
+        default='TIMER',
+    )
+
+    take_time_scale: FloatProperty(
+        name="Take Time Scale",
+        description="Length of a take in the animation relative to the time it was flown. "
+                    "0.5 plays a take back at twice the speed it was flown",
+        default=1.0,
+        min=0.01,
+        max=100.0,
+    )
+
+    takes: bpy.props.CollectionProperty(type=CameraFlyTake)
+
+    active_take_index: bpy.props.IntProperty(name="Active Take")
+
+    take_max_seconds: FloatProperty(
+        name="Max Take Length",
+        description="Length of the take recording buffer in seconds. Older samples are dropped once it is full",
+        default=600.0,
+        min=1.0,
+        max=7200.0,
+        update=lambda self, context: None  # Needed for undo/redo
+    )
+
+    history_size: bpy.props.IntProperty(
+        name="Pose History",
+        description="Poses kept to step back and forward in while flying, 0 disables the history",
+        default=100,
+        min=0,
+        max=10000,
+    )
+
+    history_interval: FloatProperty(
+        name="History Interval",
+        description="Seconds between pose snapshots while the rig moves, 0 only stores a pose on each keyframe",
+        default=1.0,
+        min=0.0,
+        max=60.0,
+    )
+
+    log_level: bpy.props.EnumProperty(
+        name="Log Level",
+        description="Messages printed to the console while flying",
+        items=[
+            ('OFF', "Off", "Only warnings"),
+            ('INFO', "Info", "Session events"),
+            ('DEBUG', "Debug", "Per event details, slows down flying"),
+        ],
+        default='OFF',
+    )
+
+    instrumentation_enabled: bpy.props.BoolProperty(
+        name="Collect Timings",
+        description="Time the handlers of the fly operator",
+        default=False,
+    )
+
+    stats_path: bpy.props.StringProperty(
+        name="Stats File",
+        description="JSON file the handler timings are written to at the end of a session",
+        default="",
+        subtype='FILE_PATH',
+    )
+
+    record_events: bpy.props.BoolProperty(
+        name="Record Events",
+        description="Write every event of a fly session to the event log for replaying it later",
+        default=False,
+    )
+
+    event_log_path: bpy.props.StringProperty(
+        name="Event Log",
+        description="Binary file the events of a fly session are written to",
+        default="",
+        subtype='FILE_PATH',
+    )
+
+    metrics_max_acceleration: FloatProperty(
+        name="Max Acceleration",
+        description="Acceleration of the Camera or Aim bone flagged as a spike, in units per second squared",
+        default=50.0,
+        min=0.0,
+    )
+
+    metrics_max_jerk: FloatProperty(
+        name="Max Jerk",
+        description="Jerk of the Camera or Aim bone flagged as a spike, in units per second cubed",
+        default=1000.0,
+        min=0.0,
+    )
+
+    metrics_max_angular_velocity: FloatProperty(
+        name="Max Angular Velocity",
+        description="Turn rate of the camera's view flagged as a spike, in degrees per second",
+        default=180.0,
+        min=0.0,
+    )
+
+    metrics_path: bpy.props.StringProperty(
+        name="Report File",
+        description="JSON file the motion quality report is written to",
+        default="",
+        subtype='FILE_PATH',
+    )
+
     active_camera: bpy.props.PointerProperty(
         type=bpy.types.Object,
         name="Active Camera",
@@ -63,6 +350,124 @@ class CameraFlyProperties(PropertyGroup):
         poll=camera_poll
     )
 
+    mouse_filter: bpy.props.EnumProperty(
+        name="Mouse Filter",
+        description="Filter applied to the mouse movement before it rotates the camera",
+        items=[
+            ('NONE', "None", "Use the raw mouse movement"),
+            ('ONE_EURO', "One Euro", "Remove jitter from slow movement with little lag on fast movement"),
+        ],
+        default='NONE',
+    )
+
+    filter_min_cutoff: FloatProperty(
+        name="Min Cutoff",
+        description="Cutoff frequency in Hz while the mouse moves slowly. Lower values remove more jitter",
+        default=1.0,
+        min=0.01,
+        max=30.0,
+    )
+
+    filter_beta: FloatProperty(
+        name="Beta",
+        description="How fast the cutoff rises with mouse speed. Higher values reduce lag on fast movement",
+        default=0.007,
+        min=0.0,
+        max=1.0,
+        precision=4,
+    )
+
+    filter_d_cutoff: FloatProperty(
+        name="Speed Cutoff",
+        description="Cutoff frequency in Hz used to smooth the measured mouse speed",
+        default=1.0,
+        min=0.01,
+        max=30.0,
+    )
+
+    formation_enabled: bpy.props.BoolProperty(
+        name="Formation",
+        description="Move the dolly rigs of the formation collection along with the active camera",
+        default=False,
+    )
+
+    formation_collection: bpy.props.PointerProperty(
+        type=bpy.types.Collection,
+        name="Formation Collection",
+        description="Collection with the dolly rigs or their cameras flying in formation",
+    )
+
+    collision_enabled: bpy.props.BoolProperty(
+        name="Collision",
+        description="Keep the camera from flying through meshes",
+        default=False,
+    )
+
+    collision_source: bpy.props.EnumProperty(
+        name="Colliders",
+        description="Meshes the camera collides with",
+        items=[
+            ('VISIBLE', "Visible", "All visible meshes"),
+            ('SELECTED', "Selected", "Meshes selected when flying starts"),
+        ],
+        default='VISIBLE',
+    )
+
+    collision_radius: FloatProperty(
+        name="Collision Radius",
+        description="Distance the camera keeps from the colliders",
+        default=0.3,
+        min=0.0,
+        max=100.0,
+        unit='LENGTH',
+    )
+
+    ground_follow: bpy.props.BoolProperty(
+        name="Follow Ground",
+        description="Keep the camera at a fixed height above the colliders below it",
+        default=False,
+    )
+
+    ground_height: FloatProperty(
+        name="Ground Height",
+        description="Height of the camera above the ground when following it",
+        default=1.7,
+        min=0.0,
+        max=1000.0,
+        unit='LENGTH',
+    )
+
+    autofocus_enabled: bpy.props.BoolProperty(
+        name="Autofocus",
+        description="Move the Aim bone and the focus distance to the surface in front of the camera",
+        default=False,
+    )
+
+    autofocus_rate: FloatProperty(
+        name="Autofocus Rate",
+        description="Raycasts per second looking for the surface in front of the camera",
+        default=10.0,
+        min=0.5,
+        max=120.0,
+    )
+
+    autofocus_smoothing: FloatProperty(
+        name="Autofocus Smoothing",
+        description="Seconds the focus takes to settle on a new distance, 0 focuses instantly",
+        default=0.25,
+        min=0.0,
+        max=10.0,
+    )
+
+    autofocus_max_distance: FloatProperty(
+        name="Autofocus Distance",
+        description="Farthest surface the autofocus focuses on",
+        default=1000.0,
+        min=0.1,
+        max=100000.0,
+        unit='LENGTH',
+    )
+
     rotation_mode: bpy.props.EnumProperty(
         name="Rotation Mode",
         description="How the camera rotation is controlled",
@@ -81,21 +486,83 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
     bl_label = "Move Pose Bone (Local with Pivot)"
     bl_options = {'REGISTER', 'UNDO', 'GRAB_CURSOR', 'BLOCKING'}
 
+    replay_path: bpy.props.StringProperty(
+        name="Replay Log",
+        description="Event log fed through the operator instead of live input",
+        default="",
+        subtype='FILE_PATH',
+        options={'HIDDEN', 'SKIP_SAVE'},
+    )
+
+    replay_speed: FloatProperty(
+        name="Replay Speed",
+        description="Playback rate of the replayed events, 0 replays them as fast as possible",
+        default=1.0,
+        min=0.0,
+        options={'HIDDEN', 'SKIP_SAVE'},
+    )
+
     @property
     def move_speed(self):
+        if self._session is not None:
+            return self._session.settings.move_speed
         # Safely get move_speed from scene properties
         if hasattr(bpy.context.scene, 'camerafly_settings'):
             return bpy.context.scene.camerafly_settings.move_speed
-        return 20.0  # Default value if settings not found
+        return 5.0  # Default value if settings not found
 
     @property
     def rotate_speed_deg(self):
+        if self._session is not None:
+            return self._session.settings.rotate_speed_deg
         # Safely get rotate_speed_deg from scene properties
         if hasattr(bpy.context.scene, 'camerafly_settings'):
             return bpy.context.scene.camerafly_settings.rotate_speed_deg
         return 5.0  # Default value if settings not found
 
+    timer_interval = 0.02
+
+    # Handler timings of the running or last session, shown in the panel
+    session_stats = None
+    # Whether a fly session is running, the panels skip their settings meanwhile
+    flying = False
+    _stats = None
+    _debug = staticmethod(instrumentation.debug_function(log))
+
     _timer = None
+    _window = None
+    _interval = None
+    _idle = False
+    _last_draw = None
+    _redraw_interval = None
+    _draw_handler = None
+    _integrator = None
+    _take = None
+    _take_start = None
+    _take_frame_start = None
+    recording = False
+
+    # Take captured on the frames of timeline playback instead of on ticks
+    _take_sync = False
+    _take_fps = None
+    _take_last_frame = None
+    _take_looped = False
+    _take_dropped = 0
+    _started_playback = False
+    _sync_mode = None
+    _muted_fcurves = ()
+
+    # Event log being recorded, or the logged events being replayed
+    _event_log = None
+    _log_start = 0.0
+    _replay = None
+    _replay_index = 0
+    _replay_time = 0.0
+    _replay_start = None
+    _replay_timer = None
+    # Scene settings replaced by the ones of the replayed log
+    _replaced_settings = None
+
     keys_pressed = set()
     last_matrix = None
     speed_change = False
@@ -103,8 +570,15 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
     initial_aim_set = False
     _initial_aim_pos = None
     _initial_root_pos = None
+    _initial_focus_distance = None
 
     # Store the camera rig and root bone when the operator is invoked
+    _session = None
+    _formation = None
+    _colliders = None
+    _autofocus = None
+    # Objects selected when flying started, the session selects only the rig
+    _selected_objects = ()
     _camera_rig = None
     _root_bone = None
     _aim_bone = None
@@ -112,6 +586,20 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
 
     # Store the last keyframe type
     _last_keyframe_type = 'ALL'  # Default to keyframe all (loc, rot, scale)
+    _keyframe_writer = None
+
+    # Mouse movement gathered since the last timer tick
+    _mouse_dx = 0
+    _mouse_dy = 0
+    _mouse_filter = None
+
+    # Bone locations computed in a tick, written together by commit_pose
+    _staged = None
+
+    # Poses of the session for stepping back and forward
+    _history = None
+    _history_dirty = False
+    _last_snapshot = 0.0
 
     _forward = None
     _right = None
@@ -120,116 +608,283 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
     # Property for accessing the aim distance step now moved to CameraFlyProperties
 
     def modal(self, context, event):
-        # Use the stored root bone instead of the active pose bone
-        if not self._root_bone or not self._camera_rig:
-            # If somehow we lost the root bone reference, try to get it again
-            if hasattr(context.scene, 'camerafly_settings') and context.scene.camerafly_settings.active_camera:
-                camera = context.scene.camerafly_settings.active_camera
-                self._root_bone = self.get_root_bone(camera)
-                if self._root_bone:
-                    self._camera_rig = camera.parent
-
-            # If still no root bone, cancel
-            if not self._root_bone:
+        if self._replay is not None:
+            return self.pump_replay(context, event)
+        if self._event_log is not None:
+            self._event_log.record(self._integrator.clock() - self._log_start, event)
+        return self.handle_event(context, event)
+
+    def handle_event(self, context, event):
+        # Timeline playback steps on its own timer, let it keep playing while flying
+        if event.type == 'TIMER0':
+            return {'PASS_THROUGH'}
+
+        # Look the rig up again only after undo replaced it
+        if self._session.stale:
+            if not self._session.resolve():
                 self.report({'ERROR'}, "Lost reference to root bone")
                 self.cancel(context)
                 return {'CANCELLED'}
+            self.bind_session()
+            if self._colliders is not None:
+                self._colliders.resolve(self._session.scene)
 
+        # A timeline take ends with the playback or when it loops
+        if self._take_sync and (self._take_looped or (context.screen and not context.screen.is_animation_playing)):
+            self.stop_take(context)
 
         if event.type == 'LEFTMOUSE' or event.type == 'SPACE':
+            if self.recording:
+                self.stop_take(context)
             self.cancel(context)
             self.report({'INFO'}, "Accepted changes")
             return {'FINISHED'}
 
         if event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            print("Right mouse button pressed")
+            self._debug("Right mouse button pressed")
             if self._initial_aim_pos and self._initial_root_pos:
-                print("Restoring initial positions")
+                self._debug("Restoring initial positions")
+                self._debug("root %s camera %s aim %s",
+                            self._initial_root_pos, self._initial_camera_pos, self._initial_aim_pos)
 
-                print("self._initial_root_pos", self._initial_root_pos)
-                print("self._initial_camera_pos", self._initial_camera_pos)
-                print("self._initial_aim_pos", self._initial_aim_pos)
-                
                 self._root_bone.matrix_basis = self._initial_root_pos
-                #print("self._root_bone.matrix", self._root_bone.matrix)
-                print("self._camera_bone.matrix", self._camera_bone.matrix)
                 self._camera_bone.matrix_basis = self._initial_camera_pos
-                print("self._camera_bone.matrix", self._camera_bone.matrix)
                 self._aim_bone.matrix_basis = self._initial_aim_pos
-                #print("self._aim_bone.matrix", self._aim_bone.matrix)
-                
+                # Autofocus writes the focus distance of the camera
+                if self._initial_focus_distance is not None:
+                    self._session.camera.data.dof.focus_distance = self._initial_focus_distance
+                if self._formation is not None:
+                    self._formation.restore()
 
                 self.cancel(context)
                 self.report({'INFO'}, "Reversed changes")
                 return {'CANCELLED'}
             return {'RUNNING_MODAL'}
 
+        # Recalculate the handles once, when a burst of held or repeated inserts ends
+        if event.type == 'I' and event.value == 'RELEASE' and self._keyframe_writer is not None:
+            self._keyframe_writer.finish()
+
         # Handle keyframe insertion with 'I' key
         if event.type == 'I' and event.value == 'PRESS':
             # Insert keyframes based on modifier keys
             if self.insert_keyframes(context):
+                if self._history is not None:
+                    self.snapshot_pose(self._integrator.clock())
                 return {'RUNNING_MODAL'}
 
+        # Step through the pose history with '[' and ']'
+        if event.type in {'LEFT_BRACKET', 'RIGHT_BRACKET'} and event.value == 'PRESS':
+            self.step_history(context, -1 if event.type == 'LEFT_BRACKET' else 1)
+            return {'RUNNING_MODAL'}
+
+        # Toggle take recording with 'R'
+        if event.type == 'R' and event.value == 'PRESS' and not event.is_repeat:
+            if self.recording:
+                self.stop_take(context)
+            else:
+                self.start_take(context)
+            return {'RUNNING_MODAL'}
+
         # Handle mouse wheel for aim bone control
         if event.type in ['WHEELUPMOUSE', 'WHEELDOWNMOUSE'] and event.value == 'PRESS':
             if self.move_aim_bone(context, forward=(event.type == 'WHEELUPMOUSE')):
+                self._history_dirty = True
                 return {'RUNNING_MODAL'}
-        if event.type == 'MOUSEMOVE':
-            print(event.type)
 
         if event.value == 'PRESS':
             self.keys_pressed.add(event.type)
+            if self._idle:
+                self.wake(context)
         elif event.value == 'RELEASE':
             self.keys_pressed.discard(event.type)
 
-        if event.type == 'TIMER' and context.area:
+        # Replays also run headless, without an area
+        if event.type == 'TIMER' and (context.area or self._replay is not None):
             if context.mode != 'POSE' or not self._camera_rig or self._camera_rig.type != 'ARMATURE':
                 self.report({'WARNING'}, "Not in Pose Mode or camera rig not found")
                 self.cancel(context)
                 return {'CANCELLED'}
 
+            settings = self._session.settings
             if event.shift and not self.speed_change:
-                # Update the scene property directly with new max of 100.0
-                if hasattr(bpy.context.scene, 'camerafly_settings'):
-                    settings = bpy.context.scene.camerafly_settings
-                    settings.move_speed = min(settings.move_speed * 2.0, 100.0)
-                    self.speed_change = True
+                # Update the scene property directly with new max of 1000.0
+                settings.move_speed = min(settings.move_speed * 2.0, 1000.0)
+                self.speed_change = True
             elif event.ctrl and not self.speed_change:
-                # Update the scene property directly with new min of 0.01
-                if hasattr(bpy.context.scene, 'camerafly_settings'):
-                    settings = bpy.context.scene.camerafly_settings
-                    settings.move_speed = max(settings.move_speed * 0.5, 0.01)
-                    self.speed_change = True
+                # Update the scene property directly with new min of 0.1
+                settings.move_speed = max(settings.move_speed * 0.5, 0.1)
+                self.speed_change = True
 
             if not event.shift and not event.ctrl:
                 self.speed_change = False
 
             if event.alt and not self.rot_mode_change:
-                if hasattr(bpy.context.scene, 'camerafly_settings'):
-                    settings = bpy.context.scene.camerafly_settings
-                    settings.rotation_mode = 'AIM' if settings.rotation_mode == 'CAMERA' else 'CAMERA'
-                    self.rot_mode_change = True
+                settings.rotation_mode = 'AIM' if settings.rotation_mode == 'CAMERA' else 'CAMERA'
+                self.rot_mode_change = True
 
             if not event.alt:
                 self.rot_mode_change = False
             
-            self.move_cam_mode(context)
+            self.tick(context)
 
             if not 'Y' in self.keys_pressed and not 'C' in self.keys_pressed:
                 self.initial_aim_set = False
 
-            # Handle rotation based on mouse movement
-            if not event.type == 'TIMER':
-                print(event.type)
+        # Mouse movement is only accumulated here and applied once per tick
         if event.type == 'MOUSEMOVE':
-
-
-            self.rotate_cam_mode(context, event)
+            self._mouse_dx += event.mouse_x - event.mouse_prev_x
+            self._mouse_dy += event.mouse_y - event.mouse_prev_y
+            if self._idle:
+                self.wake(context)
             return {'RUNNING_MODAL'}
-            
 
         return {'RUNNING_MODAL'}
 
+    def tick(self, context):
+        """Apply the accumulated mouse rotation and move the rig by the time elapsed since the last timer event."""
+        now = self._integrator.clock()
+        dx, dy = self._mouse_dx, self._mouse_dy
+        self._mouse_dx = self._mouse_dy = 0
+        mouse_filter = self._mouse_filter
+        if mouse_filter is not None:
+            dx, dy = mouse_filter(dx, dy, now)
+        mouse_moved = bool(dx or dy)
+        if mouse_moved:
+            self.rotate_cam_mode(context, dx, dy)
+        dt = self._integrator.tick(now)
+        moved = self.move_cam_mode(context, dt)
+        if self._autofocus is not None:
+            moved = self.update_autofocus(context, now, dt) or moved
+        self.commit_pose()
+        if self._formation is not None and (mouse_moved or moved):
+            self._formation.update()
+        if self.recording and not self._take_sync:
+            self.sample_take(now)
+        if mouse_moved or moved:
+            self._history_dirty = True
+        if self._history_dirty and self._history is not None:
+            interval = self._session.settings.history_interval
+            if interval > 0.0 and now - self._last_snapshot >= interval:
+                self.snapshot_pose(now)
+
+        if (
+            not mouse_moved
+            and not self._integrator.moving
+            and self.keys_pressed.isdisjoint(flight.MOVE_KEYS)
+            and (mouse_filter is None or mouse_filter.settled)
+            and (self._autofocus is None or self._autofocus.settled)
+            and not self._take_sync
+        ):
+            self.sleep(context)
+        elif self._session.settings.update_rate == 'VIEWPORT':
+            self.adapt_interval(context)
+
+    # Pose history
+    #################################################
+
+    def history_bones(self):
+        return (self._root_bone, self._camera_bone, self._aim_bone)
+
+    def snapshot_pose(self, now):
+        row = self._history.record()
+        for i, bone in enumerate(self.history_bones()):
+            row[i] = bone.matrix_basis
+        self._history_dirty = False
+        self._last_snapshot = now
+
+    def step_history(self, context, offset):
+        """Put the rig back to an earlier (negative offset) or later pose of the session.
+
+        The poses are restored without an undo push, confirming the session
+        still creates a single undo step.
+        """
+        pose_history = self._history
+        if pose_history is None:
+            return
+        if self._history_dirty:
+            # Keep the current pose so stepping forward returns to it
+            self.snapshot_pose(self._integrator.clock())
+
+        pose = pose_history.step(offset)
+        if pose is None:
+            self.report({'INFO'}, "No earlier pose" if offset < 0 else "No later pose")
+            return
+        for bone, matrix in zip(self.history_bones(), pose):
+            bone.matrix_basis = adapter.matrix(matrix)
+        # The restored Root bone moves the other bones' pose offsets
+        context.view_layer.update()
+        self._session.update_pose_offsets()
+        # Don't carry momentum into the restored pose
+        self._integrator.reset()
+        if self._formation is not None:
+            self._formation.update()
+        self.report({'INFO'}, f"Pose {pose_history.position + 1} of {len(pose_history)}")
+
+    # Timer
+    #################################################
+
+    def base_interval(self, context):
+        """Shortest timer interval of the selected update rate."""
+        if self._session.settings.update_rate == 'FIXED':
+            return self.timer_interval
+        render = context.scene.render
+        return render.fps_base / render.fps
+
+    def set_timer(self, context, interval):
+        if self._replay is not None:
+            # The logged TIMER events drive the ticks of a replay
+            return
+        wm = context.window_manager
+        if self._timer is not None:
+            wm.event_timer_remove(self._timer)
+            self._timer = None
+        if interval > 0.0:
+            self._timer = wm.event_timer_add(interval, window=self._window)
+
+    def sleep(self, context):
+        """Drop to the idle heartbeat until a key is pressed or the mouse moves."""
+        if self._idle:
+            return
+        self._idle = True
+        self.set_timer(context, self._session.settings.idle_heartbeat)
+
+    def wake(self, context):
+        self._idle = False
+        now = self._integrator.clock()
+        # The pause must not count as elapsed flight time
+        self._integrator.restart(now)
+        if self.recording and not self._take_sync:
+            # Keep the pose held during the pause in the take
+            self.sample_take(now)
+        self.set_timer(context, self._interval)
+
+    def adapt_interval(self, context):
+        """Follow the measured viewport redraw interval, never faster than the scene frame rate."""
+        redraw = self._redraw_interval
+        if redraw is None:
+            return
+        base = self.base_interval(context)
+        interval = self._interval
+        if redraw > interval * 1.25:
+            interval = redraw
+        elif redraw < interval * 1.05 and interval > base:
+            interval = max(interval * 0.8, base)
+        else:
+            return
+        self._interval = interval
+        self.set_timer(context, interval)
+
+    def on_viewport_draw(self):
+        now = self._integrator.clock()
+        if self._last_draw is not None:
+            elapsed = now - self._last_draw
+            if self._redraw_interval is None:
+                self._redraw_interval = elapsed
+            else:
+                self._redraw_interval += 0.2 * (elapsed - self._redraw_interval)
+        self._last_draw = now
+
     def is_valid_dolly_rig(self, context, camera):
         """Check if the camera is part of a valid Dolly Rig from the Add Camera Rigs addon."""
         if not camera:
@@ -292,7 +947,131 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
         bpy.ops.object.mode_set(mode='POSE')
 
     def invoke(self, context, event):
+        if self.replay_path:
+            return self.start_replay(context)
+        if not self.start_session(context):
+            return {'CANCELLED'}
+
+        self._window = context.window
+        self._interval = self.base_interval(context)
+        self.set_timer(context, self._interval)
+        if self._session.settings.update_rate == 'VIEWPORT':
+            self._draw_handler = bpy.types.SpaceView3D.draw_handler_add(
+                self.on_viewport_draw, (), 'WINDOW', 'POST_PIXEL'
+            )
+        if self._session.settings.record_events:
+            self.start_event_log()
+
+        context.window_manager.modal_handler_add(self)
+        type(self).flying = True
+        return {'RUNNING_MODAL'}
+
+    def start_event_log(self):
+        from .core import eventlog
+        settings = self._session.settings
+        if not settings.event_log_path:
+            self.report({'WARNING'}, "No event log file set, events are not recorded")
+            return
+        bones = (self._root_bone, self._camera_bone, self._aim_bone)
+        self._event_log = eventlog.EventRecorder({
+            'blender': bpy.app.version_string,
+            'settings': {name: getattr(settings, name) for name in REPLAY_SETTINGS},
+            'pose': {bone.name: [list(row) for row in bone.matrix_basis] for bone in bones},
+        })
+        self._log_start = self._integrator.clock()
+
+    def finish_event_log(self):
+        if self._event_log is None:
+            return
+        path = bpy.path.abspath(self._session.settings.event_log_path)
+        try:
+            self._event_log.write(path)
+        except OSError as e:
+            self.report({'WARNING'}, f"Could not write event log to {path}: {e}")
+        else:
+            log.info("Wrote %d events to %s", self._event_log.count, path)
+        self._event_log = None
+
+    def start_replay(self, context):
+        from .core import eventlog
+        path = bpy.path.abspath(self.replay_path)
+        try:
+            metadata, events = eventlog.read_event_log(path)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Could not read event log {path}: {e}")
+            return {'CANCELLED'}
+
+        settings = context.scene.camerafly_settings
+        self._replaced_settings, skipped = apply_logged_settings(settings, metadata)
+        if skipped:
+            self.report({'WARNING'}, f"Replaying with the current {', '.join(skipped)}, the logged values are invalid")
+        if not self.start_session(context):
+            restore_settings(settings, self._replaced_settings)
+            self._replaced_settings = None
+            return {'CANCELLED'}
+        self.begin_replay(metadata, events)
+
+        if self.replay_speed <= 0.0:
+            return self.replay_events(context)
+
+        self._replay_start = time.perf_counter()
+        self._replay_timer = context.window_manager.event_timer_add(self.timer_interval, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        type(self).flying = True
+        return {'RUNNING_MODAL'}
+
+    def begin_replay(self, metadata, events):
+        """Put the rig in its logged start pose and run the session on the logged timestamps."""
+        for name, values in metadata.get('pose', {}).items():
+            bone = self._camera_rig.pose.bones.get(name)
+            if bone is not None:
+                bone.matrix_basis = adapter.matrix(values)
+        self._replay = events
+        self._replay_index = 0
+        self._replay_time = 0.0
+        self._integrator.clock = self.replay_clock
+        if self._history is not None:
+            self._history.clear()
+            self.snapshot_pose(self._replay_time)
+
+    def replay_clock(self):
+        return self._replay_time
+
+    def pump_replay(self, context, event):
+        """Feed the logged events that are due, live input can only abort the replay."""
+        if event.type == 'ESC':
+            return self.handle_event(context, event)
+        if event.type != 'TIMER':
+            return {'RUNNING_MODAL'}
+        return self.replay_events(context, (time.perf_counter() - self._replay_start) * self.replay_speed)
+
+    def replay_event(self, context, logged):
+        self._replay_time = logged.time
+        return self.handle_event(context, logged)
+
+    def replay_events(self, context, until=float('inf')):
+        events = self._replay
+        while self._replay_index < len(events):
+            logged = events[self._replay_index]
+            if logged.time > until:
+                return {'RUNNING_MODAL'}
+            self._replay_index += 1
+            result = self.replay_event(context, logged)
+            if result != {'RUNNING_MODAL'}:
+                return result
+
+        # The log ended without the session being confirmed, keep what was replayed
+        self.cancel(context)
+        self.report({'INFO'}, f"Replayed {len(events)} events")
+        return {'FINISHED'}
+
+    def start_session(self, context):
+        """Validate the active camera's rig and set up the state of a fly session.
 
+        Returns:
+            True if the session can start
+        """
+        self._selected_objects = list(context.view_layer.objects.selected)
         self.prepare_scene(context.scene.camerafly_settings.active_camera)
 
         # Check for valid Dolly Rig first
@@ -303,35 +1082,36 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
                     {'ERROR'},
                     "Selected camera must be part of a valid Dolly Rig from the 'Add Camera Rigs' addon"
                 )
-                return {'CANCELLED'}
+                return False
 
             # Get the root bone of the rig
             self._root_bone = self.get_root_bone(camera)
             if not self._root_bone:
                 self.report({'ERROR'}, "Could not find 'root' bone in the dolly rig")
-                return {'CANCELLED'}
+                return False
 
             # Get the aim bone of the rig
             self._aim_bone = self.get_aim_bone(camera)
             if not self._aim_bone:
                 self.report({'ERROR'}, "Could not find 'aim' bone in the dolly rig")
-                return {'CANCELLED'}
+                return False
             
             # Get the camera bone of the rig
             self._camera_bone = self.get_camera_bone(camera)
             if not self._camera_bone:
                 self.report({'ERROR'}, "Could not find 'camera' bone in the dolly rig")
-                return {'CANCELLED'}
+                return False
 
             # Store the initial positions of the bones
             self._initial_aim_pos = self._aim_bone.matrix_basis.copy()
             self._initial_root_pos = self._root_bone.matrix_basis.copy()
             self._initial_camera_pos = self._camera_bone.matrix_basis.copy()
+            self._initial_focus_distance = camera.data.dof.focus_distance
 
             # Ensure we're in pose mode
             if context.mode != 'POSE':
                 self.report({'WARNING'}, "Must be in Pose Mode to use this tool")
-                return {'CANCELLED'}
+                return False
 
             # Select the root bone automatically
             rig = camera.parent
@@ -352,24 +1132,101 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
                 self._root_bone.bone.select = True
             rig.data.bones.active = self._root_bone.bone
 
-            # Store references to the camera rig and root bone for use in modal method
-            self._camera_rig = rig
+            # Store references to the camera rig and its bones for use in modal method
+            from .session import RigSession
+            self._session = RigSession(context.scene, camera)
+            self._session.start()
+            self.bind_session()
 
             self.report({'INFO'}, "Automatically selected Root bone of dolly rig")
         else:
             self.report({'ERROR'}, "No camera selected")
-            return {'CANCELLED'}
+            return False
 
-        wm = context.window_manager
-        self._timer = wm.event_timer_add(0.02, window=context.window)
-        wm.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+        # Movement is integrated over wall-clock time, the timer only sets the update rate
+        self._integrator = MotionIntegrator()
+
+        settings = context.scene.camerafly_settings
+        if settings.mouse_filter == 'ONE_EURO':
+            self._mouse_filter = filters.one_euro_delta_filter(
+                settings.filter_min_cutoff, settings.filter_beta, settings.filter_d_cutoff
+            )
+        if settings.collision_enabled or settings.autofocus_enabled:
+            self.start_colliders(context)
+        if settings.autofocus_enabled and self._colliders is not None:
+            self._autofocus = focus.FocusFollower(1.0 / settings.autofocus_rate, settings.autofocus_smoothing)
+        if settings.history_size > 0:
+            self._history = history.PoseHistory(settings.history_size, len(self.history_bones()))
+            self.snapshot_pose(self._integrator.clock())
+
+        instrumentation.configure_logger(log, settings.log_level)
+        self._debug = instrumentation.debug_function(log)
+        if settings.instrumentation_enabled:
+            self.start_instrumentation()
+        return True
+
+    def start_colliders(self, context):
+        """Build the BVH trees shared by collision and autofocus."""
+        from . import collision
+        session = self._session
+        exclude = {session.rig}
+        if self._formation is not None:
+            exclude.update(self._formation.rigs)
+        objects = collision.collider_objects(session.settings, context.view_layer, self._selected_objects, exclude)
+        if not objects:
+            self.report({'WARNING'}, "No collider meshes found, flying without collision and autofocus")
+            return
+        self._colliders = collision.ColliderCache(objects)
+        self._colliders.start()
+        # Build the trees now rather than on the first movement
+        self._colliders.refresh(context)
+        log.info("Built BVH trees of %d meshes", len(objects))
+
+    def bind_session(self):
+        session = self._session
+        self._camera_rig = session.rig
+        self._root_bone = session.root_bone
+        self._aim_bone = session.aim_bone
+        self._camera_bone = session.camera_bone
+        # Keys inserted before the rig was looked up again still need their handles
+        if self._keyframe_writer is not None:
+            self._keyframe_writer.finish()
+        self._keyframe_writer = None
+        self._staged = {}
+
+        settings = session.settings
+        self._formation = None
+        if settings.formation_enabled:
+            from .formation import FormationRigs, formation_rigs
+            rigs = formation_rigs(settings, session.rig)
+            self._formation = FormationRigs(session, rigs) if rigs else None
+
+    def start_instrumentation(self):
+        """Time the hot handlers by wrapping them on this instance only."""
+        self._stats = instrumentation.SessionStats()
+        type(self).session_stats = self._stats
+        self.tick = self._stats.timed('tick', self.tick)
+        self.rotate_cam_mode = self._stats.timed('mouse_rotate', self.rotate_cam_mode)
+        self.move_aim_bone = self._stats.timed('wheel', self.move_aim_bone)
+        self.insert_keyframes = self._stats.timed('keyframe', self.insert_keyframes)
+
+    def finish_instrumentation(self, context):
+        stats_path = self._session.settings.stats_path
+        if self._stats is None or not stats_path:
+            return
+        path = bpy.path.abspath(stats_path)
+        try:
+            self._stats.dump(path)
+        except OSError as e:
+            self.report({'WARNING'}, f"Could not write stats to {path}: {e}")
+        else:
+            log.info("Wrote handler timings to %s", path)
 
     def execute(self, context):
         return {'FINISHED'}
 
     def insert_keyframes(self, context):
-        """Insert keyframes for the bone based on modifier keys.
+        """Insert keyframes for the Camera and Aim bones based on the selected keyframe type.
 
         Args:
             context: Blender context
@@ -377,6 +1234,7 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
         Returns:
             True if keyframes were inserted
         """
+        from . import fcurves
         if not self._camera_rig:
             self.report({'ERROR'}, "No bone to keyframe")
             return False
@@ -388,31 +1246,167 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
             'SCALE': 'Scale only',
             'ALL': 'Location, Rotation & Scale'
         }
-        bones_to_keyframe = [self._camera_bone, self._aim_bone]
-        # Determine keyframe type based on modifier keys
-        keyframe_type = 'ALL'
 
+        # F-Curves are resolved on the first key of the session and reused afterwards
+        if self._keyframe_writer is None:
+            self._keyframe_writer = fcurves.KeyframeWriter(
+                self._camera_rig, [self._camera_bone, self._aim_bone]
+            )
 
-        # Insert keyframes based on type
-        frame = context.scene.frame_current
-        for key_bone in bones_to_keyframe:
-            if keyframe_type in ['LOC', 'ALL']:
-                key_bone.keyframe_insert(data_path='location', frame=frame)
+        keyframe_type = self._session.settings.keyframe_type
+        self._last_keyframe_type = keyframe_type
 
-            if keyframe_type in ['ROT', 'ALL']:
-                if key_bone.rotation_mode == 'QUATERNION':
-                    key_bone.keyframe_insert(data_path='rotation_quaternion', frame=frame)
-                else:
-                    key_bone.keyframe_insert(data_path='rotation_euler', frame=frame)
-
-            if keyframe_type in ['SCALE', 'ALL']:
-                key_bone.keyframe_insert(data_path='scale', frame=frame)
+        frame = context.scene.frame_current
+        self._keyframe_writer.insert(frame, keyframe_type)
 
+        # Direct F-Curve edits don't notify the animation editors
+        if context.screen:
+            for area in context.screen.areas:
+                if area.type in {'DOPESHEET_EDITOR', 'GRAPH_EDITOR'}:
+                    area.tag_redraw()
 
         # Show a message about what was keyframed
         self.report({'INFO'}, f"Inserted keyframe: {keyframe_types[keyframe_type]} at frame {frame}")
         return True
 
+    def start_take(self, context):
+        """Start recording the Camera and Aim bone transforms on every tick."""
+        settings = self._session.settings
+        if settings.take_sync == 'PLAYBACK':
+            self.start_playback_take(context)
+            return
+        capacity = ceil(settings.take_max_seconds / self.base_interval(context)) + 1
+        if self._take is None or self._take.capacity != capacity:
+            self._take = takes.TakeBuffer(capacity)
+        else:
+            self._take.clear()
+
+        self._take_start = self._integrator.clock()
+        self._take_frame_start = context.scene.frame_current
+        self.recording = True
+        self.sample_take(self._take_start)
+        self.report({'INFO'}, f"Recording take from frame {self._take_frame_start}")
+
+    def start_playback_take(self, context):
+        """Play the timeline and record the Camera and Aim bone transforms on each frame it shows.
+
+        The keys of the recorded bones are muted meanwhile, so the playback
+        doesn't pull the rig back onto the animation being replaced.
+        """
+        from . import fcurves
+        scene = context.scene
+        frame = scene.frame_current
+        end = scene.frame_preview_end if scene.use_preview_range else scene.frame_end
+        # One row per frame up to the end of the playback range
+        capacity = max(end - frame, 0) // max(scene.frame_step, 1) + 2
+        if self._take is None or self._take.capacity != capacity:
+            self._take = takes.TakeBuffer(capacity)
+        else:
+            self._take.clear()
+
+        render = scene.render
+        self._take_fps = render.fps / render.fps_base
+        self._take_frame_start = frame
+        self._take_last_frame = frame
+        self._take_looped = False
+        self._take_dropped = 0
+        self._take_sync = True
+        self.recording = True
+        self.capture_take_row(0.0)
+
+        self._muted_fcurves = fcurves.mute_bone_fcurves(
+            self._camera_rig, {self._camera_bone.name, self._aim_bone.name}
+        )
+        # Play every frame, a slow frame must not be skipped
+        self._sync_mode = scene.sync_mode
+        scene.sync_mode = 'NONE'
+        bpy.app.handlers.frame_change_post.append(self.on_frame_change)
+        screen = context.screen
+        self._started_playback = screen is not None and not screen.is_animation_playing
+        if self._started_playback:
+            bpy.ops.screen.animation_play()
+        self.report({'INFO'}, f"Recording take on playback from frame {frame}")
+
+    def on_frame_change(self, scene, depsgraph=None):
+        frame = scene.frame_current
+        if self._take_looped or frame <= self._take_last_frame:
+            # Playback wrapped around or jumped back, the take ends on the next event
+            self._take_looped = True
+            return
+        step = max(scene.frame_step, 1)
+        self._take_dropped += (frame - self._take_last_frame) // step - 1
+        self._take_last_frame = frame
+        self.capture_take_row((frame - self._take_frame_start) / self._take_fps)
+
+    def finish_playback_take(self, context):
+        handlers = bpy.app.handlers.frame_change_post
+        if self.on_frame_change in handlers:
+            handlers.remove(self.on_frame_change)
+        screen = context.screen
+        if self._started_playback and screen is not None and screen.is_animation_playing:
+            bpy.ops.screen.animation_cancel(restore_frame=False)
+        self._started_playback = False
+        context.scene.sync_mode = self._sync_mode
+        for fcurve in self._muted_fcurves:
+            fcurve.mute = False
+        self._muted_fcurves = ()
+        self._take_sync = False
+
+    def sample_take(self, now):
+        self.capture_take_row(now - self._take_start)
+
+    def capture_take_row(self, elapsed):
+        row = self._take.next_row()
+        row[takes.TIME] = elapsed
+        for bone, location, rotation in (
+            (self._camera_bone, takes.CAMERA_LOCATION, takes.CAMERA_ROTATION),
+            (self._aim_bone, takes.AIM_LOCATION, takes.AIM_ROTATION),
+        ):
+            row[location] = bone.location
+            if bone.rotation_mode == 'QUATERNION':
+                row[rotation] = bone.rotation_quaternion
+            else:
+                row[rotation] = bone.matrix_basis.to_quaternion()
+
+    def stop_take(self, context):
+        """Stop recording and keep the take in the take list or write it into the rig's action in one go."""
+        from . import fcurves
+        self.recording = False
+        synced = self._take_sync
+        if synced:
+            self.finish_playback_take(context)
+        samples = self._take.samples()
+        settings = self._session.settings
+        if settings.take_target == 'STORE':
+            take = settings.takes.add()
+            take.name = f"Take {len(settings.takes):03d}"
+            take.camera = self._session.camera
+            take.frame_start = self._take_frame_start
+            take.synced = synced
+            take.store(samples)
+            settings.active_take_index = len(settings.takes) - 1
+            count = take.sample_count
+            target = take.name
+        else:
+            fcurves.write_take(
+                self._camera_rig,
+                self._camera_bone,
+                self._aim_bone,
+                samples,
+                self._take_frame_start,
+                take_frame_rate(context.scene, synced),
+                max(context.scene.frame_step, 1),
+            )
+            count = len(samples)
+            target = "the action"
+
+        if self._take.overflowed:
+            self.report({'WARNING'}, f"Take exceeded the buffer, kept the last {count} samples in {target}")
+        elif self._take_dropped:
+            self.report({'WARNING'}, f"Recorded {count} samples to {target}, {self._take_dropped} frames were skipped")
+        else:
+            self.report({'INFO'}, f"Recorded {count} samples to {target}")
+
     def move_aim_bone(self, context, forward=True):
         """Move the aim bone forward or backward based on mouse wheel movement.
 
@@ -426,19 +1420,12 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
         if not self._aim_bone or not self._camera_rig:
             return False
 
-        # Check if we have an active camera and are in AIM mode
-        settings = getattr(context.scene, 'camerafly_settings', None)
-        if not settings or not settings.active_camera:
-            return False
-
         # Get the camera's forward direction in world space
         aim_matrix = self._camera_bone.matrix
         forward_vec = aim_matrix.to_3x3() @ Vector((0, 1, 0))  # Camera looks down -Z
 
         # Get aim distance step from scene properties
-        aim_step = 0.2  # Default value
-        if hasattr(context.scene, 'camerafly_settings'):
-            aim_step = context.scene.camerafly_settings.aim_distance_step
+        aim_step = self._session.settings.aim_distance_step
 
         # Calculate the movement amount based on direction
         direction = 1 if forward else -1
@@ -454,9 +1441,30 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
         return True
 
     def cancel(self, context):
-        wm = context.window_manager
-        wm.event_timer_remove(self._timer)
+        type(self).flying = False
+        self.set_timer(context, 0.0)
+        if self._draw_handler is not None:
+            bpy.types.SpaceView3D.draw_handler_remove(self._draw_handler, 'WINDOW')
+            self._draw_handler = None
         self.keys_pressed.clear()
+        self.recording = False
+        if self._take_sync:
+            self.finish_playback_take(context)
+        if self._replay_timer is not None:
+            context.window_manager.event_timer_remove(self._replay_timer)
+            self._replay_timer = None
+        if self._keyframe_writer is not None:
+            self._keyframe_writer.finish()
+            self._keyframe_writer = None
+        self.finish_instrumentation(context)
+        self.finish_event_log()
+        if self._replaced_settings is not None:
+            restore_settings(context.scene.camerafly_settings, self._replaced_settings)
+            self._replaced_settings = None
+        if self._session is not None:
+            self._session.stop()
+        if self._colliders is not None:
+            self._colliders.stop()
         bpy.ops.object.mode_set(mode='OBJECT')
     
     def move_root_bone(self, context):
@@ -485,91 +1493,413 @@ class POSE_OT_move_rotate_bone_local_pivot(bpy.types.Operator):
         
         self._root_bone.location += delta.normalized() * self.move_speed
 
-    def move_cam_mode(self, context):
-        self.last_matrix_camera = self._camera_bone.matrix_basis.copy()
-        self.last_matrix_aim = self._aim_bone.matrix_basis.copy()
+    def move_cam_mode(self, context, dt):
+        """Translate the Camera and Aim bones by the held movement keys.
 
-        self.set_directions(self._camera_bone)
-        delta = self.get_delta()
-        self.translate_bone(self._camera_bone, delta)
-        self.translate_bone(self._aim_bone, delta)
+        Returns:
+            True if the bones were moved
+        """
+        settings = self._session.settings
+        held = not self.keys_pressed.isdisjoint(flight.MOVE_KEYS)
+        if not held and not self._integrator.moving:
+            # Nothing to move, skip the bone writes and the depsgraph update they cause
+            return False
 
-    def rotate_cam_mode(self, context, mouse_event):
-        self.set_angles(mouse_event)
         self.set_directions(self._camera_bone)
-        if bpy.context.scene.camerafly_settings.rotation_mode == 'AIM':
-            self.rotate_around_bone(self._camera_bone, self._aim_bone)
-        else:
-            self.rotate_around_bone(self._aim_bone, self._camera_bone, invert_yaw = True, invert_pitch = True)
-    
-    def rotate_around_bone(self, bone_a, bone_b, invert_yaw = False, invert_pitch = False):
-        # rotates bone a around bone b (only location)
-        bone_a_mat_world = self._camera_rig.matrix_world @ bone_a.matrix
-        bone_b_mat_world = self._camera_rig.matrix_world @ bone_b.matrix
-        
-        bone_a_loc_world = bone_a_mat_world.translation
-        bone_b_loc_world = bone_b_mat_world.translation
-
-        offset_world = bone_a_loc_world - bone_b_loc_world
-        print(offset_world)
+        displacement = adapter.array(self._integrator.step(
+            self.get_delta(),
+            self.move_speed,
+            dt,
+            acceleration=settings.move_acceleration,
+            deceleration=settings.move_deceleration,
+        ))
+        if self._colliders is not None and settings.collision_enabled:
+            displacement = self.collide(context, displacement)
+        self.translate_bone(self._camera_bone, displacement)
+        self.translate_bone(self._aim_bone, displacement)
+        return True
 
-        # set axes to rotate around in world space
-        # World Z axis for yaw rotation
-        yaw_axis = Vector((0, 0, 1))
+    def collide(self, context, displacement):
+        """Limit a displacement of the rig so the Camera bone stays out of the colliders."""
+        session = self._session
+        settings = session.settings
+        colliders = self._colliders
+        colliders.refresh(context)
+        if session.rig_moved:
+            session.update_rig_matrix()
+
+        camera = self._camera_bone
+        start = flight.transform_point(
+            session.rig_matrix, self.staged_location(camera) + session.pose_offsets[camera.name]
+        )
+        world = colliders.sweep(start, session.rig_matrix[:3, :3] @ displacement, settings.collision_radius)
+        if settings.ground_follow:
+            world[2] += colliders.ground_offset(start + world, settings.ground_height)
+        return session.rig_inverse[:3, :3] @ world
+
+    def update_autofocus(self, context, now, dt):
+        """Ease the Aim bone and the camera's focus distance towards the surface in front of the camera.
 
-        # right vector (bone's local X) converted to world space for pitch rotation
-        pitch_axis = self._camera_rig.matrix_world.to_3x3() @ self._right.normalized()
+        Returns:
+            True if the Aim bone was moved
+        """
+        session = self._session
+        settings = session.settings
+        if session.rig_moved:
+            session.update_rig_matrix()
+        camera, aim = self._camera_bone, self._aim_bone
+        camera_world, aim_world = (
+            flight.transform_point(session.rig_matrix, self.staged_location(bone) + session.pose_offsets[bone.name])
+            for bone in (camera, aim)
+        )
+        offset = aim_world - camera_world
+        current = np.linalg.norm(offset)
+        if current < 1e-6:
+            return False
+        forward = offset / current
+
+        follower = self._autofocus
+        if follower.due(now):
+            colliders = self._colliders
+            colliders.refresh(context)
+            hit = colliders.ray_cast(camera_world, forward, settings.autofocus_max_distance)
+            follower.set_target(hit[2] if hit is not None else None, now)
+        distance = follower.step(current, dt)
+        if abs(distance - current) <= follower.tolerance:
+            return False
 
-        # Create rotation matrices
-        yaw_mat = Matrix.Rotation(self._yaw_angle if not invert_yaw else -self._yaw_angle, 4, yaw_axis)
-        pitch_mat = Matrix.Rotation(-self._pitch_angle if not invert_pitch else self._pitch_angle, 4, pitch_axis)
+        self.stage_location(aim, flight.bone_location(
+            camera_world + forward * distance, session.rig_inverse, session.pose_offsets[aim.name]
+        ))
+        dof = session.camera.data.dof
+        # A focus object, usually the Aim bone, already follows the moved bone
+        if dof.focus_object is None:
+            dof.focus_distance = distance
+        return True
 
-        # Combine rotations (pitch first, then yaw)
-        combined_rot = yaw_mat @ pitch_mat
+    def rotate_cam_mode(self, context, dx, dy):
+        self.set_angles(dx, dy)
+        self.set_directions(self._camera_bone)
+        session = self._session
+        if session.rig_moved:
+            session.update_rig_matrix()
+        rig_matrix = session.rig_matrix
+        # Positions from the staged locations, the evaluated bone matrices may lag behind
+        pose_offsets = session.pose_offsets
+        camera, aim = self._camera_bone, self._aim_bone
+        camera_world, aim_world = (
+            flight.transform_point(rig_matrix, self.staged_location(bone) + pose_offsets[bone.name])
+            for bone in (camera, aim)
+        )
 
-        # Apply combined rotation to the offset
-        rotated_offset = combined_rot @ offset_world.normalized() * offset_world.length #Couldnt this just be offset? Normalize and multiply by length cancels each other out?
-        print("rotated offset", rotated_offset)
-        # Calculate new bone position
-        new_pos_world = bone_b_loc_world + rotated_offset
+        # right vector (bone's local X) converted to world space for pitch rotation
+        pitch_axis = rig_matrix[:3, :3] @ self._right
+        rotation_mode = session.settings.rotation_mode
+        new_camera, new_aim = flight.rotate_step(
+            camera_world, aim_world, pitch_axis, self._yaw_angle, self._pitch_angle, rotation_mode
+        )
+        # Only the orbiting bone moves, the other one is the pivot
+        bone, new_pos_world = (camera, new_camera) if rotation_mode == 'AIM' else (aim, new_aim)
+        self._debug("new pos world %s", new_pos_world)
 
         # Convert back to local space
-        new_pos_local = self._camera_rig.matrix_world.inverted() @ new_pos_world
-        print("new pos local", new_pos_local)
+        new_pos_local = flight.bone_location(new_pos_world, session.rig_inverse, pose_offsets[bone.name])
+        self._debug("new pos local %s", new_pos_local)
+
+        self.stage_location(bone, new_pos_local)
 
-        pose_bone_offset = bone_a.matrix.translation - bone_a.matrix_basis.translation
-        print("pose bone offset", pose_bone_offset)
-        # Update bone location
-        bone_a.location = new_pos_local - pose_bone_offset        
-    
     def set_directions(self, bone):
-        self._local_matrix = bone.matrix.to_3x3()
-        self._forward = self._local_matrix @ Vector((0, 1, 0))
-        self._right = self._local_matrix @ Vector((1, 0, 0))
-        self._up = self._local_matrix @ Vector((0, 0, 1))
-    
-    def set_angles(self, mouse_event):
-        # Calculate yaw angle based on mouse X movement
-        self._yaw_angle = radians(self.rotate_speed_deg) * (mouse_event.mouse_x - mouse_event.mouse_prev_x) / 100.0
+        self._local_matrix = adapter.array(bone.matrix.to_3x3())
+        self._forward, self._right, self._up = flight.axes(self._local_matrix)
+
+    def set_angles(self, dx, dy):
+        # Yaw from mouse X movement, pitch from mouse Y movement
+        self._yaw_angle, self._pitch_angle = flight.mouse_angles(dx, dy, self.rotate_speed_deg)
+
+    def translate_bone(self, bone, displacement):
+        self.stage_location(bone, self.staged_location(bone) + displacement)
+
+    def staged_location(self, bone):
+        location = self._staged.get(bone.name)
+        return adapter.array(bone.location) if location is None else location
+
+    def stage_location(self, bone, location):
+        self._staged[bone.name] = location
+
+    def commit_pose(self):
+        """Write the bone locations staged by this tick's rotation, movement and autofocus in one batch."""
+        if self._staged:
+            self._session.write_locations(self._staged)
+            self._staged.clear()
 
-        # Calculate pitch angle based on mouse Y movement
-        self._pitch_angle = radians(self.rotate_speed_deg) * (mouse_event.mouse_y - mouse_event.mouse_prev_y) / 100.0
-    
-    def translate_bone(self, bone, delta):
-        bone.location += delta.normalized() * self.move_speed
-    
     def get_delta(self):
-        delta = Vector()
-        if 'W' in self.keys_pressed:
-            delta += self._forward
-        if 'S' in self.keys_pressed:
-            delta -= self._forward
-        if 'D' in self.keys_pressed:
-            delta += self._right
-        if 'A' in self.keys_pressed:
-            delta -= self._right
-        if 'E' in self.keys_pressed:
-            delta += self._up
-        if 'Q' in self.keys_pressed:
-            delta -= self._up
-        return delta
\ No newline at end of file
+        return flight.move_direction(self.keys_pressed, self._local_matrix)
+
+
+class CAMERAFLY_OT_reduce_keys(bpy.types.Operator):
+    """Remove keys of the Camera and Aim bones that stay within the set tolerances, linking the kept keys linearly"""
+    bl_idname = "camerafly.reduce_keys"
+    bl_label = "Reduce Keys"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        settings = getattr(context.scene, 'camerafly_settings', None)
+        camera = settings.active_camera if settings else None
+        return camera is not None and camera.parent is not None and camera.parent.type == 'ARMATURE'
+
+    def execute(self, context):
+        from . import fcurves
+        settings = context.scene.camerafly_settings
+        rig = settings.active_camera.parent
+        total, removed = fcurves.reduce_bone_keys(
+            rig,
+            {'Camera', 'Aim'},
+            settings.reduce_location_tolerance,
+            settings.reduce_rotation_tolerance,
+        )
+        if not total:
+            self.report({'WARNING'}, "No Camera or Aim keys to reduce")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Removed {removed} of {total} keys")
+        return {'FINISHED'}
+
+
+class CAMERAFLY_OT_fit_keys(bpy.types.Operator):
+    """Fit the keys of the Camera and Aim bones with the fewest Bezier keys within the set tolerances"""
+    bl_idname = "camerafly.fit_keys"
+    bl_label = "Fit Curves"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    target: bpy.props.EnumProperty(
+        name="Target",
+        items=[
+            ('KEYS', "Keys", "Replace the keys on the rig's action"),
+            ('CURVE', "Curve Objects", "Create a path curve object for each bone, leaving the keys"),
+        ],
+        default='KEYS',
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return CAMERAFLY_OT_reduce_keys.poll(context)
+
+    def execute(self, context):
+        from . import fcurves
+        settings = context.scene.camerafly_settings
+        rig = settings.active_camera.parent
+        if self.target == 'CURVE':
+            collection = rig.users_collection[0] if rig.users_collection else context.scene.collection
+            paths = [
+                fcurves.fit_bone_path(rig, name, settings.reduce_location_tolerance, collection)
+                for name in ('Camera', 'Aim')
+            ]
+            paths = [path for path in paths if path is not None]
+            if not paths:
+                self.report({'WARNING'}, "No Camera or Aim location keys to fit")
+                return {'CANCELLED'}
+            self.report({'INFO'}, f"Created {', '.join(path.name for path in paths)}")
+            return {'FINISHED'}
+
+        total, fitted = fcurves.fit_bone_keys(
+            rig,
+            {'Camera', 'Aim'},
+            settings.reduce_location_tolerance,
+            settings.reduce_rotation_tolerance,
+        )
+        if not total:
+            self.report({'WARNING'}, "No Camera or Aim keys to fit")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Fitted {total} keys with {fitted} Bezier keys")
+        return {'FINISHED'}
+
+
+class CAMERAFLY_OT_analyse_motion(bpy.types.Operator):
+    """Measure velocity, acceleration, jerk and turn rate of a flight and flag their spikes"""
+    bl_idname = "camerafly.analyse_motion"
+    bl_label = "Analyse Motion"
+    bl_options = {'REGISTER'}
+
+    source: bpy.props.EnumProperty(
+        name="Source",
+        items=[
+            ('ACTION', "Action", "Camera and Aim keys of the active camera's rig"),
+            ('TAKE', "Take", "Samples of the active take"),
+        ],
+        default='ACTION',
+    )
+
+    # Report of the last analysis, shown in the panel
+    last_report = None
+
+    def execute(self, context):
+        from .core import metrics
+        settings = context.scene.camerafly_settings
+        render = context.scene.render
+        fps = render.fps / render.fps_base
+        if self.source == 'TAKE':
+            flight_samples = self.take_samples(context.scene, fps)
+        else:
+            flight_samples = self.action_samples(settings, fps)
+        if flight_samples is None:
+            return {'CANCELLED'}
+
+        rig, frames, times, camera, aim = flight_samples
+        if len(times) < 3:
+            self.report({'WARNING'}, "Not enough samples to analyse")
+            return {'CANCELLED'}
+        # Bone locations are relative to the rest pose, the view direction needs the bones' positions
+        for positions, name in ((camera, 'Camera'), (aim, 'Aim')):
+            bone = rig.pose.bones[name]
+            positions += adapter.array(bone.matrix.translation - bone.matrix_basis.translation)
+
+        report = metrics.analyse(frames, times, camera, aim, {
+            'acceleration': settings.metrics_max_acceleration,
+            'jerk': settings.metrics_max_jerk,
+            'angular_velocity': settings.metrics_max_angular_velocity,
+        })
+        report['source'] = self.source
+        type(self).last_report = report
+
+        if settings.metrics_path:
+            path = bpy.path.abspath(settings.metrics_path)
+            try:
+                metrics.dump(report, path)
+            except OSError as e:
+                self.report({'WARNING'}, f"Could not write the report to {path}: {e}")
+
+        self.report({'INFO'}, f"Analysed {len(times)} samples, {report['spike_count']} spikes")
+        return {'FINISHED'}
+
+    def action_samples(self, settings, fps):
+        from . import fcurves
+        camera = settings.active_camera
+        rig = camera.parent if camera else None
+        if rig is None or rig.type != 'ARMATURE' or not all(name in rig.pose.bones for name in ('Camera', 'Aim')):
+            self.report({'ERROR'}, "The active camera is not on a dolly rig")
+            return None
+        frame_range = fcurves.keyed_frame_range(rig, {'Camera', 'Aim'})
+        if frame_range is None:
+            self.report({'WARNING'}, "No Camera or Aim keys to analyse")
+            return None
+
+        frames = np.arange(ceil(frame_range[0]), int(frame_range[1]) + 1, dtype=np.float64)
+        return (
+            rig,
+            frames,
+            frames / fps,
+            fcurves.bone_location_samples(rig, 'Camera', frames),
+            fcurves.bone_location_samples(rig, 'Aim', frames),
+        )
+
+    def take_samples(self, scene, fps):
+        settings = scene.camerafly_settings
+        if not 0 <= settings.active_take_index < len(settings.takes):
+            self.report({'WARNING'}, "No take selected")
+            return None
+        take = settings.takes[settings.active_take_index]
+        rig = take.camera.parent if take.camera else None
+        if rig is None or rig.type != 'ARMATURE' or not all(name in rig.pose.bones for name in ('Camera', 'Aim')):
+            self.report({'ERROR'}, f"The dolly rig of {take.name} is missing")
+            return None
+
+        samples = take.samples()
+        # Samples taken on the same timer tick carry no motion
+        times = samples[:, takes.TIME]
+        keep = np.concatenate(([True], np.diff(times) > 0.0))
+        samples = samples[keep]
+        # Measure on the frames the take is baked to, so spikes name the frames of its keys
+        frames = take.frame_start + samples[:, takes.TIME] * take_frame_rate(scene, take.synced)
+        return (
+            rig,
+            frames,
+            (frames - take.frame_start) / fps,
+            samples[:, takes.CAMERA_LOCATION].copy(),
+            samples[:, takes.AIM_LOCATION].copy(),
+        )
+
+
+class CAMERAFLY_OT_promote_take(bpy.types.Operator):
+    """Bake the active take into keys on its dolly rig"""
+    bl_idname = "camerafly.promote_take"
+    bl_label = "Promote Take"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        settings = getattr(context.scene, 'camerafly_settings', None)
+        return settings is not None and 0 <= settings.active_take_index < len(settings.takes)
+
+    def execute(self, context):
+        from . import fcurves
+        settings = context.scene.camerafly_settings
+        take = settings.takes[settings.active_take_index]
+        camera = take.camera
+        rig = camera.parent if camera else None
+        if rig is None or rig.type != 'ARMATURE' or not all(name in rig.pose.bones for name in ('Camera', 'Aim')):
+            self.report({'ERROR'}, f"The dolly rig of {take.name} is missing")
+            return {'CANCELLED'}
+
+        count = fcurves.write_take(
+            rig,
+            rig.pose.bones['Camera'],
+            rig.pose.bones['Aim'],
+            take.samples(),
+            take.frame_start,
+            take_frame_rate(context.scene, take.synced),
+            max(context.scene.frame_step, 1),
+        )
+        self.report({'INFO'}, f"Baked {take.name} into {count} keys per channel on {rig.name}")
+        return {'FINISHED'}
+
+
+class CAMERAFLY_OT_remove_take(bpy.types.Operator):
+    """Delete the active take"""
+    bl_idname = "camerafly.remove_take"
+    bl_label = "Remove Take"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        settings = getattr(context.scene, 'camerafly_settings', None)
+        return settings is not None and 0 <= settings.active_take_index < len(settings.takes)
+
+    def execute(self, context):
+        settings = context.scene.camerafly_settings
+        settings.takes.remove(settings.active_take_index)
+        settings.active_take_index = min(settings.active_take_index, len(settings.takes) - 1)
+        return {'FINISHED'}
+
+
+class CAMERAFLY_OT_replay_events(bpy.types.Operator):
+    """Fly the active camera again from a recorded event log"""
+    bl_idname = "camerafly.replay_events"
+    bl_label = "Replay Event Log"
+    bl_options = {'REGISTER'}
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+
+    speed: FloatProperty(
+        name="Speed",
+        description="Playback rate of the logged events, 0 replays them as fast as possible",
+        default=1.0,
+        min=0.0,
+        max=100.0,
+    )
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = context.scene.camerafly_settings.event_log_path
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        result = bpy.ops.pose.move_rotate_bone_local_pivot(
+            'INVOKE_DEFAULT', replay_path=self.filepath, replay_speed=self.speed
+        )
+        # A replay at speed keeps running as a modal session of the fly operator
+        if result & {'RUNNING_MODAL', 'FINISHED'}:
+            return {'FINISHED'}
+        return {'CANCELLED'}
@@ -1,10 +1,39 @@
 import bpy
-from bpy.types import Panel, UILayout, Operator
-from .__init__ import get_version
-
-# Store help visibility state
-if not hasattr(bpy.types.WindowManager, 'camerafly_show_help'):
-    bpy.types.WindowManager.camerafly_show_help = bpy.props.BoolProperty(default=False)
+from functools import wraps
+from bpy.types import Panel, UILayout, UIList, Operator
+from .version import get_version
+from .core import instrumentation
+from .ops import CAMERAFLY_OT_analyse_motion, POSE_OT_move_rotate_bone_local_pivot
+
+# Static texts, built once instead of on every redraw
+VERSION_LABEL = "CameraFly v" + get_version()
+SHORTCUT_REMINDERS = (
+    "• SHIFT/CTRL - Adjust speed",
+    "• ALT - Toggle rotation mode",
+    "• I - Insert keyframe",
+    "• R - Record take",
+    "• [ / ] - Step back/forward in pose history",
+)
+
+# Draw times of the panels, collected while instrumentation is enabled
+panel_stats = instrumentation.SessionStats()
+
+
+def timed_draw(draw):
+    """Record the draw time of a panel while instrumentation is enabled"""
+    clock = panel_stats.clock
+
+    @wraps(draw)
+    def wrapper(self, context):
+        settings = getattr(context.scene, 'camerafly_settings', None)
+        if settings is None or not settings.instrumentation_enabled:
+            return draw(self, context)
+        start = clock()
+        try:
+            return draw(self, context)
+        finally:
+            panel_stats.handler(self.bl_label).record(clock() - start)
+    return wrapper
 
 # UI Helper Functions
 def draw_shortcut(layout: UILayout, label: str, keys: list, description: str = ""):
@@ -35,12 +64,53 @@ def draw_setting(layout, settings, prop_name, label, suffix=""):
     if suffix:
         row.label(text=suffix)
 
+def draw_handler_stats(layout, stats):
+    """Draw a compact table of handler timings"""
+    if stats is None or not stats.handlers:
+        layout.label(text="No timings recorded yet")
+        return
+
+    header = layout.row(align=True)
+    for text in ("Handler", "Calls", "Mean", "p99", "Max"):
+        header.label(text=text)
+    for name, handler in stats.handlers.items():
+        summary = handler.summary()
+        row = layout.row(align=True)
+        row.label(text=name)
+        row.label(text=str(summary['count']))
+        row.label(text=f"{summary['mean_ms']:.2f}")
+        row.label(text=f"{summary['p99_ms']:.2f}")
+        row.label(text=f"{summary['max_ms']:.2f}")
+    layout.label(text="Times in ms")
+
+def draw_motion_report(layout, report):
+    """Draw the summary of the last motion quality analysis"""
+    if report is None:
+        layout.label(text="No flight analysed yet")
+        return
+
+    header = layout.row(align=True)
+    for text in ("Metric", "Mean", "p95", "Max"):
+        header.label(text=text)
+    for bone_name, bone_metrics in report['bones'].items():
+        for metric, summary in bone_metrics.items():
+            row = layout.row(align=True)
+            row.label(text=f"{bone_name} {metric.replace('_', ' ')}")
+            row.label(text=f"{summary['mean']:.2f}")
+            row.label(text=f"{summary['p95']:.2f}")
+            row.label(text=f"{summary['max']:.2f}")
+
+    icon = 'ERROR' if report['spike_count'] else 'CHECKMARK'
+    first, last = report['frames']
+    layout.label(text=f"{report['spike_count']} spikes in frames {first:.0f}-{last:.0f}", icon=icon)
+    for name, flagged in report['spikes'].items():
+        frames = ", ".join(f"{spike['start']:.0f}" for spike in flagged[:5])
+        more = f" +{len(flagged) - 5}" if len(flagged) > 5 else ""
+        layout.label(text=f"{name}: {frames}{more}")
+
 def draw_help_section(layout):
     """Draw the help section with all shortcuts organized by function"""
-    help_box = layout.box()
-    help_box.label(text="Shortcuts Reference", icon='HELP')
-
-    col = help_box.column()
+    col = layout.column()
 
     # Left column - Movement & Camera
     col.label(text="Movement:", icon='ARROW_LEFTRIGHT')
@@ -63,6 +133,8 @@ def draw_help_section(layout):
     col.separator()
     col.label(text="Animation:", icon='KEYINGSET')
     draw_shortcut(col, "Keyframe", ["I"], "Insert keyframe")
+    draw_shortcut(col, "Record Take", ["R"], "Start/stop recording a take")
+    draw_shortcut(col, "Pose History", ["[", "]"], "Step back/forward")
     # draw_shortcut(col, "Loc Only", ["I", "SHIFT"], "Location keyframe")
     # draw_shortcut(col, "Rot Only", ["I", "CTRL"], "Rotation keyframe")
 
@@ -80,6 +152,15 @@ def draw_help_section(layout):
     action_col_2.label(text="RIGHTMOUSE / ESC")
 
 
+class CAMERAFLY_UL_takes(UIList):
+    """List of the recorded takes"""
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "name", text="", emboss=False, icon='REC')
+        row.label(text=f"{item.frame_start}  {item.duration:.1f}s")
+
+
 class CAMERAFLY_PT_main_panel(Panel):
     """Creates a Panel in the 3D Viewport Toolbar"""
     bl_label = "Camera Fly Controls"
@@ -90,98 +171,216 @@ class CAMERAFLY_PT_main_panel(Panel):
     bl_context = ""
     bl_order = 10000
 
+    @timed_draw
     def draw(self, context):
         layout = self.layout
         scene = context.scene
-        wm = context.window_manager
-
-        # Check if camera fly settings exist
-        has_settings = hasattr(scene, 'camerafly_settings') and scene.camerafly_settings is not None
-        settings = scene.camerafly_settings if has_settings else None
-
-        # Minimal compact header with help toggle
-        header_row = layout.row(align=True)
-        header_row.label(text=f"Camera Fly", icon='CAMERA_DATA')
-
-        # Help toggle
-        help_icon = 'HIDE_ON' if wm.camerafly_show_help else 'HELP'
-        header_row.operator("wm.context_toggle", text="", icon=help_icon).data_path = "window_manager.camerafly_show_help"
+        settings = getattr(scene, 'camerafly_settings', None)
 
-        # Show help if enabled
-        if wm.camerafly_show_help:
-            draw_help_section(layout)
+        if POSE_OT_move_rotate_bone_local_pivot.flying:
+            # Keep redraws during a flight cheap
+            col = layout.column(align=True)
+            col.label(text="Flying", icon='PLAY')
+            col.label(text="Accept: LEFTMOUSE / SPACE", icon='CHECKMARK')
+            col.label(text="Cancel: RIGHTMOUSE / ESC", icon='X')
+            return
 
-        layout.separator()
-        content_area = layout.column(align=True)
-        content_area.scale_y = 0.9  # Slightly more compact content
-        col = content_area.column(align=True)
-
-        if has_settings:
-            # All settings in compact layout
-            
+        if settings is not None:
             # Camera selection
-            cam_box = col.box()
-            cam_box.label(text="Camera", icon='OUTLINER_OB_CAMERA')
-            cam_col = cam_box.column()
-            cam_row = cam_col.row()
+            cam_row = layout.row()
             cam_row.prop_search(settings, "active_camera", scene, "objects", text="", icon='CAMERA_DATA')
 
-            col.separator()
-            # Rotation Mode
-            mode_box = col.box()
-            mode_box.label(text="Rotation Mode", icon='ORIENTATION_GIMBAL')
-            mode_col = mode_box.column()
-            row = mode_col.row()
-            mode_icon = 'CAMERA_DATA' if settings.rotation_mode == 'CAMERA' else 'PIVOT_BOUNDBOX'
-            row.label(text=f"Mode:", icon=mode_icon)
-            row.prop(settings, "rotation_mode", text="")
-
-            # Brief mode description
-            info = "Camera rotates directly" if settings.rotation_mode == 'CAMERA' else "Camera rotates around Aim target"
-            mode_col.label(text=info, icon='INFO')
-
-            col.separator()
-
-            # Speed settings in compact rows
-            speeds_box = col.box()
-            speeds_box.label(text="Speed Settings", icon='SORTTIME')
-            speeds_col = speeds_box.column()
-            draw_setting(speeds_col, settings, "move_speed", "Movement", "units")
-            draw_setting(speeds_col, settings, "rotate_speed_deg", "Rotation", "deg")
-            draw_setting(speeds_col, settings, "aim_distance_step", "Aim", "units")
-
-            # Key shortcuts reminder
-            col.separator()
-            shortcut_box = col.box()
-            shortcut_box.label(text="Key Shortcuts", icon='KEYINGSET')
-            shortcut_col = shortcut_box.column(align=True)
-            shortcut_col.label(text="• SHIFT/CTRL - Adjust speed")
-            shortcut_col.label(text="• ALT - Toggle rotation mode")
-            shortcut_col.label(text="• I - Insert keyframe")
-            
             # Fly button
             fly_row = layout.row()
             fly_row.scale_y = 1.5
-            fly_op = fly_row.operator("pose.move_rotate_bone_local_pivot", text="Fly", icon='PLAY')
+            fly_row.operator("pose.move_rotate_bone_local_pivot", text="Fly", icon='PLAY')
 
+        version_row = layout.row()
+        version_row.alignment = 'CENTER'
+        version_row.label(text=VERSION_LABEL)
 
-        # Add some space at the bottom
-        layout.separator()
 
+class CameraFlySubPanel:
+    """Settings section of the main panel, only drawn while expanded and not flying"""
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Item'
+    bl_parent_id = "CAMERAFLY_PT_main_panel"
+    bl_options = {'DEFAULT_CLOSED'}
 
-        cancel_col = layout.column(align=True)
-        cancel_col.label(text="Exit Operator", icon='INFO')
+    @classmethod
+    def poll(cls, context):
+        return (
+            getattr(context.scene, 'camerafly_settings', None) is not None
+            and not POSE_OT_move_rotate_bone_local_pivot.flying
+        )
 
-        accept_row = cancel_col.row()
-        accept_row.label(text="To Accept", icon='CHECKMARK')
-        accept_row.label(text="SPACE")
 
-        cancel_row = cancel_col.row()
-        cancel_row.label(text="To Cancel", icon='X')
-        cancel_row.label(text="RIGHT MOUSE")
+class CAMERAFLY_PT_camera_options(CameraFlySubPanel, Panel):
+    bl_label = "Camera Options"
+    bl_idname = "CAMERAFLY_PT_camera_options"
+    bl_order = 0
 
-        layout.separator()
+    @timed_draw
+    def draw(self, context):
+        settings = context.scene.camerafly_settings
+        cam_col = self.layout.column()
+        cam_col.prop(settings, "formation_enabled")
+        if settings.formation_enabled:
+            cam_col.prop(settings, "formation_collection", text="")
+        cam_col.prop(settings, "collision_enabled")
+        if settings.collision_enabled:
+            draw_setting(cam_col, settings, "collision_radius", "Radius")
+            cam_col.prop(settings, "ground_follow")
+            if settings.ground_follow:
+                draw_setting(cam_col, settings, "ground_height", "Height")
+        cam_col.prop(settings, "autofocus_enabled")
+        if settings.autofocus_enabled:
+            draw_setting(cam_col, settings, "autofocus_rate", "Rate", "Hz")
+            draw_setting(cam_col, settings, "autofocus_smoothing", "Smoothing", "s")
+            draw_setting(cam_col, settings, "autofocus_max_distance", "Max Distance")
+        if settings.collision_enabled or settings.autofocus_enabled:
+            draw_setting(cam_col, settings, "collision_source", "Colliders")
+
+
+class CAMERAFLY_PT_rotation_mode(CameraFlySubPanel, Panel):
+    bl_label = "Rotation Mode"
+    bl_idname = "CAMERAFLY_PT_rotation_mode"
+    bl_options = set()
+    bl_order = 1
+
+    @timed_draw
+    def draw(self, context):
+        settings = context.scene.camerafly_settings
+        mode_col = self.layout.column()
+        row = mode_col.row()
+        mode_icon = 'CAMERA_DATA' if settings.rotation_mode == 'CAMERA' else 'PIVOT_BOUNDBOX'
+        row.label(text="Mode:", icon=mode_icon)
+        row.prop(settings, "rotation_mode", text="")
 
-        version_row = layout.row()
-        version_row.alignment = 'CENTER'
-        version_row.label(text="CameraFly v" + str(get_version()))
\ No newline at end of file
+        # Brief mode description
+        info = "Camera rotates directly" if settings.rotation_mode == 'CAMERA' else "Camera rotates around Aim target"
+        mode_col.label(text=info, icon='INFO')
+
+
+class CAMERAFLY_PT_speed_settings(CameraFlySubPanel, Panel):
+    bl_label = "Speed Settings"
+    bl_idname = "CAMERAFLY_PT_speed_settings"
+    bl_order = 2
+
+    @timed_draw
+    def draw(self, context):
+        settings = context.scene.camerafly_settings
+        speeds_col = self.layout.column()
+        draw_setting(speeds_col, settings, "move_speed", "Movement", "units/s")
+        draw_setting(speeds_col, settings, "move_acceleration", "Accel", "units/s²")
+        draw_setting(speeds_col, settings, "move_deceleration", "Decel", "units/s²")
+        draw_setting(speeds_col, settings, "rotate_speed_deg", "Rotation", "deg")
+        draw_setting(speeds_col, settings, "aim_distance_step", "Aim", "units")
+        draw_setting(speeds_col, settings, "take_max_seconds", "Max Take", "s")
+        draw_setting(speeds_col, settings, "mouse_filter", "Mouse Filter")
+        if settings.mouse_filter == 'ONE_EURO':
+            draw_setting(speeds_col, settings, "filter_min_cutoff", "Min Cutoff", "Hz")
+            draw_setting(speeds_col, settings, "filter_beta", "Beta")
+            draw_setting(speeds_col, settings, "filter_d_cutoff", "Speed Cutoff", "Hz")
+        draw_setting(speeds_col, settings, "update_rate", "Update Rate")
+        draw_setting(speeds_col, settings, "idle_heartbeat", "Idle Heartbeat", "s")
+
+
+class CAMERAFLY_PT_keyframes(CameraFlySubPanel, Panel):
+    bl_label = "Keyframes"
+    bl_idname = "CAMERAFLY_PT_keyframes"
+    bl_order = 3
+
+    @timed_draw
+    def draw(self, context):
+        settings = context.scene.camerafly_settings
+        key_col = self.layout.column()
+        draw_setting(key_col, settings, "keyframe_type", "Channels")
+        draw_setting(key_col, settings, "history_size", "Pose History")
+        draw_setting(key_col, settings, "history_interval", "History Interval", "s")
+
+        # Key reduction of recorded flights
+        key_col.separator()
+        draw_setting(key_col, settings, "reduce_location_tolerance", "Loc Tolerance", "units")
+        draw_setting(key_col, settings, "reduce_rotation_tolerance", "Rot Tolerance", "deg")
+        key_row = key_col.row(align=True)
+        key_row.operator("camerafly.reduce_keys", icon='IPO_LINEAR')
+        key_row.operator("camerafly.fit_keys", icon='IPO_BEZIER').target = 'KEYS'
+        key_row.operator("camerafly.fit_keys", text="", icon='CURVE_BEZCURVE').target = 'CURVE'
+
+
+class CAMERAFLY_PT_takes(CameraFlySubPanel, Panel):
+    bl_label = "Takes"
+    bl_idname = "CAMERAFLY_PT_takes"
+    bl_order = 4
+
+    @timed_draw
+    def draw(self, context):
+        settings = context.scene.camerafly_settings
+        take_col = self.layout.column()
+        draw_setting(take_col, settings, "take_target", "Record To")
+        draw_setting(take_col, settings, "take_sync", "Timing")
+        draw_setting(take_col, settings, "take_time_scale", "Time Scale")
+        take_col.template_list(
+            "CAMERAFLY_UL_takes", "", settings, "takes", settings, "active_take_index", rows=3
+        )
+        take_row = take_col.row(align=True)
+        take_row.operator("camerafly.promote_take", icon='KEYFRAME_HLT')
+        take_row.operator("camerafly.remove_take", text="", icon='X')
+
+
+class CAMERAFLY_PT_motion_quality(CameraFlySubPanel, Panel):
+    bl_label = "Motion Quality"
+    bl_idname = "CAMERAFLY_PT_motion_quality"
+    bl_order = 5
+
+    @timed_draw
+    def draw(self, context):
+        settings = context.scene.camerafly_settings
+        quality_col = self.layout.column()
+        draw_setting(quality_col, settings, "metrics_max_acceleration", "Max Accel", "units/s²")
+        draw_setting(quality_col, settings, "metrics_max_jerk", "Max Jerk", "units/s³")
+        draw_setting(quality_col, settings, "metrics_max_angular_velocity", "Max Turn", "deg/s")
+        draw_setting(quality_col, settings, "metrics_path", "Report File")
+        quality_row = quality_col.row(align=True)
+        quality_row.operator("camerafly.analyse_motion", text="Analyse Action").source = 'ACTION'
+        quality_row.operator("camerafly.analyse_motion", text="Analyse Take").source = 'TAKE'
+        draw_motion_report(quality_col, CAMERAFLY_OT_analyse_motion.last_report)
+
+
+class CAMERAFLY_PT_instrumentation(CameraFlySubPanel, Panel):
+    bl_label = "Instrumentation"
+    bl_idname = "CAMERAFLY_PT_instrumentation"
+    bl_order = 6
+
+    @timed_draw
+    def draw(self, context):
+        settings = context.scene.camerafly_settings
+        stats_col = self.layout.column()
+        stats_col.prop(settings, "instrumentation_enabled")
+        draw_setting(stats_col, settings, "log_level", "Log Level")
+        draw_setting(stats_col, settings, "stats_path", "Stats File")
+        stats_col.prop(settings, "record_events")
+        draw_setting(stats_col, settings, "event_log_path", "Event Log")
+        stats_col.operator("camerafly.replay_events", icon='PLAY')
+        if settings.instrumentation_enabled:
+            stats_col.label(text="Fly Operator", icon='TIME')
+            draw_handler_stats(stats_col, POSE_OT_move_rotate_bone_local_pivot.session_stats)
+            stats_col.label(text="Panel Draw", icon='TIME')
+            draw_handler_stats(stats_col, panel_stats)
+
+
+class CAMERAFLY_PT_shortcuts(CameraFlySubPanel, Panel):
+    bl_label = "Shortcuts"
+    bl_idname = "CAMERAFLY_PT_shortcuts"
+    bl_order = 7
+
+    @timed_draw
+    def draw(self, context):
+        layout = self.layout
+        shortcut_col = layout.column(align=True)
+        for text in SHORTCUT_REMINDERS:
+            shortcut_col.label(text=text)
+        layout.separator()
+        draw_help_section(layout)
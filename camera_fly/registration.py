@@ -0,0 +1,30 @@
+# Generated by auto_load.write_manifest(), do not edit.
+# Enable the add-on with CAMERAFLY_DEV_AUTOLOAD=1 set to regenerate it.
+
+MODULES = (
+    "ops",
+    "panels",
+    "rig_index",
+)
+
+CLASSES = (
+    ("ops", "CAMERAFLY_OT_analyse_motion"),
+    ("ops", "CAMERAFLY_OT_fit_keys"),
+    ("ops", "CAMERAFLY_OT_promote_take"),
+    ("ops", "CAMERAFLY_OT_reduce_keys"),
+    ("ops", "CAMERAFLY_OT_remove_take"),
+    ("ops", "CAMERAFLY_OT_replay_events"),
+    ("ops", "CameraFlyTake"),
+    ("ops", "POSE_OT_move_rotate_bone_local_pivot"),
+    ("panels", "CAMERAFLY_UL_takes"),
+    ("panels", "CAMERAFLY_PT_main_panel"),
+    ("ops", "CameraFlyProperties"),
+    ("panels", "CAMERAFLY_PT_camera_options"),
+    ("panels", "CAMERAFLY_PT_rotation_mode"),
+    ("panels", "CAMERAFLY_PT_speed_settings"),
+    ("panels", "CAMERAFLY_PT_keyframes"),
+    ("panels", "CAMERAFLY_PT_takes"),
+    ("panels", "CAMERAFLY_PT_motion_quality"),
+    ("panels", "CAMERAFLY_PT_instrumentation"),
+    ("panels", "CAMERAFLY_PT_shortcuts"),
+)
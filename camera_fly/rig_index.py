@@ -0,0 +1,105 @@
+import bpy
+from bpy.app.handlers import persistent
+
+
+def is_dolly_rig_camera(camera):
+    """Check if the camera is parented to a rig with the bones of a dolly rig."""
+    if not camera or not camera.parent or camera.parent.type != 'ARMATURE':
+        return False
+
+    bones = camera.parent.pose.bones
+    return 'Root' in bones and 'Aim' in bones
+
+
+class DollyRigIndex:
+    """Cameras on dolly rigs, so polling a camera is a dictionary lookup.
+
+    The index is built on first use and kept up to date from the depsgraph
+    updates of cameras and of the rigs they are parented to. Cameras added
+    or renamed since are checked on their first lookup. Undo and loading a
+    file start over.
+    """
+
+    def __init__(self):
+        # Camera name to whether it's on a dolly rig
+        self._valid = None
+        # Rig name to the names of the cameras parented to it
+        self._rig_cameras = {}
+
+    def __contains__(self, camera):
+        if self._valid is None:
+            self.build()
+        valid = self._valid.get(camera.name)
+        if valid is None:
+            valid = self.update_camera(camera)
+        return valid
+
+    def invalidate(self):
+        self._valid = None
+        self._rig_cameras = {}
+
+    def build(self):
+        self._valid = {}
+        self._rig_cameras = {}
+        for obj in bpy.data.objects:
+            if obj.type == 'CAMERA':
+                self.update_camera(obj)
+
+    def update_camera(self, camera):
+        valid = is_dolly_rig_camera(camera)
+        self._valid[camera.name] = valid
+        parent = camera.parent
+        if parent is not None and parent.type == 'ARMATURE':
+            self._rig_cameras.setdefault(parent.name, set()).add(camera.name)
+        return valid
+
+    def on_depsgraph_update(self, depsgraph):
+        if self._valid is None or not depsgraph.id_type_updated('OBJECT'):
+            return
+        objects = bpy.data.objects
+        for update in depsgraph.updates:
+            if not isinstance(update.id, bpy.types.Object):
+                continue
+            obj = update.id.original
+            if obj.type == 'CAMERA':
+                self.update_camera(obj)
+            elif obj.type == 'ARMATURE':
+                # Bones of the rig may have been added, renamed or removed
+                for name in self._rig_cameras.get(obj.name, ()):
+                    camera = objects.get(name)
+                    if camera is not None:
+                        self.update_camera(camera)
+
+
+dolly_rigs = DollyRigIndex()
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    dolly_rigs.on_depsgraph_update(depsgraph)
+
+
+@persistent
+def _on_reset(*args):
+    dolly_rigs.invalidate()
+
+
+_HANDLERS = (
+    (bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update),
+    (bpy.app.handlers.undo_post, _on_reset),
+    (bpy.app.handlers.redo_post, _on_reset),
+    (bpy.app.handlers.load_post, _on_reset),
+)
+
+
+def register():
+    for handlers, handler in _HANDLERS:
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def unregister():
+    for handlers, handler in _HANDLERS:
+        if handler in handlers:
+            handlers.remove(handler)
+    dolly_rigs.invalidate()
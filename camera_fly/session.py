@@ -0,0 +1,121 @@
+import bpy
+import numpy as np
+from . import adapter
+
+
+class RigSession:
+    """Handles of the dolly rig flown in a fly session.
+
+    The rig, its bones, the scene settings and the rig's world matrix are
+    resolved once. Depsgraph, frame change and undo handlers keep them valid,
+    so the operator's event handlers don't need to look anything up by name.
+    """
+
+    def __init__(self, scene, camera):
+        self.scene = scene
+        self.camera_name = camera.name
+        self.stale = True
+        self.rig_moved = False
+        self.resolve(camera)
+
+    def resolve(self, camera=None):
+        """Look up the rig handles again.
+
+        Returns:
+            True if the rig is still a valid dolly rig
+        """
+        if camera is None:
+            camera = self.scene.objects.get(self.camera_name)
+        rig = camera.parent if camera else None
+        if rig is None or rig.type != 'ARMATURE':
+            return False
+
+        bones = rig.pose.bones
+        self.settings = self.scene.camerafly_settings
+        self.camera = camera
+        self.rig = rig
+        self.root_bone = bones.get('Root')
+        self.aim_bone = bones.get('Aim')
+        self.camera_bone = bones.get('Camera')
+        if not (self.root_bone and self.aim_bone and self.camera_bone):
+            return False
+
+        # The raw location arrays, unlike the Vectors of bone.location, can be written without an RNA update
+        self._location_arrays = {
+            bone.name: bone.path_resolve('location', False) for bone in (self.camera_bone, self.aim_bone)
+        }
+        self._location = np.empty(3, dtype=np.float32)
+        self.update_rig_matrix()
+        self.update_pose_offsets()
+        self.stale = False
+        return True
+
+    def update_rig_matrix(self):
+        self.rig_matrix = adapter.array(self.rig.matrix_world)
+        self.rig_inverse = np.linalg.inv(self.rig_matrix)
+        self.rig_moved = False
+
+    def update_pose_offsets(self):
+        """Take the offsets of the Camera and Aim bones' armature space position to their location.
+
+        The offsets only change with the Root bone, so the bones' positions can
+        be computed from their locations without waiting for the depsgraph.
+        An animated Root moves them on every frame change.
+        """
+        self.pose_offsets = {
+            bone.name: adapter.array(bone.matrix.translation - bone.matrix_basis.translation)
+            for bone in (self.camera_bone, self.aim_bone)
+        }
+
+    def write_locations(self, locations):
+        """Write the locations of the Camera and/or Aim bone, touching no other bone.
+
+        Args:
+            locations: Dict of bone name to location
+        """
+        value = self._location
+        for name, location in locations.items():
+            value[:] = location
+            self._location_arrays[name].foreach_set(value)
+        # foreach_set doesn't tag the rig, tag its pose once instead of per bone
+        self.rig.update_tag(refresh={'DATA'})
+
+    # Invalidation
+    #################################################
+
+    def start(self):
+        bpy.app.handlers.depsgraph_update_post.append(self.on_depsgraph_update)
+        bpy.app.handlers.undo_post.append(self.on_undo)
+        bpy.app.handlers.redo_post.append(self.on_undo)
+        bpy.app.handlers.frame_change_post.append(self.on_frame_change)
+
+    def stop(self):
+        for handlers in (
+            bpy.app.handlers.depsgraph_update_post,
+            bpy.app.handlers.undo_post,
+            bpy.app.handlers.redo_post,
+            bpy.app.handlers.frame_change_post,
+        ):
+            for handler in (self.on_depsgraph_update, self.on_undo, self.on_frame_change):
+                if handler in handlers:
+                    handlers.remove(handler)
+
+    def on_depsgraph_update(self, scene, depsgraph):
+        if self.stale:
+            return
+        # Pose edits only tag the rig's geometry, the world matrix changes with its transform
+        for update in depsgraph.updates:
+            if update.is_updated_transform and update.id.original == self.rig:
+                self.rig_moved = True
+                return
+
+    def on_frame_change(self, scene, depsgraph=None):
+        if self.stale:
+            return
+        # The frame was just evaluated, the bone matrices hold the Root bone's pose on it
+        self.update_pose_offsets()
+
+    def on_undo(self, scene, *args):
+        # Undo replaces the data blocks, every handle has to be looked up again
+        self.scene = scene
+        self.stale = True
@@ -0,0 +1,12 @@
+extension_version = (2, 1, 4)
+
+
+def get_version():
+    version = extension_version
+    parts = str(version).split(",")
+    for i in range(len(parts)):
+        parts[i] = ''.join(filter(str.isdigit, parts[i]))
+
+    version = parts[0] + '.' + parts[1] + '.' + parts[2]
+        
+    return version
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import the core package on its own so the add-on's bpy imports are skipped
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "camera_fly"))
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core import eventlog
+
+
+def event(type, value, x=0, y=0, **modifiers):
+    return SimpleNamespace(
+        type=type, value=value, mouse_x=x, mouse_y=y, mouse_prev_x=x - 1, mouse_prev_y=y + 1,
+        shift=modifiers.get('shift', False), ctrl=modifiers.get('ctrl', False),
+        alt=modifiers.get('alt', False), oskey=False, is_repeat=modifiers.get('is_repeat', False),
+    )
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.cflylog"
+    recorded = [
+        (0.0, event('W', 'PRESS', shift=True)),
+        (0.016, event('TIMER', 'NOTHING')),
+        (0.02, event('MOUSEMOVE', 'NOTHING', 120, -4)),
+        (0.5, event('W', 'RELEASE', is_repeat=True, ctrl=True, alt=True)),
+    ]
+    recorder = eventlog.EventRecorder({'settings': {'move_speed': 5.0}})
+    for time, logged in recorded:
+        recorder.record(time, logged)
+    recorder.write(path)
+
+    metadata, events = eventlog.read_event_log(path)
+    assert metadata == {'settings': {'move_speed': 5.0}}
+    assert len(events) == recorder.count == len(recorded)
+    for (time, expected), read in zip(recorded, events):
+        assert read.time == time
+        for name in ('type', 'value', 'shift', 'ctrl', 'alt', 'oskey', 'is_repeat',
+                     'mouse_x', 'mouse_y', 'mouse_prev_x', 'mouse_prev_y'):
+            assert getattr(read, name) == getattr(expected, name)
+
+
+def test_empty_log(tmp_path):
+    path = tmp_path / "empty.cflylog"
+    eventlog.EventRecorder().write(path)
+    assert eventlog.read_event_log(path) == ({}, [])
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not an event log")
+    with pytest.raises(ValueError):
+        eventlog.read_event_log(path)
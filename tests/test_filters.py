@@ -0,0 +1,24 @@
+from core import filters
+
+
+def test_delta_filter_settles_on_the_raw_movement():
+    delta_filter = filters.one_euro_delta_filter(1.0, 0.0, 1.0)
+    total_x = total_y = 0.0
+    dx, dy = delta_filter(10.0, -4.0, 0.0)
+    total_x += dx
+    total_y += dy
+    # Without further movement the output catches up with the input
+    t = 0.0
+    while not delta_filter.settled:
+        t += 1.0 / 60.0
+        dx, dy = delta_filter(0.0, 0.0, t)
+        total_x += dx
+        total_y += dy
+        assert t < 10.0
+    assert (total_x, total_y) == (10.0, -4.0)
+
+
+def test_one_euro_ignores_repeated_timestamps():
+    one_euro = filters.OneEuroFilter(1.0, 0.0, 1.0)
+    assert one_euro(1.0, 0.0) == 1.0
+    assert one_euro(5.0, 0.0) == 1.0
@@ -0,0 +1,49 @@
+import numpy as np
+
+from core import fitting, reduction
+
+
+def bezier_segment(p0, p1, p2, p3, u):
+    u = u[:, None]
+    return (1 - u) ** 3 * p0 + 3 * (1 - u) ** 2 * u * p1 + 3 * (1 - u) * u ** 2 * p2 + u ** 3 * p3
+
+
+def test_fit_stays_within_tolerance():
+    times = np.linspace(0.0, 10.0, 1000)
+    values = np.column_stack((np.sin(times), np.cos(times * 0.5), times * 0.1))
+    tolerance = 1e-3
+    knots, knot_values, knot_slopes = fitting.fit_spline(times, values, [([0, 1, 2], reduction.LINEAR, tolerance)])
+
+    assert knots[0] == 0 and knots[-1] == len(times) - 1
+    assert len(knots) < len(times) // 10
+    fitted = fitting.evaluate_hermite(times, times[knots], knot_values, knot_slopes)
+    assert np.linalg.norm(values - fitted, axis=1).max() <= tolerance
+
+
+def test_cubic_is_fitted_exactly():
+    times = np.linspace(-1.0, 1.0, 200)
+    values = (times ** 3 - times)[:, None]
+    knot_times = np.array([-1.0, 1.0])
+    knot_values, knot_slopes = fitting.fit_hermite(times, values, knot_times)
+    fitted = fitting.evaluate_hermite(times, knot_times, knot_values, knot_slopes)
+    np.testing.assert_allclose(fitted, values, atol=1e-6)
+
+
+def test_bezier_handles_reproduce_the_spline():
+    times = np.linspace(0.0, 4.0, 400)
+    values = np.column_stack((np.sin(times), times ** 2))
+    knots, knot_values, knot_slopes = fitting.fit_spline(times, values, [([0, 1], reduction.LINEAR, 1e-3)])
+    knot_times = times[knots]
+    left, right = fitting.bezier_handles(knot_times, knot_values, knot_slopes)
+
+    u = np.linspace(0.0, 1.0, 11)
+    for k in range(len(knots) - 1):
+        start = np.column_stack((knot_times[k:k + 1], knot_values[k:k + 1]))[0]
+        end = np.column_stack((knot_times[k + 1:k + 2], knot_values[k + 1:k + 2]))[0]
+        # Handles are (time, value) pairs per channel, compare channel by channel
+        for channel in range(values.shape[1]):
+            curve = bezier_segment(
+                start[[0, channel + 1]], right[k, :, channel], left[k + 1, :, channel], end[[0, channel + 1]], u
+            )
+            expected = fitting.evaluate_hermite(curve[:, 0], knot_times, knot_values, knot_slopes)[:, channel]
+            np.testing.assert_allclose(curve[:, 1], expected, atol=1e-9)
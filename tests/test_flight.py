@@ -0,0 +1,98 @@
+from math import asin, degrees, radians
+
+import numpy as np
+import pytest
+
+from core import flight
+
+CAMERA = np.array((0.0, 0.0, 1.0))
+AIM = np.array((0.0, 10.0, 1.0))
+RIGHT = np.array((1.0, 0.0, 0.0))
+
+
+def elevation(camera, aim):
+    view = aim - camera
+    return degrees(asin(view[2] / np.linalg.norm(view)))
+
+
+@pytest.mark.parametrize('mode', ['CAMERA', 'AIM'])
+def test_zero_delta_keeps_the_pose(mode):
+    camera, aim = flight.rotate_step(CAMERA, AIM, RIGHT, 0.0, 0.0, mode)
+    np.testing.assert_allclose(camera, CAMERA)
+    np.testing.assert_allclose(aim, AIM)
+
+
+def test_camera_mode_swings_the_aim():
+    camera, aim = flight.rotate_step(CAMERA, AIM, RIGHT, 0.1, 0.0, 'CAMERA')
+    np.testing.assert_array_equal(camera, CAMERA)
+    # Positive yaw turns the view to the right
+    assert aim[0] > 0.0
+    assert np.isclose(np.linalg.norm(aim - camera), 10.0)
+
+    camera, aim = flight.rotate_step(CAMERA, AIM, RIGHT, 0.0, 0.1, 'CAMERA')
+    # Positive pitch raises the aim by the pitch angle
+    assert elevation(camera, aim) == pytest.approx(degrees(0.1))
+
+
+def test_aim_mode_orbits_the_camera():
+    camera, aim = flight.rotate_step(CAMERA, AIM, RIGHT, 0.1, 0.0, 'AIM')
+    np.testing.assert_array_equal(aim, AIM)
+    # Positive yaw moves the camera to the right around the aim
+    assert camera[0] > 0.0
+    assert np.isclose(np.linalg.norm(aim - camera), 10.0)
+
+    camera, aim = flight.rotate_step(CAMERA, AIM, RIGHT, 0.0, 0.1, 'AIM')
+    # Positive pitch raises the camera, so it looks down on the aim
+    assert camera[2] > CAMERA[2]
+    assert elevation(camera, aim) == pytest.approx(-degrees(0.1))
+
+
+@pytest.mark.parametrize('mode, pitch, limit', [
+    ('CAMERA', 3.0, 89.0),
+    ('CAMERA', -3.0, -89.0),
+    ('AIM', 3.0, -89.0),
+    ('AIM', -3.0, 89.0),
+])
+def test_pitch_stops_short_of_vertical(mode, pitch, limit):
+    camera, aim = flight.rotate_step(CAMERA, AIM, RIGHT, 0.0, pitch, mode)
+    assert elevation(camera, aim) == pytest.approx(limit)
+    # Pitching further at the limit doesn't flip the view over
+    camera, aim = flight.rotate_step(camera, aim, RIGHT, 0.0, pitch, mode)
+    assert elevation(camera, aim) == pytest.approx(limit)
+    assert (aim - camera)[1] > 0.0
+
+
+def test_mouse_angles_scale_with_the_rotation_speed():
+    yaw, pitch = flight.mouse_angles(100, -50, 10.0)
+    assert yaw == pytest.approx(radians(10.0))
+    assert pitch == pytest.approx(-radians(5.0))
+
+
+def test_move_direction_sums_the_held_keys():
+    basis = flight.rotation_matrix((0.0, 0.0, 1.0), radians(90.0))
+    forward, right, up = flight.axes(basis)
+    np.testing.assert_allclose(flight.move_direction({'W', 'D'}, basis), forward + right, atol=1e-12)
+    np.testing.assert_allclose(flight.move_direction({'W', 'S'}, basis), np.zeros(3), atol=1e-12)
+    np.testing.assert_allclose(flight.move_direction({'E', 'X'}, basis), up, atol=1e-12)
+
+
+def test_bone_location_inverts_the_rig_transform():
+    rig = np.eye(4)
+    rig[:3, :3] = flight.rotation_matrix((0.2, 0.3, 0.9), 0.7) * 2.0
+    rig[:3, 3] = (1.0, -2.0, 3.0)
+    offset = np.array((0.0, 0.5, 0.0))
+    location = np.array((1.0, 2.0, 3.0))
+    world = flight.transform_point(rig, location + offset)
+    np.testing.assert_allclose(flight.bone_location(world, np.linalg.inv(rig), offset), location)
+
+
+def test_batched_orbit_matches_single_rotations():
+    rng = np.random.default_rng(3)
+    points = rng.normal(size=(6, 3))
+    pivots = rng.normal(size=(6, 3))
+    yaws = rng.uniform(-1.0, 1.0, 6)
+    pitches = rng.uniform(-1.0, 1.0, 6)
+    rights = np.tile(RIGHT, (6, 1))
+    batched = flight.orbit(points, pivots, yaws, pitches, rights)
+    for i in range(6):
+        np.testing.assert_allclose(batched[i], flight.orbit(points[i], pivots[i], yaws[i], pitches[i], RIGHT))
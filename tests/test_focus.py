@@ -0,0 +1,47 @@
+from math import exp
+
+import pytest
+
+from core.focus import FocusFollower
+
+
+def test_raycast_due_every_interval():
+    follower = FocusFollower(interval=0.1, smoothing=0.2)
+    assert follower.due(0.0)
+    follower.set_target(5.0, 0.0)
+    assert not follower.due(0.05)
+    assert follower.due(0.1)
+
+
+def test_miss_keeps_last_target():
+    follower = FocusFollower(interval=0.1, smoothing=0.2)
+    follower.set_target(5.0, 0.0)
+    follower.set_target(None, 0.1)
+    assert follower.target == 5.0
+    assert not follower.due(0.15)
+
+
+def test_step_eases_towards_target():
+    follower = FocusFollower(interval=0.1, smoothing=0.5)
+    assert follower.step(3.0, 0.1) == 3.0
+    assert follower.settled
+
+    follower.set_target(8.0, 0.0)
+    assert not follower.settled
+    distance = follower.step(3.0, 0.25)
+    assert distance == pytest.approx(3.0 + 5.0 * (1.0 - exp(-0.5)))
+    # Two half steps land where one full step does
+    half = FocusFollower(interval=0.1, smoothing=0.5)
+    half.set_target(8.0, 0.0)
+    assert half.step(half.step(3.0, 0.125), 0.125) == pytest.approx(distance)
+
+    for _ in range(200):
+        distance = follower.step(distance, 0.1)
+    assert follower.settled
+
+
+def test_no_smoothing_jumps_to_target():
+    follower = FocusFollower(interval=0.1, smoothing=0.0)
+    follower.set_target(4.0, 0.0)
+    assert follower.step(1.0, 0.01) == 4.0
+    assert follower.settled
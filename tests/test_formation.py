@@ -0,0 +1,43 @@
+import numpy as np
+
+from core.formation import Formation, heading_frame
+
+
+def test_heading_frame_is_orthonormal():
+    frame = heading_frame((1.0, 2.0, 3.0), (4.0, 6.0, 5.0))
+    axes = frame[:3, :3]
+    np.testing.assert_allclose(axes.T @ axes, np.eye(3), atol=1e-12)
+    assert np.isclose(np.linalg.det(axes), 1.0)
+    np.testing.assert_allclose(frame[:3, 3], (1.0, 2.0, 3.0))
+    # Right stays level, up leans towards world Z
+    assert abs(frame[2, 0]) < 1e-12
+    assert frame[2, 2] > 0.0
+
+
+def test_heading_frame_looking_straight_down():
+    frame = heading_frame((0.0, 0.0, 5.0), (0.0, 0.0, 0.0), fallback_right=(0.0, -1.0, 0.0))
+    np.testing.assert_allclose(frame[:3, 0], (0.0, -1.0, 0.0))
+    np.testing.assert_allclose(frame[:3, 1], (0.0, 0.0, -1.0))
+
+
+def test_heading_frame_with_aim_on_the_camera():
+    frame = heading_frame((1.0, 1.0, 1.0), (1.0, 1.0, 1.0), fallback_forward=(-1.0, 0.0, 0.0))
+    assert np.isfinite(frame).all()
+    np.testing.assert_allclose(frame[:3, 1], (-1.0, 0.0, 0.0))
+    np.testing.assert_allclose(frame[:3, 0], (0.0, 1.0, 0.0), atol=1e-12)
+
+
+def test_followers_keep_their_place_in_the_formation():
+    points = np.array([[2.0, 0.0, 0.0], [-2.0, -1.0, 0.5]])
+    formation = Formation((0.0, 0.0, 0.0), (0.0, 1.0, 0.0), points)
+    np.testing.assert_allclose(formation.follow((0.0, 0.0, 0.0), (0.0, 1.0, 0.0)), points, atol=1e-12)
+
+    # Leader moved by (1, 1, 0) and turned 90 degrees to the left
+    moved = formation.follow((1.0, 1.0, 0.0), (0.0, 1.0, 0.0))
+    np.testing.assert_allclose(moved, [[1.0, 3.0, 0.0], [2.0, -1.0, 0.5]], atol=1e-12)
+
+
+def test_follow_keeps_the_last_heading_when_the_aim_reaches_the_camera():
+    formation = Formation((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), [[0.0, -3.0, 0.0]])
+    expected = formation.follow((0.0, 0.0, 0.0), (1.0, 0.0, 0.0))
+    np.testing.assert_allclose(formation.follow((0.0, 0.0, 0.0), (0.0, 0.0, 0.0)), expected, atol=1e-12)
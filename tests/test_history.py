@@ -0,0 +1,51 @@
+import numpy as np
+
+from core.history import PoseHistory
+
+
+def record(history, value):
+    history.record()[:] = value
+
+
+def test_step_back_and_forward():
+    history = PoseHistory(5, 2)
+    assert history.step(-1) is None
+    for value in range(3):
+        record(history, value)
+    assert len(history) == 3 and history.position == 2
+
+    assert history.step(-1)[0, 0, 0] == 1.0
+    assert history.step(-5)[0, 0, 0] == 0.0
+    assert history.step(-1) is None
+    assert history.step(2)[0, 0, 0] == 2.0
+    assert history.step(1) is None
+
+
+def test_record_after_stepping_back_drops_the_later_poses():
+    history = PoseHistory(5, 1)
+    for value in range(4):
+        record(history, value)
+    history.step(-2)
+    record(history, 10)
+    assert len(history) == 3
+    assert history.step(1) is None
+    assert history.step(-1)[0, 0, 0] == 1.0
+    assert history.step(1)[0, 0, 0] == 10.0
+
+
+def test_full_history_drops_the_oldest_pose():
+    history = PoseHistory(3, 1)
+    for value in range(5):
+        record(history, value)
+    assert len(history) == 3
+    poses = [history.step(-1)[0, 0, 0], history.step(-1)[0, 0, 0]]
+    assert poses == [3.0, 2.0]
+    assert history.step(-1) is None
+
+
+def test_clear():
+    history = PoseHistory(3, 1)
+    record(history, np.eye(4))
+    history.clear()
+    assert len(history) == 0 and history.position == -1
+    assert history.step(-1) is None
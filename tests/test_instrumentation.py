@@ -0,0 +1,70 @@
+import json
+import logging
+
+import pytest
+
+from core import instrumentation
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_handler_stats_histogram():
+    stats = instrumentation.HandlerStats()
+    for seconds in (0.5e-6, 3e-6, 3e-6, 100e-6):
+        stats.record(seconds)
+    assert stats.count == 4
+    assert stats.min == 0.5e-6 and stats.max == 100e-6
+    # Bucket i holds the calls under 2**i microseconds
+    assert stats.buckets[0] == 1 and stats.buckets[2] == 2 and stats.buckets[7] == 1
+    assert stats.percentile(50) == pytest.approx(4e-6)
+    assert stats.percentile(100) == 100e-6
+    summary = stats.summary()
+    assert summary['histogram_us'] == {"<1": 1, "<4": 2, "<128": 1}
+    assert summary['mean_ms'] == pytest.approx(106.5e-6 / 4 * 1000.0)
+
+
+def test_empty_handler_summary():
+    summary = instrumentation.HandlerStats().summary()
+    assert summary['count'] == 0
+    assert summary['mean_ms'] == summary['min_ms'] == summary['p99_ms'] == 0.0
+
+
+def test_timed_records_calls_and_errors(tmp_path):
+    clock = FakeClock()
+    stats = instrumentation.SessionStats(clock)
+
+    def handler(seconds):
+        clock.now += seconds
+        if seconds > 1.0:
+            raise RuntimeError("slow")
+        return seconds
+
+    timed = stats.timed('tick', handler)
+    assert timed.__name__ == 'handler'
+    assert timed(0.002) == 0.002
+    with pytest.raises(RuntimeError):
+        timed(2.0)
+    recorded = stats.handler('tick')
+    assert recorded.count == 2 and recorded.total == pytest.approx(2.002)
+
+    path = tmp_path / "stats.json"
+    stats.dump(path)
+    summary = json.loads(path.read_text())
+    assert summary['duration_s'] == pytest.approx(2.002)
+    assert summary['handlers']['tick']['count'] == 2
+
+
+def test_debug_function_follows_the_log_level():
+    logger = logging.getLogger("camera_fly.test_instrumentation")
+    instrumentation.configure_logger(logger, 'OFF')
+    assert instrumentation.debug_function(logger) is instrumentation._no_log
+    instrumentation.configure_logger(logger, 'DEBUG')
+    assert instrumentation.debug_function(logger) == logger.debug
+    assert len(logger.handlers) == 1
+    logger.handlers.clear()
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+
+from core import metrics
+
+
+def test_derivatives_of_a_parabola():
+    times = np.linspace(0.0, 2.0, 201)
+    positions = np.column_stack((times ** 2, 3.0 * times, np.zeros_like(times)))
+    velocity, acceleration, jerk = metrics.derivatives(times, positions)
+    # Second order differences are exact for a parabola inside the range
+    np.testing.assert_allclose(velocity[1:-1, 0], 2.0 * times[1:-1], atol=1e-9)
+    np.testing.assert_allclose(velocity[:, 1], 3.0)
+    np.testing.assert_allclose(acceleration[2:-2, 0], 2.0, atol=1e-6)
+    np.testing.assert_allclose(jerk[3:-3], 0.0, atol=1e-4)
+
+
+def test_angular_velocity_of_a_constant_turn():
+    times = np.linspace(0.0, 1.0, 11)
+    angles = np.radians(90.0) * times
+    directions = np.column_stack((np.cos(angles), np.sin(angles), np.zeros_like(angles))) * 4.0
+    np.testing.assert_allclose(metrics.angular_velocity(times, directions), 90.0)
+
+
+def test_spikes_group_runs_of_samples():
+    values = np.array([0.0, 5.0, 7.0, 1.0, 0.0, 9.0])
+    frames = np.arange(10.0, 16.0)
+    assert metrics.spikes(values, 2.0, frames) == [
+        {'start': 11.0, 'end': 12.0, 'peak': 7.0},
+        {'start': 15.0, 'end': 15.0, 'peak': 9.0},
+    ]
+    assert metrics.spikes(values, 10.0, frames) == []
+
+
+def test_analyse_flags_a_jolt(tmp_path):
+    times = np.arange(48) / 24.0
+    camera = np.column_stack((times, np.zeros_like(times), np.zeros_like(times)))
+    camera[30:, 1] = 0.5
+    aim = camera + (0.0, 10.0, 0.0)
+    report = metrics.analyse(np.arange(48.0) + 1.0, times, camera, aim, {'acceleration': 50.0})
+
+    assert report['frames'] == [1.0, 48.0] and report['samples'] == 48
+    assert set(report['bones']['Aim']) == {'velocity', 'acceleration', 'jerk'}
+    assert report['bones']['Camera']['angular_velocity']['max'] == 0.0
+    flagged = report['spikes']['Camera acceleration']
+    assert len(flagged) == 1 and flagged[0]['start'] <= 31.0 <= flagged[0]['end']
+    # The Aim bone follows the Camera bone, so it jolts on the same frames
+    aim_flagged = report['spikes']['Aim acceleration']
+    assert [(run['start'], run['end']) for run in aim_flagged] == [(run['start'], run['end']) for run in flagged]
+    assert report['spike_count'] == 2
+    assert 'Camera jerk' not in report['spikes']
+
+    path = tmp_path / "report.json"
+    metrics.dump(report, path)
+    assert json.loads(path.read_text()) == report
@@ -0,0 +1,43 @@
+import pytest
+
+from core.motion import MotionIntegrator
+
+SPEED = 5.0
+ACCELERATION = 4.0
+DECELERATION = 8.0
+
+
+def fly(fps, hold=2.0, coast=1.0):
+    """Hold a movement key, release it and return the distance covered."""
+    integrator = MotionIntegrator()
+    dt = 1.0 / fps
+    distance = 0.0
+    for direction, seconds in (((0.0, 1.0, 0.0), hold), ((0.0, 0.0, 0.0), coast)):
+        for _ in range(round(seconds * fps)):
+            distance += integrator.step(direction, SPEED, dt, ACCELERATION, DECELERATION)[1]
+    return distance
+
+
+def test_distance_is_independent_of_the_frame_rate():
+    # 1.25 s ramp to full speed, 0.75 s at full speed, 0.625 s to stop
+    ramp = SPEED / ACCELERATION
+    stop = SPEED / DECELERATION
+    exact = 0.5 * SPEED * ramp + SPEED * (2.0 - ramp) + 0.5 * SPEED * stop
+    for fps in (8, 30, 120):
+        assert fly(fps) == pytest.approx(exact, rel=1e-9)
+
+
+def test_instant_speed_without_acceleration():
+    integrator = MotionIntegrator()
+    assert integrator.step((3.0, 4.0, 0.0), 10.0, 0.5) == pytest.approx((3.0, 4.0, 0.0))
+    assert integrator.step((0.0, 0.0, 0.0), 10.0, 0.5) == (0.0, 0.0, 0.0)
+    assert not integrator.moving
+
+
+def test_tick_clamps_long_gaps():
+    integrator = MotionIntegrator(max_dt=0.25)
+    assert integrator.tick(1.0) == 0.0
+    assert integrator.tick(1.1) == pytest.approx(0.1)
+    assert integrator.tick(5.0) == 0.25
+    integrator.restart(10.0)
+    assert integrator.tick(10.05) == pytest.approx(0.05)
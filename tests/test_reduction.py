@@ -0,0 +1,41 @@
+import numpy as np
+
+from core import reduction
+
+
+def test_straight_line_keeps_only_the_ends():
+    frames = np.arange(50, dtype=np.float64)
+    values = np.column_stack((frames * 0.5, -frames))
+    mask = reduction.simplify_mask(frames, [(values, reduction.LINEAR, 1e-6)])
+    assert np.flatnonzero(mask).tolist() == [0, 49]
+
+
+def test_dropped_keys_stay_within_tolerance():
+    rng = np.random.default_rng(1)
+    frames = np.arange(500, dtype=np.float64)
+    values = np.cumsum(rng.normal(size=(500, 3)), axis=0)
+    tolerance = 0.5
+    mask = reduction.simplify_mask(frames, [(values, reduction.LINEAR, tolerance)])
+
+    assert mask[0] and mask[-1]
+    assert mask.sum() < len(frames)
+    interpolated = np.column_stack([np.interp(frames, frames[mask], values[mask, i]) for i in range(3)])
+    assert np.linalg.norm(values - interpolated, axis=1).max() <= tolerance
+
+
+def test_quaternion_deviation_in_degrees():
+    frames = np.arange(100, dtype=np.float64)
+    # Rotation around Z wobbling by up to 2 degrees
+    angles = np.radians(frames * 0.5 + 2.0 * np.sin(frames * 0.3))
+    quaternions = np.column_stack((np.cos(angles / 2), np.zeros(100), np.zeros(100), np.sin(angles / 2)))
+
+    loose = reduction.simplify_mask(frames, [(quaternions, reduction.QUATERNION, 5.0)])
+    tight = reduction.simplify_mask(frames, [(quaternions, reduction.QUATERNION, 0.1)])
+    assert loose.sum() == 2
+    assert tight.sum() > loose.sum()
+
+
+def test_short_curves_are_kept():
+    frames = np.array([0.0, 1.0])
+    values = np.array([[0.0], [1.0]])
+    assert reduction.simplify_mask(frames, [(values, reduction.LINEAR, 1.0)]).all()
@@ -0,0 +1,102 @@
+import importlib
+import logging
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules only some operators need, they must not load with the add-on
+LAZY_MODULES = ("collision", "fcurves", "formation", "session", "core.eventlog", "core.metrics", "core.fitting")
+
+
+class _Value:
+    """Stands in for any bpy value the add-on touches at import time."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Value()
+
+    def __getattr__(self, name):
+        return _Value()
+
+
+class _TypeMeta(type):
+    @property
+    def is_registered(cls):
+        # Only Blender's own types are registered before the add-on registers its classes
+        return cls.__module__ == "bpy.types"
+
+
+def _module(name, **attributes):
+    module = ModuleType(name)
+    module.__dict__.update(attributes)
+    module.__getattr__ = lambda attribute: _Value()
+    return module
+
+
+def _bpy_types():
+    names = (
+        "Panel", "Operator", "PropertyGroup", "AddonPreferences", "Header", "Menu", "Node", "NodeSocket",
+        "NodeTree", "UIList", "RenderEngine", "Gizmo", "GizmoGroup", "UILayout", "Object",
+    )
+    return {name: _TypeMeta(name, (), {"__module__": "bpy.types"}) for name in names}
+
+
+@pytest.fixture
+def addon(monkeypatch, caplog):
+    """Import the add-on package with stand-ins for the Blender modules."""
+    handlers = _module("bpy.app.handlers", persistent=lambda function: function)
+    app = _module("bpy.app", version=(4, 2, 0), handlers=handlers)
+    types = _module("bpy.types", **_bpy_types())
+    props = _module("bpy.props")
+    bpy = _module("bpy", app=app, types=types, props=props)
+    mathutils = _module("mathutils", Vector=_Value, Matrix=_Value, Quaternion=_Value)
+    stubs = {
+        "bpy": bpy, "bpy.app": app, "bpy.app.handlers": handlers, "bpy.types": types, "bpy.props": props,
+        "mathutils": mathutils,
+    }
+    for name, module in stubs.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.syspath_prepend(str(ROOT))
+    monkeypatch.delenv("CAMERAFLY_DEV_AUTOLOAD", raising=False)
+
+    caplog.set_level(logging.WARNING)
+    package = importlib.import_module("camera_fly")
+    yield package
+    for name in list(sys.modules):
+        if name == "camera_fly" or name.startswith("camera_fly."):
+            del sys.modules[name]
+
+
+def test_classes_come_from_the_manifest(addon, caplog):
+    from camera_fly import auto_load, registration
+
+    assert not caplog.records
+    assert [module.__name__ for module in auto_load.modules] == [
+        "camera_fly." + name for name in registration.MODULES
+    ]
+    assert [(cls.__module__, cls.__name__) for cls in auto_load.ordered_classes] == [
+        ("camera_fly." + module_name, class_name) for module_name, class_name in registration.CLASSES
+    ]
+    for name in LAZY_MODULES:
+        assert "camera_fly." + name not in sys.modules
+
+
+def test_manifest_lists_every_class(addon):
+    from camera_fly import auto_load
+
+    assert set(auto_load.iter_my_classes(auto_load.modules)) == set(auto_load.ordered_classes)
+
+
+def test_stale_manifest_is_reported(addon, caplog, monkeypatch):
+    from camera_fly import auto_load, registration
+
+    monkeypatch.setattr(registration, "CLASSES", registration.CLASSES[:-1])
+    caplog.clear()
+    auto_load.load_manifest()
+    assert "CAMERAFLY_PT_shortcuts" in caplog.text
@@ -0,0 +1,115 @@
+import numpy as np
+
+from core import takes
+
+
+def axis_angle_z(angles):
+    angles = np.asarray(angles, dtype=np.float64)
+    zeros = np.zeros_like(angles)
+    return np.column_stack((np.cos(angles / 2), zeros, zeros, np.sin(angles / 2)))
+
+
+def take(times, positions, angles):
+    samples = np.zeros((len(times), takes.SAMPLE_WIDTH))
+    samples[:, takes.TIME] = times
+    samples[:, takes.CAMERA_LOCATION] = positions
+    samples[:, takes.AIM_LOCATION] = positions + (0.0, 10.0, 0.0)
+    samples[:, takes.CAMERA_ROTATION] = axis_angle_z(angles)
+    samples[:, takes.AIM_ROTATION] = axis_angle_z(angles)
+    return samples
+
+
+def test_slerp_keeps_constant_angular_speed():
+    count = 5
+    start = axis_angle_z(np.zeros(count))
+    end = axis_angle_z(np.full(count, np.radians(90.0)))
+    t = np.linspace(0.0, 1.0, count)
+    result = takes.slerp(start, end, t)
+    np.testing.assert_allclose(result, axis_angle_z(np.radians(90.0) * t), atol=1e-12)
+
+
+def test_slerp_takes_the_shorter_way():
+    start = axis_angle_z([0.0])
+    end = -axis_angle_z([np.radians(20.0)])
+    result = takes.slerp(start, end, np.array([0.5]))
+    dot = abs(result[0] @ axis_angle_z([np.radians(10.0)])[0])
+    assert np.isclose(dot, 1.0)
+
+
+def test_slerp_of_equal_rotations():
+    q = axis_angle_z([0.3, 0.3])
+    np.testing.assert_allclose(takes.slerp(q, q, np.array([0.0, 0.5])), q, atol=1e-12)
+
+
+def test_resample_onto_the_frame_grid():
+    rng = np.random.default_rng(2)
+    times = np.concatenate(([0.0], np.cumsum(rng.uniform(0.01, 0.03, 600))))
+    velocity = np.array([1.0, 2.0, -0.5])
+    samples = take(times, times[:, None] * velocity, times * 0.4)
+
+    frames, resampled = takes.resample(samples, 24.0)
+    assert frames[0] == 0.0
+    np.testing.assert_array_equal(np.diff(frames), 1.0)
+    grid_times = frames / 24.0
+    np.testing.assert_allclose(resampled[:, takes.TIME], grid_times)
+    # Linear motion and constant turning are reproduced exactly
+    np.testing.assert_allclose(resampled[:, takes.CAMERA_LOCATION], grid_times[:, None] * velocity, atol=1e-9)
+    dot = np.abs(np.einsum('ij,ij->i', resampled[:, takes.CAMERA_ROTATION], axis_angle_z(grid_times * 0.4)))
+    np.testing.assert_allclose(dot, 1.0, atol=1e-12)
+
+
+def test_resample_with_frame_step_and_scale():
+    times = np.linspace(0.0, 2.0, 50)
+    samples = take(times, np.zeros((50, 3)), np.zeros(50))
+    frames, resampled = takes.resample(samples, 12.0, step=2.0)
+    np.testing.assert_array_equal(frames, np.arange(0.0, 25.0, 2.0))
+    assert len(resampled) == len(frames)
+
+
+def test_resample_single_sample():
+    samples = take([0.5], np.zeros((1, 3)), [0.0])
+    frames, resampled = takes.resample(samples, 24.0)
+    assert frames.tolist() == [12.0]
+    np.testing.assert_array_equal(resampled, samples)
+
+
+def test_resample_overflowed_take_from_its_first_kept_sample():
+    buffer = takes.TakeBuffer(30)
+    velocity = np.array([1.0, 0.0, 0.0])
+    for i in range(100):
+        row = buffer.next_row()
+        row[:] = take([i / 24.0], velocity * i / 24.0, [0.0])[0]
+    assert buffer.overflowed
+    samples = buffer.samples()
+
+    frames, resampled = takes.resample(samples, 24.0, step=2.0)
+    # The last 30 of 100 frames were kept, keys stay on the take's even frames
+    np.testing.assert_array_equal(frames, np.arange(70.0, 100.0, 2.0))
+    np.testing.assert_allclose(resampled[:, takes.TIME], frames / 24.0)
+    np.testing.assert_allclose(resampled[:, takes.CAMERA_LOCATION], (frames / 24.0)[:, None] * velocity, atol=1e-9)
+
+
+def test_ring_buffer_keeps_the_latest_samples_in_order():
+    buffer = takes.TakeBuffer(4, width=1)
+    for i in range(6):
+        buffer.next_row()[0] = i
+    assert buffer.overflowed
+    assert len(buffer) == 4
+    assert buffer.samples()[:, 0].tolist() == [2, 3, 4, 5]
+
+
+def test_ring_buffer_before_overflow():
+    buffer = takes.TakeBuffer(4, width=1)
+    for i in range(3):
+        buffer.next_row()[0] = i
+    assert not buffer.overflowed
+    assert buffer.samples()[:, 0].tolist() == [0, 1, 2]
+    buffer.clear()
+    assert len(buffer) == 0
+
+
+def test_pack_round_trip():
+    samples = np.linspace(0.0, 1.0, 10 * takes.SAMPLE_WIDTH).reshape(10, takes.SAMPLE_WIDTH)
+    packed = takes.pack(samples)
+    assert packed.dtype == np.float32 and packed.ndim == 1
+    np.testing.assert_allclose(takes.unpack(packed), samples, atol=1e-6)